@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Pipeline Load Test
+Drives ArbitrageBot._scan_and_execute against a local stub CLOB at a
+configurable scale and reports where the time goes
+
+The stub CLOB is the simulated exchange (src/sim_exchange.py) behind the
+bot's own PolymarketClient: every market list, orderbook read and order
+pays the configured network latency, and each cycle starts with exactly
+--opportunities YES+NO dislocations on the book.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py --scale target
+    python benchmarks/pipeline_benchmark.py --markets 500 --opportunities 50 \
+        --latency-ms 200 --scans 3 --compare benchmarks/results/previous.json
+
+    # With pytest-benchmark installed
+    pytest benchmarks/pipeline_benchmark.py --benchmark-json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from arbitrage_bot import ArbitrageBot  # noqa: E402
+from backtest import apply_overrides  # noqa: E402
+
+try:
+    import pytest_benchmark
+except ImportError:
+    pytest_benchmark = None
+
+
+SCALES = {
+    'smoke': {'markets': 30, 'opportunities': 5, 'latency_ms': 5, 'scans': 3},
+    'default': {'markets': 150, 'opportunities': 20, 'latency_ms': 50, 'scans': 3},
+    'target': {'markets': 500, 'opportunities': 50, 'latency_ms': 200, 'scans': 2},
+}
+
+# Metrics compared by --compare (lower is better for all of them)
+COMPARED = (
+    ('scan_seconds', 'p50'),
+    ('decision_latency_ms', 'p95'),
+    ('execution_latency_ms', 'p95'),
+    ('loop_lag_ms', 'p99'),
+    ('db_write_ms', 'p95'),
+)
+
+ASSETS = ['BTC', 'ETH', 'SOL']
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarise(values: List[float], scale: float = 1.0) -> Dict:
+    """count/mean/p50/p95/p99/max of a sample, multiplied by scale"""
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values) * scale, 3),
+        'p50': round(_percentile(values, 50) * scale, 3),
+        'p95': round(_percentile(values, 95) * scale, 3),
+        'p99': round(_percentile(values, 99) * scale, 3),
+        'max': round(max(values) * scale, 3),
+    }
+
+
+def build_config(base: Dict, workdir: Path, markets: int, latency_ms: float, seed: int) -> Dict:
+    """
+    Bot configuration for a load test run
+
+    Everything the bot writes goes under workdir, notifications and
+    backups are off, and the filters are opened up so that every
+    injected dislocation surfaces as an opportunity.
+    """
+    latency = {'distribution': 'fixed', 'median_ms': latency_ms}
+    return apply_overrides(base, {
+        'polymarket.simulation': {
+            'seed': seed,
+            'assets': ASSETS,
+            'series_per_asset': math.ceil(markets / len(ASSETS)),
+            'starting_balance': 1_000_000.0,
+            'arb_rate': 0.0,
+            'arb_edge_ticks': [6, 10],
+            'read_latency': latency,
+            'order_latency': latency,
+        },
+        'polymarket.gas_estimate': 0.0,
+        'polymarket.min_gross_margin': 0.01,
+        'polymarket.min_net_margin': 0.001,
+        'scanner.min_liquidity': 0,
+        'scanner.min_combined_liquidity': 0,
+        'scanner.max_combined_price': 0.99,
+        'execution.mode': 'dry_run',
+        'database.path': str(workdir / 'trades.db'),
+        'database.archive_path': str(workdir / 'archive'),
+        'database.backup_enabled': False,
+        'recorder.enabled': False,
+        'events.socket_path': str(workdir / 'events.sock'),
+        'heartbeat.path': str(workdir / 'heartbeat.bin'),
+        'notifications.telegram.enabled': False,
+        'notifications.email.enabled': False,
+        'logging.console': False,
+        'logging.file': False,
+    })
+
+
+class LoopLagProbe:
+    """Measures how late a periodic asyncio timer fires (event-loop lag)"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self.task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected))
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+
+class PipelineBenchmark:
+    """One bot wired to the stub CLOB, with timing hooks on each stage"""
+
+    def __init__(self, config: Dict, workdir: Path, opportunities: int):
+        """
+        Initialize benchmark
+
+        Args:
+            config: Bot configuration (see build_config)
+            workdir: Scratch directory for the config file, DB and sockets
+            opportunities: Dislocations injected before every cycle
+        """
+        self.opportunities = opportunities
+
+        config_path = workdir / 'config.yaml'
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+
+        # Force the simulated client even if real credentials are in .env
+        for name in ('POLYMARKET_API_KEY', 'POLYMARKET_SECRET', 'POLYMARKET_PRIVATE_KEY'):
+            os.environ.pop(name, None)
+
+        self.bot = ArbitrageBot(str(config_path))
+        logging.getLogger().setLevel(logging.ERROR)
+        self.bot.running = True
+        self.exchange = self.bot.client.sim
+
+        self.scan_seconds: List[float] = []
+        self.scanner_seconds: List[float] = []
+        self.decision_latency: List[float] = []
+        self.execution_latency: List[float] = []
+        self.found = 0
+        self.executed = 0
+        self.surfaced_at = 0.0
+        self._instrument()
+
+    def _instrument(self):
+        scanner, executor = self.bot.scanner, self.bot.executor
+        scan_markets = scanner.scan_markets
+        execute_arbitrage = executor.execute_arbitrage
+
+        async def timed_scan():
+            started = time.perf_counter()
+            opportunities = await scan_markets()
+            self.surfaced_at = time.perf_counter()
+            self.scanner_seconds.append(self.surfaced_at - started)
+            self.found += len(opportunities)
+            return opportunities
+
+        async def timed_execute(opportunity, position_size):
+            submitted = time.perf_counter()
+            self.decision_latency.append(submitted - self.surfaced_at)
+            result = await execute_arbitrage(opportunity, position_size)
+            self.execution_latency.append(time.perf_counter() - submitted)
+            self.executed += 1
+            return result
+
+        scanner.scan_markets = timed_scan
+        executor.execute_arbitrage = timed_execute
+
+    async def cycle(self):
+        """Inject opportunities and run one scan/validate/execute cycle"""
+        self.exchange.dislocate(self.opportunities, duration=3600)
+        started = time.perf_counter()
+        await self.bot._scan_and_execute()
+        self.scan_seconds.append(time.perf_counter() - started)
+
+    async def run(self, scans: int) -> Dict:
+        """Run `scans` cycles and return the report"""
+        probe = LoopLagProbe()
+        probe.start()
+        started_wall = time.time()
+        try:
+            for _ in range(scans):
+                await self.cycle()
+        finally:
+            await probe.stop()
+
+        scanned = sum(self.scanner_seconds)
+        return {
+            'markets': len([m for m in self.exchange.markets.values() if m.active]),
+            'scans': scans,
+            'opportunities_found': self.found,
+            'executions': self.executed,
+            'opportunities_per_second': round(self.found / scanned, 3) if scanned else None,
+            'scan_seconds': summarise(self.scan_seconds),
+            'scanner_seconds': summarise(self.scanner_seconds),
+            'decision_latency_ms': summarise(self.decision_latency, 1000),
+            'execution_latency_ms': summarise(self.execution_latency, 1000),
+            'loop_lag_ms': summarise(probe.samples, 1000),
+            'db_write_ms': summarise(self.bot.database.write_latencies(since=started_wall), 1000),
+        }
+
+    def close(self):
+        self.bot.events.close()
+        self.bot.heartbeat.close()
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmark(base_config: Dict, markets: int, opportunities: int, latency_ms: float,
+                  scans: int, seed: int = 1) -> Dict:
+    """
+    Run one load test in a scratch directory
+
+    Returns:
+        Report dict (scale, environment and per-stage timings)
+    """
+    with tempfile.TemporaryDirectory(prefix='pipeline-bench-') as tmp:
+        workdir = Path(tmp)
+        config = build_config(base_config, workdir, markets, latency_ms, seed)
+        bench = PipelineBenchmark(config, workdir, opportunities)
+        try:
+            results = asyncio.run(bench.run(scans))
+        finally:
+            bench.close()
+
+    return {
+        'benchmark': 'pipeline',
+        'revision': _git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': {
+            'markets': markets,
+            'opportunities': opportunities,
+            'latency_ms': latency_ms,
+            'scans': scans,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def compare(current: Dict, previous: Dict) -> List[str]:
+    """Lines describing the change of each tracked metric against a previous report"""
+    lines = [f"vs {previous.get('revision') or '?'} ({previous.get('timestamp', '?')})"]
+    for metric, stat in COMPARED:
+        new = current['results'].get(metric, {}).get(stat)
+        old = previous.get('results', {}).get(metric, {}).get(stat)
+        if new is None or old is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        flag = '  ⚠️ regression' if change > 10 else ''
+        lines.append(f"  {metric} {stat}: {old} -> {new} ({change:+.1f}%){flag}")
+    return lines
+
+
+def format_report(report: Dict) -> str:
+    """Human-readable summary of a report"""
+    scale, results = report['scale'], report['results']
+    lines = [
+        f"Pipeline benchmark @ {report['revision'] or 'unknown revision'}",
+        f"  {results['markets']} markets, {scale['opportunities']} opportunities/cycle, "
+        f"{scale['latency_ms']}ms latency, {scale['scans']} cycles",
+        f"  found {results['opportunities_found']} opportunities, "
+        f"{results['executions']} executions, "
+        f"{results['opportunities_per_second']} opportunities/s while scanning",
+    ]
+    for metric in ('scan_seconds', 'scanner_seconds', 'decision_latency_ms',
+                   'execution_latency_ms', 'loop_lag_ms', 'db_write_ms'):
+        stats = results[metric]
+        if not stats.get('count'):
+            lines.append(f"  {metric:<22} (no samples)")
+            continue
+        lines.append(
+            f"  {metric:<22} p50 {stats['p50']:>10}  p95 {stats['p95']:>10}  "
+            f"p99 {stats['p99']:>10}  max {stats['max']:>10}  (n={stats['count']})"
+        )
+    return '\n'.join(lines)
+
+
+def _load_base_config(path: Optional[str]) -> Dict:
+    path = path or (ROOT / 'config' / 'config.example.yaml')
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Load test the scan/validate/execute pipeline")
+    parser.add_argument('--config', help='Base config (default: config/config.example.yaml)')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='default')
+    parser.add_argument('--markets', type=int, help='Tracked markets')
+    parser.add_argument('--opportunities', type=int, help='Dislocations per cycle')
+    parser.add_argument('--latency-ms', type=float, help='Stub CLOB round-trip latency')
+    parser.add_argument('--scans', type=int, help='Cycles to run')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=str(ROOT / 'benchmarks' / 'results'),
+                        help='Directory (or .json file) for the report')
+    parser.add_argument('--compare', help='Previous report to compare against')
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in ('markets', 'opportunities', 'latency_ms', 'scans'):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    report = run_benchmark(_load_base_config(args.config), seed=args.seed, **scale)
+    print(format_report(report))
+
+    if args.compare:
+        with open(args.compare) as f:
+            print('\n'.join(compare(report, json.load(f))))
+
+    output = Path(args.output)
+    if output.suffix != '.json':
+        output = output / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+
+if pytest_benchmark:
+    def test_scan_and_execute(benchmark):
+        """One scan/validate/execute cycle at the smoke scale"""
+        scale = SCALES['smoke']
+        with tempfile.TemporaryDirectory(prefix='pipeline-bench-') as tmp:
+            workdir = Path(tmp)
+            config = build_config(_load_base_config(None), workdir,
+                                  scale['markets'], scale['latency_ms'], seed=1)
+            bench = PipelineBenchmark(config, workdir, scale['opportunities'])
+            loop = asyncio.new_event_loop()
+            try:
+                benchmark.pedantic(lambda: loop.run_until_complete(bench.cycle()),
+                                   rounds=scale['scans'], iterations=1)
+                benchmark.extra_info.update(
+                    opportunities_found=bench.found,
+                    executions=bench.executed,
+                    decision_latency_ms=summarise(bench.decision_latency, 1000),
+                    db_write_ms=summarise(bench.bot.database.write_latencies(), 1000),
+                )
+            finally:
+                loop.close()
+                bench.close()
+
+
+if __name__ == "__main__":
+    main()
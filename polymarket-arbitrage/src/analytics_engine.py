@@ -0,0 +1,441 @@
+"""
+Analytics Engine
+Streaming performance analytics backed by persisted running accumulators
+"""
+
+import logging
+import math
+import sqlite3
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+# Rollup granularities and the key format used for their buckets
+HOURLY = 'hour'
+DAILY = 'day'
+BUCKET_FORMATS = {
+    HOURLY: '%Y-%m-%d %H:00',
+    DAILY: '%Y-%m-%d',
+}
+
+# Time windows served from rollups: label -> (hours, granularity)
+WINDOWS = {
+    '24h': (24, HOURLY),
+    '7d': (24 * 7, HOURLY),
+    '30d': (24 * 30, DAILY),
+}
+
+
+@dataclass
+class RunningStats:
+    """All-time accumulators updated in O(1) per trade"""
+    last_trade_id: int = 0
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    total_profit: float = 0.0
+    wins: int = 0
+    losses: int = 0
+    win_sum: float = 0.0
+    loss_sum: float = 0.0
+    best: Optional[float] = None
+    worst: Optional[float] = None
+    cumulative: float = 0.0
+    peak: Optional[float] = None
+    max_drawdown: float = 0.0
+
+    def update(self, profit: float):
+        """Fold a single trade profit into the accumulators"""
+        # Welford's online variance
+        self.count += 1
+        delta = profit - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (profit - self.mean)
+
+        self.total_profit += profit
+        if profit > 0:
+            self.wins += 1
+            self.win_sum += profit
+        elif profit < 0:
+            self.losses += 1
+            self.loss_sum += profit
+
+        self.best = profit if self.best is None else max(self.best, profit)
+        self.worst = profit if self.worst is None else min(self.worst, profit)
+
+        # Running peak / drawdown on the cumulative P&L curve
+        self.cumulative += profit
+        if self.peak is None or self.cumulative > self.peak:
+            self.peak = self.cumulative
+        if self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, (self.peak - self.cumulative) / self.peak)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+@dataclass
+class WindowTotals:
+    """Aggregate of the rollup buckets covering one time window"""
+    count: int = 0
+    total: float = 0.0
+    sumsq: float = 0.0
+    wins: int = 0
+    losses: int = 0
+    win_sum: float = 0.0
+    loss_sum: float = 0.0
+    best: Optional[float] = None
+    worst: Optional[float] = None
+    buckets: List[float] = field(default_factory=list)  # Per-bucket totals, oldest first
+
+    def merge_row(self, row: sqlite3.Row):
+        self.count += row['count']
+        self.total += row['total']
+        self.sumsq += row['sumsq']
+        self.wins += row['wins']
+        self.losses += row['losses']
+        self.win_sum += row['win_sum']
+        self.loss_sum += row['loss_sum']
+        self.best = row['best'] if self.best is None else max(self.best, row['best'])
+        self.worst = row['worst'] if self.worst is None else min(self.worst, row['worst'])
+        self.buckets.append(row['total'])
+
+
+class AnalyticsEngine:
+    """
+    Maintains trade analytics incrementally
+
+    Every trade updates a single state row (Welford variance, running
+    peak/drawdown, win/loss sums) plus one hourly and one daily rollup
+    bucket. Reads touch only the state row and a bounded number of
+    buckets, so cost does not grow with trade history.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize analytics engine
+
+        Args:
+            db_path: Path to SQLite database file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+
+    @staticmethod
+    def init_schema(cursor: sqlite3.Cursor):
+        """Create analytics tables if they don't exist"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                last_trade_id INTEGER DEFAULT 0,
+                count INTEGER DEFAULT 0,
+                mean REAL DEFAULT 0,
+                m2 REAL DEFAULT 0,
+                total_profit REAL DEFAULT 0,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                win_sum REAL DEFAULT 0,
+                loss_sum REAL DEFAULT 0,
+                best REAL,
+                worst REAL,
+                cumulative REAL DEFAULT 0,
+                peak REAL,
+                max_drawdown REAL DEFAULT 0,
+                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS analytics_rollups (
+                granularity TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                count INTEGER DEFAULT 0,
+                total REAL DEFAULT 0,
+                sumsq REAL DEFAULT 0,
+                wins INTEGER DEFAULT 0,
+                losses INTEGER DEFAULT 0,
+                win_sum REAL DEFAULT 0,
+                loss_sum REAL DEFAULT 0,
+                best REAL,
+                worst REAL,
+                PRIMARY KEY (granularity, bucket)
+            )
+        """)
+
+    def record_trade(self, cursor: sqlite3.Cursor, trade_id: int, profit: Optional[float],
+                     timestamp: Optional[datetime] = None):
+        """
+        Fold a newly inserted trade into state and rollups
+
+        Runs on the caller's cursor so it commits atomically with the trade.
+
+        Args:
+            cursor: Cursor inside the insert transaction
+            trade_id: ID of the inserted trade
+            profit: Realised profit (None counts as 0)
+            timestamp: Trade timestamp (defaults to now)
+        """
+        stats = self._load_state(cursor)
+        if trade_id <= stats.last_trade_id:
+            return
+
+        # Catch up on any rows written without going through the engine
+        if trade_id > stats.last_trade_id + 1:
+            self._replay(cursor, stats, upto_id=trade_id - 1)
+
+        self._apply(cursor, stats, trade_id, profit or 0.0, timestamp or datetime.now())
+        self._save_state(cursor, stats)
+
+    def catch_up(self, conn: sqlite3.Connection) -> RunningStats:
+        """
+        Bring persisted state up to date with the trades table
+
+        Only trades newer than the last processed ID are read, so this
+        is a single indexed lookup once the engine is current.
+        """
+        cursor = conn.cursor()
+        self.init_schema(cursor)
+        stats = self._load_state(cursor)
+
+        cursor.execute("SELECT MAX(id) FROM trades")
+        max_id = cursor.fetchone()[0] or 0
+        if max_id <= stats.last_trade_id:
+            return stats
+
+        # Re-read under the write lock: a concurrent insert folds its trade in
+        # through record_trade, and replaying from a stale state would count it twice
+        if conn.in_transaction:
+            conn.commit()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            stats = self._load_state(cursor)
+            cursor.execute("SELECT MAX(id) FROM trades")
+            max_id = cursor.fetchone()[0] or 0
+            if max_id > stats.last_trade_id:
+                self._replay(cursor, stats, upto_id=max_id)
+                self._save_state(cursor, stats)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        return stats
+
+    def get_summary(self, now: Optional[datetime] = None) -> Dict:
+        """
+        Get all-time and windowed analytics
+
+        Args:
+            now: Reference time for windows (defaults to now)
+
+        Returns:
+            Analytics dict in the /api/analytics shape plus 'windows'
+        """
+        now = now or datetime.now()
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            stats = self.catch_up(conn)
+
+            summary = self._format_stats(stats)
+            summary['windows'] = {
+                label: self._window_summary(conn, now, hours, granularity)
+                for label, (hours, granularity) in WINDOWS.items()
+            }
+
+        return summary
+
+    def get_daily_series(self, days: int, now: Optional[datetime] = None) -> Tuple[List[str], List[float], List[int]]:
+        """
+        Get per-day profit and trade counts from the daily rollups
+
+        Args:
+            days: Number of days to include
+            now: Reference time (defaults to now)
+
+        Returns:
+            Tuple of (dates, profits, trade counts), oldest first
+        """
+        now = now or datetime.now()
+        start = (now - timedelta(days=days)).strftime(BUCKET_FORMATS[DAILY])
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            self.catch_up(conn)
+
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT bucket, total, count FROM analytics_rollups
+                WHERE granularity = ? AND bucket >= ?
+                ORDER BY bucket ASC
+            """, (DAILY, start))
+            rows = cursor.fetchall()
+
+        return (
+            [row['bucket'] for row in rows],
+            [row['total'] for row in rows],
+            [row['count'] for row in rows],
+        )
+
+    def _apply(self, cursor: sqlite3.Cursor, stats: RunningStats, trade_id: int,
+               profit: float, timestamp: datetime):
+        """Update in-memory state and upsert rollup buckets for one trade"""
+        stats.update(profit)
+        stats.last_trade_id = trade_id
+
+        for granularity, fmt in BUCKET_FORMATS.items():
+            cursor.execute("""
+                INSERT INTO analytics_rollups (
+                    granularity, bucket, count, total, sumsq,
+                    wins, losses, win_sum, loss_sum, best, worst
+                ) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (granularity, bucket) DO UPDATE SET
+                    count = count + 1,
+                    total = total + excluded.total,
+                    sumsq = sumsq + excluded.sumsq,
+                    wins = wins + excluded.wins,
+                    losses = losses + excluded.losses,
+                    win_sum = win_sum + excluded.win_sum,
+                    loss_sum = loss_sum + excluded.loss_sum,
+                    best = MAX(best, excluded.best),
+                    worst = MIN(worst, excluded.worst)
+            """, (
+                granularity,
+                timestamp.strftime(fmt),
+                profit,
+                profit * profit,
+                1 if profit > 0 else 0,
+                1 if profit < 0 else 0,
+                max(profit, 0),
+                min(profit, 0),
+                profit,
+                profit
+            ))
+
+    def _replay(self, cursor: sqlite3.Cursor, stats: RunningStats, upto_id: int):
+        """Fold trades in (last_trade_id, upto_id] into state"""
+        rows = cursor.execute("""
+            SELECT id, timestamp, actual_profit FROM trades
+            WHERE id > ? AND id <= ?
+            ORDER BY id ASC
+        """, (stats.last_trade_id, upto_id)).fetchall()
+
+        for trade_id, timestamp, profit in rows:
+            self._apply(cursor, stats, trade_id, profit or 0.0, self._parse_timestamp(timestamp))
+
+        if rows:
+            self.logger.info(f"Analytics caught up on {len(rows)} trades")
+
+    def _load_state(self, cursor: sqlite3.Cursor) -> RunningStats:
+        names = [f.name for f in fields(RunningStats)]
+        cursor.execute(f"SELECT {', '.join(names)} FROM analytics_state WHERE id = 1")
+        row = cursor.fetchone()
+        return RunningStats(*row) if row else RunningStats()
+
+    def _save_state(self, cursor: sqlite3.Cursor, stats: RunningStats):
+        names = [f.name for f in fields(RunningStats)]
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO analytics_state (id, {', '.join(names)}, updated_at)
+            VALUES (1, {', '.join('?' for _ in names)}, CURRENT_TIMESTAMP)
+        """, [getattr(stats, name) for name in names])
+
+    def _window_summary(self, conn: sqlite3.Connection, now: datetime,
+                        hours: int, granularity: str) -> Dict:
+        """Aggregate the rollup buckets covering the last `hours`"""
+        start = (now - timedelta(hours=hours)).strftime(BUCKET_FORMATS[granularity])
+
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT * FROM analytics_rollups
+            WHERE granularity = ? AND bucket >= ?
+            ORDER BY bucket ASC
+        """, (granularity, start))
+
+        window = WindowTotals()
+        for row in cursor.fetchall():
+            window.merge_row(row)
+
+        if window.count == 0:
+            return self._empty_summary()
+
+        mean = window.total / window.count
+        if window.count > 1:
+            variance = max((window.sumsq - window.count * mean * mean) / (window.count - 1), 0.0)
+            std_dev = math.sqrt(variance)
+        else:
+            std_dev = 0.0
+
+        # Drawdown at bucket-close resolution
+        peak = None
+        running_total = 0.0
+        max_drawdown = 0.0
+        for total in window.buckets:
+            running_total += total
+            if peak is None or running_total > peak:
+                peak = running_total
+            if peak > 0:
+                max_drawdown = max(max_drawdown, (peak - running_total) / peak)
+
+        return self._summary_dict(
+            count=window.count, total=window.total, mean=mean, std_dev=std_dev,
+            wins=window.wins, losses=window.losses, win_sum=window.win_sum,
+            loss_sum=window.loss_sum, best=window.best, worst=window.worst,
+            max_drawdown=max_drawdown
+        )
+
+    def _format_stats(self, stats: RunningStats) -> Dict:
+        if stats.count == 0:
+            return self._empty_summary()
+
+        return self._summary_dict(
+            count=stats.count, total=stats.total_profit, mean=stats.mean,
+            std_dev=stats.stdev, wins=stats.wins, losses=stats.losses,
+            win_sum=stats.win_sum, loss_sum=stats.loss_sum, best=stats.best,
+            worst=stats.worst, max_drawdown=stats.max_drawdown
+        )
+
+    @staticmethod
+    def _summary_dict(count: int, total: float, mean: float, std_dev: float,
+                      wins: int, losses: int, win_sum: float, loss_sum: float,
+                      best: Optional[float], worst: Optional[float],
+                      max_drawdown: float) -> Dict:
+        total_losses = abs(loss_sum)
+        profit_factor = win_sum / total_losses if total_losses > 0 else None
+        sharpe_ratio = mean / std_dev if std_dev > 0 else 0
+
+        return {
+            'total_trades': count,
+            'total_profit': round(total, 2),
+            'win_rate': round(wins / count * 100, 2),
+            'avg_profit': round(mean, 4),
+            'sharpe_ratio': round(sharpe_ratio, 2),
+            'max_drawdown': round(max_drawdown * 100, 2),
+            'profit_factor': round(profit_factor, 2) if profit_factor is not None else 'N/A',
+            'best_trade': round(best or 0, 2),
+            'worst_trade': round(worst or 0, 2),
+            'avg_win': round(win_sum / wins, 4) if wins else 0,
+            'avg_loss': round(loss_sum / losses, 4) if losses else 0
+        }
+
+    @staticmethod
+    def _empty_summary() -> Dict:
+        return {
+            'total_trades': 0,
+            'total_profit': 0,
+            'win_rate': 0,
+            'avg_profit': 0,
+            'sharpe_ratio': 0,
+            'max_drawdown': 0,
+            'profit_factor': 0
+        }
+
+    @staticmethod
+    def _parse_timestamp(value) -> datetime:
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            return datetime.now()
@@ -4,13 +4,14 @@ Polymarket Arbitrage Bot
 Automated trading bot for Polymarket prediction markets
 """
 
+import asyncio
 import logging
 import os
 import signal
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from pathlib import Path
 from typing import Dict, List, Optional
 
 import yaml
@@ -18,10 +19,25 @@ from dotenv import load_dotenv
 
 from atomic_executor import AtomicExecutor, ExecutionStatus
 from database import Database
+from backup_manager import BackupManager
+from config_manager import (RELOADABLE_SECTIONS, RESTART_ONLY_KEYS, ConfigWatcher, resolve_path,
+                            restart_only_changes, validate_config)
+from orderbook_recorder import DEFAULT_RECORD_PATH, OrderbookRecorder
+from event_bus import (DEFAULT_SOCKET_PATH, OPPORTUNITY, STATUS, TRADE,
+                       EventPublisher)
+from heartbeat import DEFAULT_HEARTBEAT_PATH, HeartbeatWriter
+from log_pipeline import setup_logging
+from metrics import (DEFAULT_METRICS_HOST, DEFAULT_METRICS_PORT, OPPORTUNITIES_EXECUTED,
+                     OPPORTUNITIES_FOUND, QUEUE_DEPTH, REGISTRY, SCAN_DURATION,
+                     LoopLagMonitor, MetricsServer, StartupTimer)
+from notification_dispatcher import ALERT, NotificationDispatcher, TRADE as TRADE_NOTICE
 from notification_service import NotificationService
 from opportunity_scanner import OpportunityScanner
 # Local imports
 from polymarket_client import PolymarketClient
+from position_book import UNCLAIMED, PositionBook
+from profiler import DEFAULT_PROFILE_DIR, DEFAULT_REQUEST_PATH, ProfilerHook
+from redemption_batcher import ChainStub, RedemptionBatcher
 from risk_manager import RiskManager
 from yes_no_arbitrage_scanner import YesNoArbitrageScanner
 
@@ -34,14 +50,34 @@ class ArbitrageBot:
     
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the arbitrage bot"""
-        self.config = self._load_config(config_path)
-        self._setup_logging()
+        self.startup = StartupTimer()
+        with self.startup.phase('config'):
+            self.config = self._load_config(config_path)
+        with self.startup.phase('logging'):
+            self._setup_logging()
         
         self.logger = logging.getLogger(__name__)
         self.logger.info("Initializing Polymarket Arbitrage Bot...")
         
-        # Initialize components
-        self.client = self._init_polymarket_client()
+        # The client (credential derivation is a network round trip) and the
+        # database (schema setup) don't depend on each other
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='startup') as pool:
+            client_future = pool.submit(self._init_polymarket_client)
+            database_future = pool.submit(self._init_database)
+            self.client = client_future.result()
+            self.database = database_future.result()
+        
+        # Record every market list / orderbook seen, for offline replay
+        recorder_config = self.config.get('recorder', {})
+        self.recorder = None
+        if recorder_config.get('enabled', False):
+            self.recorder = OrderbookRecorder(
+                recorder_config.get('path', DEFAULT_RECORD_PATH),
+                flush_interval=recorder_config.get('flush_interval_seconds', 5.0),
+                segment_bytes=recorder_config.get('segment_mb', 64) * 1024 * 1024
+            )
+            self.client.recorder = self.recorder
+            QUEUE_DEPTH.set_function(self.recorder.queue.qsize, queue='recorder')
         
         # Use specialized YES/NO arbitrage scanner
         self.scanner = YesNoArbitrageScanner(self.client, self.config)
@@ -49,34 +85,102 @@ class ArbitrageBot:
         
         self.risk_manager = RiskManager(self.config)
         self.notifier = NotificationService(self.config)
-        self.database = Database(self.config['database']['path'])
+        self.notifications = NotificationDispatcher(self.notifier, self.config)
+        
+        # Held shares through resolution and redemption
+        self.redemption_batcher = self._create_redemption_batcher()
+        self.scanner.redemption_batcher = self.redemption_batcher
+        self.executor.redemption_batcher = self.redemption_batcher
+        self.positions = PositionBook(self.client, self.config, self.database,
+                                      batcher=self.redemption_batcher)
+        self._sync_exposure()
+        
+        # Loss windows survive restarts
+        try:
+            self.risk_manager.load_history(self.database.get_settlements_since(
+                datetime.now() - timedelta(days=7), simulated=self.client.simulation_mode))
+        except Exception as e:
+            self.logger.error(f"Failed to load recent settlements into risk manager: {e}")
+        
+        db_config = self.config['database']
+        
+        # Online backups (SQLite backup API, page batches)
+        self.backups = None
+        if db_config.get('backup_enabled', False):
+            self.backups = BackupManager(
+                self.database,
+                backup_path=db_config.get('backup_path', 'data/backups/'),
+                interval_hours=db_config.get('backup_interval_hours', 24),
+                keep=db_config.get('backup_keep', 7),
+                pages_per_step=db_config.get('backup_pages_per_step', 256)
+            )
+        
+        # Push events to the dashboard
+        events_config = self.config.get('events', {})
+        self.events = EventPublisher(resolve_path(events_config.get('socket_path', DEFAULT_SOCKET_PATH)))
+        
+        # Liveness heartbeat for the dashboard
+        self.heartbeat = HeartbeatWriter(
+            resolve_path(self.config.get('heartbeat', {}).get('path', DEFAULT_HEARTBEAT_PATH)),
+            mode=self.config['execution']['mode'],
+            scan_interval=self.config['scanner']['scan_interval']
+        )
+        
+        # Local Prometheus endpoint and event-loop lag sampling
+        metrics_config = self.config.get('metrics', {})
+        self.metrics_server = None
+        if metrics_config.get('enabled', True):
+            self.metrics_server = MetricsServer(
+                REGISTRY,
+                host=metrics_config.get('host', DEFAULT_METRICS_HOST),
+                port=metrics_config.get('port', DEFAULT_METRICS_PORT)
+            )
+        self.loop_lag = LoopLagMonitor(interval=metrics_config.get('loop_lag_interval', 0.25))
+        
+        # On-demand profiling (SIGUSR2 or the dashboard)
+        profiling_config = self.config.get('profiling', {})
+        self.profiler = ProfilerHook(
+            output_dir=resolve_path(profiling_config.get('output_dir', DEFAULT_PROFILE_DIR)),
+            request_path=resolve_path(profiling_config.get('request_path', DEFAULT_REQUEST_PATH)),
+            interval=profiling_config.get('sample_interval_ms', 5) / 1000
+        )
+        
+        # Pick up config.yaml edits (e.g. from the dashboard) between scan cycles
+        reload_config = self.config.get('config_reload', {})
+        self.config_watcher = None
+        if reload_config.get('enabled', True):
+            self.config_watcher = ConfigWatcher(
+                config_path,
+                load=self._read_config,
+                interval=reload_config.get('poll_interval', 2.0)
+            )
         
         # Capital tracking
         capital_config = self.config.get('capital', {})
         self.total_capital = capital_config.get('total_capital', 100)
-        self.deployed_capital = 0.0
+        self.deployed_capital = self.positions.deployed_capital
         
         # Bot state
         self.running = False
         self.paused = False
         self.last_scan_time = None
+        self.last_archive_date = None
+        self.archive_task: Optional[asyncio.Task] = None
         self.total_profit = 0.0
         self.trade_count = 0
         
         # Register signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
+        signal.signal(signal.SIGUSR2, self._profile_signal_handler)
         
-        self.logger.info("Bot initialized successfully")
+        self.startup.mark('init')
+        self.logger.info(f"Bot initialized successfully ({self.startup.summary()})")
     
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration from YAML file"""
         try:
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
-                
-            # Expand environment variables
-            return self._expand_env_vars(config)
+            return self._read_config(config_path)
         except FileNotFoundError:
             print(f"❌ Config file not found: {config_path}")
             print("💡 Copy config/config.example.yaml to config/config.yaml and update it")
@@ -85,6 +189,12 @@ class ArbitrageBot:
             print(f"❌ Error loading config: {e}")
             sys.exit(1)
     
+    def _read_config(self, config_path: str) -> Dict:
+        """Parse the YAML file and expand environment variables"""
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f)
+        return self._expand_env_vars(config)
+    
     def _expand_env_vars(self, config: Dict) -> Dict:
         """Recursively expand environment variables in config"""
         import re
@@ -109,77 +219,67 @@ class ArbitrageBot:
         return expand(config)
     
     def _setup_logging(self):
-        """Setup logging configuration"""
-        log_config = self.config.get('logging', {})
-        log_level = log_config.get('level', 'INFO')
-        
-        # Create logs directory
-        Path("logs").mkdir(exist_ok=True)
-        
-        # Configure root logger
-        logging.basicConfig(
-            level=getattr(logging, log_level),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[]
-        )
-        
-        # Console handler
-        if log_config.get('console', True):
-            console = logging.StreamHandler()
-            console.setFormatter(logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(message)s',
-                datefmt='%H:%M:%S'
-            ))
-            logging.getLogger().addHandler(console)
-        
-        # File handler
-        if log_config.get('file', True):
-            from logging.handlers import RotatingFileHandler
-            
-            file_handler = RotatingFileHandler(
-                log_config.get('file_path', 'logs/bot.log'),
-                maxBytes=log_config.get('max_bytes', 10485760),
-                backupCount=log_config.get('backup_count', 5)
+        """Setup logging (queue-backed; formatting and file I/O run on a listener thread)"""
+        self.log_listener = setup_logging(self.config.get('logging', {}))
+    
+    def _init_database(self) -> Database:
+        """Open the database (creates tables on first run)"""
+        db_config = self.config['database']
+        with self.startup.phase('database'):
+            return Database(
+                db_config['path'],
+                archive_dir=db_config.get('archive_path'),
+                compress_after_months=db_config.get('compress_after_months', 3)
             )
-            file_handler.setFormatter(logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            ))
-            logging.getLogger().addHandler(file_handler)
     
     def _init_polymarket_client(self) -> PolymarketClient:
         """Initialize Polymarket client"""
-        api_key = os.getenv('POLYMARKET_API_KEY')
-        api_secret = os.getenv('POLYMARKET_SECRET')
-        private_key = os.getenv('POLYMARKET_PRIVATE_KEY')
-        
-        if not api_key or not api_secret:
-            self.logger.warning("⚠️  Polymarket credentials not found. Running in simulation mode.")
+        with self.startup.phase('client'):
+            api_key = os.getenv('POLYMARKET_API_KEY')
+            api_secret = os.getenv('POLYMARKET_SECRET')
+            private_key = os.getenv('POLYMARKET_PRIVATE_KEY')
+            
+            if not api_key or not api_secret:
+                self.logger.warning("⚠️  Polymarket credentials not found. Running in simulation mode.")
+                return PolymarketClient(
+                    api_key=None,
+                    api_secret=None,
+                    private_key=None,
+                    config=self.config['polymarket']
+                )
+            
             return PolymarketClient(
-                api_key=None,
-                api_secret=None,
-                private_key=None,
+                api_key=api_key,
+                api_secret=api_secret,
+                private_key=private_key,
                 config=self.config['polymarket']
             )
-        
-        return PolymarketClient(
-            api_key=api_key,
-            api_secret=api_secret,
-            private_key=private_key,
-            config=self.config['polymarket']
-        )
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         self.logger.info(f"Received signal {signum}. Shutting down gracefully...")
         self.stop()
     
+    def _profile_signal_handler(self, signum, frame):
+        """Start a profile requested via SIGUSR2"""
+        self.profiler.handle_signal()
+    
     async def start(self):
         """Start the arbitrage bot"""
         self.running = True
         self.logger.info("🚀 Starting Polymarket Arbitrage Bot")
+        self._beat()
+        self._publish_status()
+        
+        if self.backups:
+            self.backups.start()
+        if self.metrics_server:
+            self.metrics_server.start()
+        self.loop_lag.start()
         
         # Check balance before starting
-        balance_info = self.client.get_balance()
+        with self.startup.phase('balance'):
+            balance_info = self.client.get_balance()
         self.logger.info(f"💰 Current Balance: ${balance_info.get('balance', 0):.2f} USDC")
         self.logger.info(f"   Available: ${balance_info.get('available', 0):.2f} USDC")
 
@@ -187,8 +287,10 @@ class ArbitrageBot:
             self.logger.warning(f"⚠️  Low balance: ${balance_info.get('available', 0):.2f} USDC")
             self.logger.warning(f"   Recommended minimum: ${self.config['polymarket']['max_position_size']:.2f} USDC")
 
-        # Send startup notification
-        await self.notifier.send_message(
+        # Notifications are sent from a background task from here on
+        self.notifier.start()
+        self.notifications.start()
+        self.notifications.submit(
             "🤖 YES/NO Arbitrage Bot Started",
             f"Mode: {self.config['execution']['mode']}\n"
             f"Balance: ${balance_info.get('balance', 0):.2f} USDC\n"
@@ -200,29 +302,163 @@ class ArbitrageBot:
         )
 
         # Main event loop
-        scan_interval = self.config['scanner']['scan_interval']
-        
         while self.running:
+            # Read every cycle so a reloaded interval takes effect immediately
+            scan_interval = self.config['scanner']['scan_interval']
             try:
-                if not self.paused:
-                    await self._scan_and_execute()
+                self._check_config_reload()
+                await self._settle_positions()
                 
-                # Wait for next scan
-                time.sleep(scan_interval)
+                # Runs while paused too: _scan_and_execute resumes trading
+                # once the risk limits (e.g. open positions) clear
+                if self.running:
+                    scan_started = time.time()
+                    await self.profiler.run_scan(self._scan_and_execute)
+                    scan_duration = time.time() - scan_started
+                    self.heartbeat.record_scan(scan_started, scan_duration)
+                    SCAN_DURATION.observe(scan_duration)
+                    if 'first_scan' not in self.startup.phases:
+                        self.startup.mark('first_scan')
+                        self.logger.info(f"⏱️  Startup: {self.startup.summary()}")
+                
+                self._beat()
+                self._archive_history()
+                
+                # Wait for next scan without blocking the event loop
+                await asyncio.sleep(scan_interval)
                 
             except KeyboardInterrupt:
                 self.logger.info("Interrupted by user")
                 break
             except Exception as e:
                 self.logger.error(f"Error in main loop: {e}", exc_info=True)
-                await self.notifier.send_alert(
+                self.notifications.submit(
                     "⚠️ Bot Error",
-                    f"Error in main loop: {str(e)}"
+                    f"Error in main loop: {str(e)}",
+                    kind=ALERT
                 )
-                time.sleep(scan_interval * 2)  # Wait longer after error
+                await asyncio.sleep(scan_interval * 2)  # Wait longer after error
         
+        self.loop_lag.stop()
+        self._beat()
+        await self.positions.wait_for_redemptions()
+        if self.archive_task:
+            await asyncio.gather(self.archive_task, return_exceptions=True)
+        await self.notifications.close()
+        await self.notifier.close()
         self.logger.info("Bot stopped")
     
+    def _create_redemption_batcher(self) -> Optional[RedemptionBatcher]:
+        """Batch redemptions on the local chain stub (simulation mode)"""
+        batch_config = self.config.get('resolution', {}).get('batch', {})
+        if not batch_config.get('enabled', True):
+            return None
+        if not self.client.simulation_mode:
+            # No on-chain client in this build; positions are redeemed one at a time
+            self.logger.warning("Batched redemption needs an on-chain client; redeeming per position")
+            return None
+        chain = ChainStub(
+            payout=self.client.sim.redeem,
+            base_gas=batch_config.get('base_gas_usdc', 0.04),
+            per_position_gas=batch_config.get('per_position_gas_usdc', 0.01),
+            block_time=batch_config.get('block_time_seconds', 2.0),
+            charge=self.client.sim.charge_gas
+        )
+        return RedemptionBatcher(chain, self.config)
+    
+    def _sync_exposure(self):
+        """Push open positions, deployed and trading capital to the risk manager"""
+        self.deployed_capital = self.positions.deployed_capital
+        self.risk_manager.update_exposure(self.positions.open_count, self.deployed_capital,
+                                          float(self.positions.capital(self.scanner.total_capital)))
+    
+    async def _settle_positions(self):
+        """Redeem resolved positions and release their capital"""
+        redeemed = await self.positions.settle(capital=self.positions.capital(self.scanner.total_capital))
+        if not redeemed:
+            return
+        
+        for position in redeemed:
+            self.risk_manager.record_pnl(position.profit, position.redeemed_at)
+        self._sync_exposure()
+        for position in redeemed:
+            if position.status == UNCLAIMED:
+                self.notifications.submit(
+                    "🏁 Position Resolved",
+                    f"Market: {position.market_name[:50]}\n"
+                    f"Winner: {position.winner}\n"
+                    f"Redeem {position.winning_shares:.2f} winning shares on-chain "
+                    f"(cost ${position.cost:.2f})",
+                    kind=ALERT
+                )
+                continue
+            self.notifications.submit(
+                "💵 Position Redeemed",
+                f"Market: {position.market_name[:50]}\n"
+                f"Winner: {position.winner}\n"
+                f"Payout: ${position.payout:.2f} (cost ${position.cost:.2f})\n"
+                f"Profit: ${position.profit:.2f}\n"
+                f"Deployed: ${self.deployed_capital:.2f}",
+                kind=TRADE_NOTICE
+            )
+    
+    def _check_config_reload(self):
+        """Apply a changed config.yaml to the live components"""
+        if not self.config_watcher:
+            return
+        new_config = self.config_watcher.poll(time.time())
+        if new_config is None:
+            return
+        
+        is_valid, error_msg = validate_config(new_config)
+        if not is_valid:
+            self.logger.error(f"Config reload rejected, keeping current settings: {error_msg}")
+            return
+        
+        # Keys read only at startup keep their running values (the execution
+        # mode in particular never flips mid-run)
+        restart_needed = restart_only_changes(self.config, new_config) + sorted(
+            section for section in set(self.config) | set(new_config)
+            if section not in RELOADABLE_SECTIONS and self.config.get(section) != new_config.get(section)
+        )
+        if restart_needed:
+            self.logger.warning(f"Config changes to {', '.join(restart_needed)} take effect after a restart")
+        
+        # Build the whole new config first, then swap it into every component
+        # before the next scan starts
+        config = dict(self.config)
+        for section in RELOADABLE_SECTIONS:
+            if section in new_config:
+                config[section] = dict(new_config[section])
+                for key in RESTART_ONLY_KEYS.get(section, ()):
+                    if key in (self.config.get(section) or {}):
+                        config[section][key] = self.config[section][key]
+                    else:
+                        config[section].pop(key, None)
+        
+        changes = []
+        for section in RELOADABLE_SECTIONS:
+            old, new = self.config.get(section) or {}, config.get(section) or {}
+            for key in sorted(set(old) | set(new)):
+                if old.get(key) != new.get(key):
+                    changes.append(f"{section}.{key}: {old.get(key)} → {new.get(key)}")
+        if not changes:
+            return
+        
+        self.client.apply_config(config['polymarket'])
+        self.scanner.apply_config(config)
+        self.executor.apply_config(config)
+        self.risk_manager.apply_config(config)
+        self.config = config
+        self.total_capital = config.get('capital', {}).get('total_capital', 100)
+        self._sync_exposure()
+        self.heartbeat.mode = config['execution']['mode']
+        self.heartbeat.scan_interval = config['scanner']['scan_interval']
+        
+        self.logger.info(f"⚙️  Config reloaded: {'; '.join(changes)}")
+        self._publish_status()
+        self.notifications.submit("⚙️ Config Reloaded", "\n".join(changes))
+    
     async def _scan_and_execute(self):
         """Scan for YES/NO arbitrage opportunities and execute"""
         self.last_scan_time = datetime.now()
@@ -232,9 +468,11 @@ class ArbitrageBot:
             if not self.paused:
                 self.paused = True
                 self.logger.warning("⚠️  Trading paused due to risk limits")
-                await self.notifier.send_alert(
+                self._publish_status()
+                self.notifications.submit(
                     "🛑 Trading Paused",
-                    "Risk limits reached. Trading paused."
+                    "Risk limits reached. Trading paused.",
+                    kind=ALERT
                 )
             return
         
@@ -242,7 +480,8 @@ class ArbitrageBot:
         if self.paused and self.risk_manager.can_trade():
             self.paused = False
             self.logger.info("✅ Trading resumed")
-            await self.notifier.send_message(
+            self._publish_status()
+            self.notifications.submit(
                 "✅ Trading Resumed",
                 "Risk limits reset. Trading resumed."
             )
@@ -254,7 +493,21 @@ class ArbitrageBot:
             self.logger.debug("No YES/NO arbitrage opportunities found")
             return
         
-        self.logger.info(f"🎯 Found {len(opportunities)} arbitrage opportunities")
+        OPPORTUNITIES_FOUND.inc(len(opportunities))
+        
+        self.logger.info("🎯 Found %d arbitrage opportunities", len(opportunities))
+        
+        for opp in opportunities:
+            self.events.publish(OPPORTUNITY, {
+                'market_id': opp['market_id'],
+                'market_name': opp['market_name'],
+                'type': opp['type'],
+                'combined_price': opp['combined_price'],
+                'net_margin': opp['net_margin'],
+                'expected_profit': opp['expected_profit'],
+                'score': opp['score'],
+                'discovered_at': opp['discovered_at']
+            })
         
         # Execute best opportunity
         for opp in opportunities:
@@ -265,31 +518,41 @@ class ArbitrageBot:
             if not await self._validate_opportunity(opp):
                 continue
             
-            # Check risk limits
-            if not self.risk_manager.approve_trade(opp):
-                self.logger.info(f"Trade rejected by risk manager: {opp['market_name'][:40]}...")
-                continue
-            
-            # Calculate position size
+            # Calculate position size from capital not locked in open positions
             from decimal import Decimal
-            position_size = self.scanner.calculate_position_size(opp)
+            position_size = self.scanner.calculate_position_size(
+                opp,
+                deployed=Decimal(str(round(self.positions.deployed_capital, 6))),
+                capital=self.positions.capital(self.scanner.total_capital)
+            )
             
             if position_size < Decimal('1'):  # Minimum $1 position
                 self.logger.debug("Position size too small, skipping")
                 continue
             
+            # Check risk limits and hold the headroom until the fill is booked
+            reservation, reason = self.risk_manager.gate.reserve(opp, float(position_size))
+            if not reservation:
+                self.logger.info("Trade rejected by risk manager (%s): %.40s...", reason,
+                                 opp['market_name'], extra={'market_id': opp['market_id']})
+                continue
+            
             # Execute YES/NO arbitrage
-            success = await self._execute_yes_no_arbitrage(opp, position_size)
+            try:
+                success = await self._execute_yes_no_arbitrage(opp, position_size)
+            finally:
+                self.risk_manager.gate.release(reservation)
             
             if success:
                 self.trade_count += 1
-                await self.notifier.send_message(
+                self.notifications.submit(
                     "💰 YES/NO Arbitrage Executed",
                     f"Market: {opp['market_name'][:50]}...\n"
                     f"Combined Price: ${opp['combined_price']:.4f}\n"
                     f"Net Margin: {opp['net_margin']*100:.2f}%\n"
                     f"Position: ${float(position_size):.2f}\n"
-                    f"Total Trades: {self.trade_count}"
+                    f"Total Trades: {self.trade_count}",
+                    kind=TRADE_NOTICE
                 )
                 # Only execute one opportunity per scan cycle
                 break
@@ -310,7 +573,7 @@ class ArbitrageBot:
             # Check if still profitable
             min_threshold = self.config['polymarket'].get('min_net_margin', 0.015)
             if fresh_profit < min_threshold:
-                self.logger.debug(f"Opportunity no longer profitable: {opportunity['market_name']}")
+                self.logger.debug("Opportunity no longer profitable: %s", opportunity['market_name'])
                 return False
             
             # Update opportunity with fresh data
@@ -320,58 +583,76 @@ class ArbitrageBot:
             return True
             
         except Exception as e:
-            self.logger.error(f"Error validating opportunity: {e}")
+            self.logger.error("Error validating opportunity: %s", e)
             return False
     
     async def _execute_yes_no_arbitrage(self, opportunity: Dict, position_size) -> bool:
         """Execute YES/NO arbitrage using atomic executor"""
         try:
             market_name = opportunity.get('market_name', 'Unknown')[:50]
-            self.logger.info(f"⚡ Executing YES/NO arbitrage: {market_name}...")
-            self.logger.info(f"   YES: ${opportunity['yes_price']:.4f} + NO: ${opportunity['no_price']:.4f} = ${opportunity['combined_price']:.4f}")
-            self.logger.info(f"   Net margin: {opportunity['net_margin']*100:.2f}%")
-            self.logger.info(f"   Position size: ${float(position_size):.2f}")
+            self.logger.info(
+                "⚡ Executing YES/NO arbitrage: %s... | YES $%.4f + NO $%.4f = $%.4f | "
+                "net margin %.2f%% | position $%.2f",
+                market_name, opportunity['yes_price'], opportunity['no_price'],
+                opportunity['combined_price'], opportunity['net_margin'] * 100, position_size,
+                extra={'market_id': opportunity['market_id']}
+            )
             
             # Check execution mode
             mode = self.config['execution']['mode']
             
-            if mode == 'dry_run':
-                self.logger.info(f"[DRY RUN] Would execute YES/NO arbitrage")
-                self.logger.info(f"[DRY RUN] Expected profit: ${opportunity['net_margin'] * float(position_size):.4f}")
+            # Without credentials the client trades against the local simulated
+            # exchange, so a dry run there still goes through the real executor
+            if mode == 'dry_run' and not self.client.simulation_mode:
+                self.logger.info("[DRY RUN] Would execute YES/NO arbitrage, expected profit $%.4f",
+                                 opportunity['net_margin'] * float(position_size))
                 self._record_trade(opportunity, simulated=True)
+                OPPORTUNITIES_EXECUTED.inc(result='dry_run')
                 return True
             
             # Execute using atomic executor
             result = await self.executor.execute_arbitrage(opportunity, position_size)
+            OPPORTUNITIES_EXECUTED.inc(result='success' if result.success else 'failed')
+            
+            # Shares bought are held until the market resolves, hedged or not
+            if self.positions.add_fill(opportunity, result):
+                self._sync_exposure()
             
             if result.success:
-                self.logger.info(f"✅ YES/NO arbitrage executed successfully!")
-                self.logger.info(f"   Locked profit: ${float(result.locked_profit):.4f}")
+                self.logger.info("✅ YES/NO arbitrage executed successfully! Locked profit: $%.4f",
+                                 result.locked_profit, extra={'market_id': opportunity['market_id']})
                 
                 # Record trade
-                self._record_trade(opportunity, result=result.to_dict())
+                self._record_trade(opportunity, simulated=self.client.simulation_mode,
+                                   result=result.to_dict())
                 
-                # Update risk manager
-                self.risk_manager.record_trade(result.to_dict())
+                # Update risk manager (PnL is realised when the position settles)
+                self.risk_manager.record_trade(result.to_dict(), realized=False)
                 
                 # Update total profit
                 self.total_profit += float(result.locked_profit)
                 
                 return True
             else:
-                self.logger.error(f"❌ YES/NO arbitrage failed: {result.reason}")
-                await self.notifier.send_alert(
+                self.logger.error("❌ YES/NO arbitrage failed: %s", result.reason,
+                                  extra={'market_id': opportunity['market_id']})
+                # Counts towards the circuit breaker; any unhedged fill's loss
+                # reaches the PnL windows when its position settles
+                self.risk_manager.record_trade(result.to_dict(), realized=False)
+                self.notifications.submit(
                     "❌ Arbitrage Failed",
                     f"Market: {market_name}\n"
-                    f"Reason: {result.reason}"
+                    f"Reason: {result.reason}",
+                    kind=ALERT
                 )
                 return False
                 
         except Exception as e:
-            self.logger.error(f"Error executing YES/NO arbitrage: {e}", exc_info=True)
-            await self.notifier.send_alert(
+            self.logger.error("Error executing YES/NO arbitrage: %s", e, exc_info=True)
+            self.notifications.submit(
                 "❌ Execution Error",
-                f"Error: {str(e)}"
+                f"Error: {str(e)}",
+                kind=ALERT
             )
             return False
     
@@ -383,7 +664,7 @@ class ArbitrageBot:
             # Check execution mode
             mode = self.config['execution']['mode']
             
-            if mode == 'dry_run':
+            if mode == 'dry_run' and not self.client.simulation_mode:
                 self.logger.info(f"[DRY RUN] Would execute trade: {opportunity}")
                 # Simulate success
                 self._record_trade(opportunity, simulated=True)
@@ -391,12 +672,13 @@ class ArbitrageBot:
             
             # Execute actual trade
             result = await self.client.execute_arbitrage(opportunity)
+            OPPORTUNITIES_EXECUTED.inc(result='success' if result['success'] else 'failed')
             
             if result['success']:
                 self.logger.info(f"✅ Trade executed successfully")
                 
                 # Record trade
-                self._record_trade(opportunity, result=result)
+                self._record_trade(opportunity, simulated=self.client.simulation_mode, result=result)
                 
                 # Update risk manager
                 self.risk_manager.record_trade(result)
@@ -408,18 +690,20 @@ class ArbitrageBot:
                 return True
             else:
                 self.logger.error(f"❌ Trade failed: {result.get('error')}")
-                await self.notifier.send_alert(
+                self.notifications.submit(
                     "❌ Trade Failed",
                     f"Market: {opportunity['market_name']}\n"
-                    f"Error: {result.get('error')}"
+                    f"Error: {result.get('error')}",
+                    kind=ALERT
                 )
                 return False
                 
         except Exception as e:
             self.logger.error(f"Error executing arbitrage: {e}", exc_info=True)
-            await self.notifier.send_alert(
+            self.notifications.submit(
                 "❌ Execution Error",
-                f"Error: {str(e)}"
+                f"Error: {str(e)}",
+                kind=ALERT
             )
             return False
     
@@ -464,30 +748,77 @@ class ArbitrageBot:
             'timestamp': datetime.now(),
             'market_id': opportunity['market_id'],
             'market_name': opportunity['market_name'],
+            'type': opportunity.get('type'),
             'expected_profit': opportunity['expected_profit'],
             'actual_profit': result.get('profit') if result else None,
             'simulated': simulated,
-            'status': 'success' if (simulated or (result and result['success'])) else 'failed',
+            'status': 'success' if (result['success'] if result else simulated) else 'failed',
             'details': str(opportunity)
         }
         
-        self.database.insert_trade(trade_data)
+        trade_id = self.database.insert_trade(trade_data)
+        
+        # Push the new trade to the dashboard (details stay in the DB)
+        self.events.publish(TRADE, {
+            'id': trade_id,
+            **{k: v for k, v in trade_data.items() if k != 'details'}
+        })
     
     def stop(self):
         """Stop the bot"""
         self.running = False
         self.logger.info("Stopping bot...")
+        self._beat()
+        self._publish_status()
+        
+        if self.backups:
+            self.backups.stop()
+        if self.recorder:
+            self.recorder.close()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        
+        # Queued here, delivered when start() closes the dispatcher
+        self.notifications.submit(
+            "🛑 Bot Stopped",
+            f"Total Profit: ${self.total_profit:.2f}\n"
+            f"Total Trades: {self.trade_count}"
+        )
+    
+    def _archive_history(self):
+        """Move closed months into partitions in the background, at most once a day"""
+        today = datetime.now().date()
+        if self.last_archive_date == today:
+            return
+        if self.archive_task and not self.archive_task.done():
+            return
         
-        # Send shutdown notification
+        self.last_archive_date = today
+        retention_days = self.config['database'].get('retention_days', 90)
+        self.archive_task = asyncio.create_task(self._run_archive(retention_days))
+    
+    async def _run_archive(self, retention_days: int):
+        # Month-sized copies stay off the event loop (and run in chunked transactions)
         try:
-            import asyncio
-            asyncio.run(self.notifier.send_message(
-                "🛑 Bot Stopped",
-                f"Total Profit: ${self.total_profit:.2f}\n"
-                f"Total Trades: {self.trade_count}"
-            ))
-        except:
-            pass
+            await asyncio.to_thread(self.database.cleanup_old_data, retention_days)
+        except Exception as e:
+            self.logger.error(f"History archival failed: {e}")
+    
+    def _beat(self):
+        """Publish a heartbeat with the current loop state"""
+        self.heartbeat.beat(
+            running=self.running,
+            paused=self.paused,
+            circuit_breaker=self.risk_manager.circuit_breaker_active
+        )
+    
+    def _publish_status(self):
+        """Push a status change to the dashboard"""
+        self.events.publish(STATUS, {
+            'running': self.running,
+            'paused': self.paused,
+            'mode': self.config['execution']['mode']
+        })
     
     def get_status(self) -> Dict:
         """Get bot status"""
@@ -497,14 +828,13 @@ class ArbitrageBot:
             'total_profit': self.total_profit,
             'trade_count': self.trade_count,
             'last_scan': self.last_scan_time.isoformat() if self.last_scan_time else None,
-            'mode': self.config['execution']['mode']
+            'mode': self.config['execution']['mode'],
+            'positions': self.positions.get_status()
         }
 
 
 def main():
     """Main entry point"""
-    import asyncio
-
     # ASCII art banner
     print("""
     ╔═══════════════════════════════════════╗
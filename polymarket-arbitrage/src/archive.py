@@ -0,0 +1,274 @@
+"""
+Partition Archive
+Monthly SQLite partitions for trade history instead of deleting it
+"""
+
+import gzip
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+ARCHIVED_TABLES = ('trades', 'opportunities')
+
+PARTITION_PATTERN = re.compile(r'^history_(\d{4})-(\d{2})\.db(\.gz)?$')
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class PartitionArchive:
+    """
+    Moves closed months of history into per-month SQLite files
+
+    Rotation works a whole month at a time, copying and deleting it in
+    short chunked transactions so writers are never locked out for
+    long; callers on an event loop should run rotate() in a thread. Old
+    partitions are gzip-compressed in place rather than dropped, and
+    iter_rows() fans queries out across them for backtesting and
+    historical analytics.
+    """
+
+    def __init__(self, db_path: str, archive_dir: str = "data/archive",
+                 compress_after_months: int = 3, chunk_rows: int = 500,
+                 chunk_pause: float = 0.01):
+        """
+        Initialize partition archive
+
+        Args:
+            db_path: Path to the live SQLite database
+            archive_dir: Directory holding monthly partition files
+            compress_after_months: Compress partitions older than this
+            chunk_rows: Rows moved per transaction
+            chunk_pause: Seconds between chunks
+        """
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path
+        self.archive_dir = Path(archive_dir)
+        self.compress_after_months = compress_after_months
+        self.chunk_rows = chunk_rows
+        self.chunk_pause = chunk_pause
+
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+
+    def partition_path(self, month: date, compressed: bool = False) -> Path:
+        name = f"history_{month:%Y-%m}.db"
+        return self.archive_dir / (name + '.gz' if compressed else name)
+
+    def partitions(self) -> List[Tuple[date, Path]]:
+        """List (month, path) for every partition, oldest first"""
+        found = []
+        for path in self.archive_dir.iterdir():
+            match = PARTITION_PATTERN.match(path.name)
+            if match:
+                found.append((date(int(match.group(1)), int(match.group(2)), 1), path))
+        return sorted(found)
+
+    def rotate(self, keep_days: int = 90, now: Optional[datetime] = None) -> int:
+        """
+        Archive every whole month older than keep_days
+
+        Args:
+            keep_days: Rows newer than this stay in the live database
+            now: Reference time (defaults to now)
+
+        Returns:
+            Number of rows moved into partitions
+        """
+        now = now or datetime.now()
+        cutoff_month = _month_start((now - timedelta(days=keep_days)).date())
+
+        with sqlite3.connect(self.db_path) as conn:
+            oldest = conn.execute("SELECT MIN(timestamp) FROM trades").fetchone()[0]
+            oldest_opp = conn.execute("SELECT MIN(timestamp) FROM opportunities").fetchone()[0]
+
+        candidates = [str(ts)[:10] for ts in (oldest, oldest_opp) if ts]
+        if not candidates:
+            return 0
+
+        month = _month_start(date.fromisoformat(min(candidates)))
+        moved = 0
+
+        # Only months that ended before the cutoff month are closed
+        while month < cutoff_month:
+            moved += self._archive_month(month)
+            month = _next_month(month)
+
+        self._compress_old(now.date())
+        return moved
+
+    def _archive_month(self, month: date) -> int:
+        """Move one month of rows into its partition file"""
+        compressed = self.partition_path(month, compressed=True)
+        if compressed.exists():
+            self._decompress(compressed)
+
+        path = self.partition_path(month)
+        start, end = month.isoformat(), _next_month(month).isoformat()
+        moved = 0
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            if not any(
+                conn.execute(
+                    f"SELECT 1 FROM {table} WHERE timestamp >= ? AND timestamp < ? LIMIT 1",
+                    (start, end)
+                ).fetchone()
+                for table in ARCHIVED_TABLES
+            ):
+                return 0  # Gap month; don't create an empty partition
+
+            conn.execute("ATTACH DATABASE ? AS part", (str(path),))
+            with conn:
+                for table in ARCHIVED_TABLES:
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS part.{table} AS SELECT * FROM main.{table} WHERE 0"
+                    )
+                    conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS part.idx_{table}_ts_id ON {table}(timestamp, id)"
+                    )
+            for table in ARCHIVED_TABLES:
+                moved += self._move_rows(conn, table, start, end)
+            conn.execute("DETACH DATABASE part")
+        finally:
+            conn.close()
+
+        if moved:
+            self.logger.info(f"Archived {moved} rows for {month:%Y-%m} -> {path.name}")
+        return moved
+
+    def _move_rows(self, conn: sqlite3.Connection, table: str, start: str, end: str) -> int:
+        """
+        Copy and delete [start, end) in chunk_rows transactions
+
+        Each chunk holds the write lock only briefly, and the pause
+        between chunks lets the bot's own inserts through.
+        """
+        chunk = f"""
+            SELECT id FROM main.{table}
+            WHERE timestamp >= ? AND timestamp < ?
+            ORDER BY timestamp, id LIMIT ?
+        """
+        moved = 0
+        while True:
+            # Take the write lock up front: upgrading from a read lock
+            # mid-transaction can deadlock with the bot's writer
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                cursor = conn.execute(f"""
+                    INSERT INTO part.{table}
+                    SELECT * FROM main.{table} WHERE id IN ({chunk})
+                """, (start, end, self.chunk_rows))
+                conn.execute(f"DELETE FROM main.{table} WHERE id IN ({chunk})",
+                             (start, end, self.chunk_rows))
+            moved += cursor.rowcount
+            if cursor.rowcount < self.chunk_rows:
+                return moved
+            time.sleep(self.chunk_pause)
+
+    def _compress_old(self, today: date):
+        """Gzip partitions older than compress_after_months"""
+        threshold = _month_start(today)
+        for _ in range(self.compress_after_months):
+            threshold = _month_start(threshold - timedelta(days=1))
+
+        for month, path in self.partitions():
+            if month < threshold and path.suffix == '.db':
+                gz_path = self.partition_path(month, compressed=True)
+                with open(path, 'rb') as src, gzip.open(gz_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                path.unlink()
+                self.logger.info(f"Compressed partition {gz_path.name}")
+
+    def _decompress(self, gz_path: Path) -> Path:
+        """Restore a compressed partition for writing"""
+        path = gz_path.with_suffix('')
+        with gzip.open(gz_path, 'rb') as src, open(path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        gz_path.unlink()
+        return path
+
+    @contextmanager
+    def _open_partition(self, path: Path):
+        """Open a partition read-only, inflating compressed ones to a temp file"""
+        temp_path = None
+        if path.suffix == '.gz':
+            fd, temp_path = tempfile.mkstemp(suffix='.db', dir=self.archive_dir)
+            with os.fdopen(fd, 'wb') as dst, gzip.open(path, 'rb') as src:
+                shutil.copyfileobj(src, dst)
+            path = Path(temp_path)
+
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+            if temp_path:
+                os.unlink(temp_path)
+
+    def iter_rows(self, table: str = 'trades', start: Optional[str] = None,
+                  end: Optional[str] = None, newest_first: bool = False) -> Iterator[Dict]:
+        """
+        Iterate rows across partitions and the live DB, oldest first
+
+        Only partitions overlapping [start, end) are opened.
+
+        Args:
+            table: 'trades' or 'opportunities'
+            start: Inclusive lower timestamp bound (ISO)
+            end: Exclusive upper timestamp bound (ISO)
+            newest_first: Live DB first, then partitions newest to oldest
+        """
+        if table not in ARCHIVED_TABLES:
+            raise ValueError(f"Not an archived table: {table}")
+
+        clauses = []
+        params = []
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "timestamp DESC, id DESC" if newest_first else "timestamp, id"
+        query = f"SELECT * FROM {table} {where} ORDER BY {order}"
+
+        if newest_first:
+            yield from self._iter_live(query, params)
+
+        partitions = self.partitions()
+        for month, path in reversed(partitions) if newest_first else partitions:
+            if start and _next_month(month).isoformat() <= start[:10]:
+                continue
+            if end and month.isoformat() >= end:
+                continue
+            with self._open_partition(path) as conn:
+                for row in conn.execute(query, params):
+                    yield dict(row)
+
+        if not newest_first:
+            yield from self._iter_live(query, params)
+
+    def _iter_live(self, query: str, params: List) -> Iterator[Dict]:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            for row in conn.execute(query, params):
+                yield dict(row)
+        finally:
+            conn.close()
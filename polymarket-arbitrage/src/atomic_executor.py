@@ -11,6 +11,9 @@ from decimal import Decimal
 from enum import Enum
 
 
+LEG_ORDER_TYPES = ('IOC', 'FOK', 'GTC')
+
+
 class ExecutionStatus(Enum):
     SUCCESS = "success"
     PARTIAL_FILL = "partial_fill"
@@ -20,6 +23,7 @@ class ExecutionStatus(Enum):
 
 @dataclass
 class OrderResult:
+    """One leg's outcome; sizes are USDC (shares = filled_size / fill_price)"""
     success: bool
     order_id: Optional[str]
     side: str
@@ -55,7 +59,8 @@ class ExecutionResult:
             'cost': float(self.actual_cost),
             'status': self.status.value,
             'reason': self.reason,
-            'timestamp': self.timestamp
+            'timestamp': self.timestamp,
+            'orders_sent': self.yes_order is not None or self.no_order is not None
         }
     
     def to_position(self) -> Dict:
@@ -74,19 +79,42 @@ class AtomicExecutor:
     
     def __init__(self, client, config: Dict):
         self.client = client
-        self.config = config
         self.logger = logging.getLogger(__name__)
         
+        # Set by the bot when redemptions are batched (amortises on-chain gas)
+        self.redemption_batcher = None
+        
+        self.apply_config(config)
+        
+        self.total_executions = 0
+        self.successful_executions = 0
+    
+    def apply_config(self, config: Dict):
+        """Load execution settings from config (called at init and on hot reload)"""
+        self.config = config
+        
         exec_config = config.get('execution', {})
         self.order_timeout = exec_config.get('order_timeout_seconds', 10)
         self.min_fill_ratio = Decimal(str(exec_config.get('min_fill_ratio', 0.80)))
         
+        # Time in force for both legs. IOC (Polymarket's FAK) fills what the book
+        # has at the limit and cancels the rest, so a missed leg never rests as a
+        # naked order; GTC legs would stay on the book until cancelled
+        leg_order_type = str(exec_config.get('leg_order_type', 'IOC')).upper()
+        if leg_order_type not in LEG_ORDER_TYPES:
+            self.logger.warning("Unknown execution.leg_order_type %r, using IOC", leg_order_type)
+            leg_order_type = 'IOC'
+        self.leg_order_type = leg_order_type
+        
         polymarket_config = config.get('polymarket', {})
         self.platform_fee = Decimal(str(polymarket_config.get('platform_fee', 0.02)))
         self.gas_estimate = Decimal(str(polymarket_config.get('gas_estimate', 0.05)))
-        
-        self.total_executions = 0
-        self.successful_executions = 0
+    
+    def gas_per_trade(self) -> Decimal:
+        """On-chain cost attributed to one trade"""
+        if self.redemption_batcher:
+            return self.redemption_batcher.gas_per_position()
+        return self.gas_estimate * 2
     
     async def execute_arbitrage(self, opportunity: Dict, position_size: Decimal) -> ExecutionResult:
         """Execute YES/NO arbitrage atomically"""
@@ -120,7 +148,7 @@ class AtomicExecutor:
             return await self._evaluate_execution(yes_result, no_result, opportunity, start_time)
             
         except Exception as e:
-            self.logger.error(f"Execution error: {e}")
+            self.logger.error("Execution error: %s", e)
             return ExecutionResult(
                 success=False, yes_order=None, no_order=None,
                 locked_profit=Decimal('0'), actual_cost=Decimal('0'),
@@ -155,12 +183,21 @@ class AtomicExecutor:
             return {'valid': False, 'reason': str(e)}
     
     async def _place_order(self, side: str, opportunity: Dict, size: Decimal) -> OrderResult:
-        """Place a single order"""
+        """
+        Place one leg of the arbitrage
+        
+        size is the USDC for the whole position. Only a YES+NO pair pays
+        $1, so both legs must buy the same number of shares: the position
+        buys size / (yes + no) pairs, and this leg spends that many shares
+        times its own price, i.e. size * price / (yes + no). Giving each
+        leg the full size would buy more shares of the cheaper side, left
+        unhedged.
+        """
         token_id = opportunity['yes_token_id'] if side == 'YES' else opportunity['no_token_id']
         price = Decimal(str(opportunity['yes_price'] if side == 'YES' else opportunity['no_price']))
         
-        if self.client.simulation_mode:
-            return self._simulate_order(side, size, price)
+        combined = Decimal(str(opportunity['yes_price'])) + Decimal(str(opportunity['no_price']))
+        size = size * price / combined
         
         try:
             result = await asyncio.wait_for(
@@ -173,7 +210,7 @@ class AtomicExecutor:
                 order_id=result.get('order_id'),
                 side=side,
                 requested_size=size,
-                filled_size=Decimal(str(result.get('filled_size', size))),
+                filled_size=Decimal(str(result.get('filled_size') or 0)),
                 fill_price=Decimal(str(result.get('fill_price', price))),
                 status=ExecutionStatus.SUCCESS if result.get('success') else ExecutionStatus.FAILED,
                 error=result.get('error')
@@ -189,27 +226,11 @@ class AtomicExecutor:
             'token_id': token_id,
             'side': 'buy',
             'size': float(size / price),
-            'price': float(price)
+            'price': float(price),
+            'order_type': self.leg_order_type
         }
         return await self.client.create_order(order_args)
     
-    def _simulate_order(self, side: str, size: Decimal, price: Decimal) -> OrderResult:
-        """Simulate order for dry run"""
-        import random
-        success = random.random() > 0.05
-        slippage = Decimal(str(random.uniform(0, 0.002)))
-        
-        return OrderResult(
-            success=success,
-            order_id=f"sim_{side}_{int(time.time())}",
-            side=side,
-            requested_size=size,
-            filled_size=size if success else Decimal('0'),
-            fill_price=price * (1 + slippage),
-            status=ExecutionStatus.SUCCESS if success else ExecutionStatus.FAILED,
-            error=None if success else 'Simulated failure'
-        )
-    
     def _failed_order(self, side: str, size: Decimal, error: str) -> OrderResult:
         """Create failed order result"""
         return OrderResult(
@@ -220,24 +241,32 @@ class AtomicExecutor:
     
     async def _evaluate_execution(self, yes_result: OrderResult, no_result: OrderResult,
                                   opportunity: Dict, start_time: float) -> ExecutionResult:
-        """Evaluate execution results"""
+        """
+        Evaluate execution results
+        
+        locked_profit is in USDC: the $1 payout of each hedged pair
+        (min of the two legs' shares) less both legs' USDC cost, the
+        platform fee on the payout and the gas attributed to the trade.
+        Shares bought beyond the hedged pairs count as cost with no payout.
+        """
         both_success = yes_result.success and no_result.success
         both_acceptable = yes_result.fill_ratio >= float(self.min_fill_ratio) and \
                          no_result.fill_ratio >= float(self.min_fill_ratio)
         
         if both_success and both_acceptable:
-            # Calculate locked profit
-            yes_cost = yes_result.filled_size
-            no_cost = no_result.filled_size * no_result.fill_price / yes_result.fill_price
-            total_cost = yes_cost + no_cost
+            # Calculate locked profit (filled_size is USDC spent on each leg)
+            yes_shares = yes_result.filled_size / yes_result.fill_price
+            no_shares = no_result.filled_size / no_result.fill_price
+            total_cost = yes_result.filled_size + no_result.filled_size
             
-            payout = min(yes_result.filled_size, no_result.filled_size)
+            # Each YES+NO pair pays out $1 at resolution
+            payout = min(yes_shares, no_shares)
             gross_profit = payout - total_cost
-            fees = self.platform_fee * payout + self.gas_estimate * 2
+            fees = self.platform_fee * payout + self.gas_per_trade()
             net_profit = gross_profit - fees
             
             self.successful_executions += 1
-            self.logger.info(f"✅ Arbitrage executed! Profit: ${net_profit:.4f}")
+            self.logger.info("✅ Arbitrage executed! Profit: $%.4f", net_profit)
             
             return ExecutionResult(
                 success=True, yes_order=yes_result, no_order=no_result,
@@ -253,7 +282,7 @@ class AtomicExecutor:
             await self._cancel_order(no_result.order_id)
         
         reason = f"YES: {yes_result.error or 'OK'}, NO: {no_result.error or 'OK'}"
-        self.logger.warning(f"❌ Execution failed: {reason}")
+        self.logger.warning("❌ Execution failed: %s", reason)
         
         return ExecutionResult(
             success=False, yes_order=yes_result, no_order=no_result,
@@ -265,8 +294,7 @@ class AtomicExecutor:
     async def _cancel_order(self, order_id: str):
         """Cancel an order"""
         try:
-            if not self.client.simulation_mode:
-                await self.client.cancel_order(order_id)
-            self.logger.info(f"Cancelled order: {order_id}")
+            await self.client.cancel_order(order_id)
+            self.logger.info("Cancelled order: %s", order_id)
         except Exception as e:
-            self.logger.error(f"Failed to cancel order {order_id}: {e}")
+            self.logger.error("Failed to cancel order %s: %s", order_id, e)
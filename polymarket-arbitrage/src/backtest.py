@@ -0,0 +1,540 @@
+"""
+Backtest / Replay Engine
+Runs the real YesNoArbitrageScanner and AtomicExecutor over recorded orderbooks
+
+Usage:
+    python src/backtest.py --config config/config.yaml --data data/orderbooks \
+        --start 2026-01-01 --end 2026-02-01 --set polymarket.min_net_margin=0.02
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import random
+import sys
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from atomic_executor import AtomicExecutor
+from orderbook_recorder import BOOK, MARKET, OrderbookReader
+from yes_no_arbitrage_scanner import YesNoArbitrageScanner
+
+
+def apply_overrides(config: Dict, overrides: Dict[str, object]) -> Dict:
+    """
+    Return a copy of config with dotted-key overrides applied
+
+    Example: {'polymarket.min_net_margin': 0.02}
+    """
+    config = copy.deepcopy(config)
+    for key, value in overrides.items():
+        section = config
+        *parents, leaf = key.split('.')
+        for name in parents:
+            section = section.setdefault(name, {})
+        section[leaf] = value
+    return config
+
+
+def token_ids(market: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """A recorded market's (YES, NO) token ids"""
+    yes_token = market.get('yes_token_id')
+    no_token = market.get('no_token_id')
+    if not yes_token and len(market.get('tokens') or []) >= 2:
+        yes_token = market['tokens'][0].get('token_id')
+        no_token = market['tokens'][1].get('token_id')
+    return yes_token, no_token
+
+
+class ReplayClient:
+    """
+    PolymarketClient stand-in backed by recorded data
+
+    State advances on a virtual clock. Market end times are rewritten
+    relative to the real clock so the scanner's time-remaining checks
+    see the same values they saw live. Orders fill against the book as
+    of (virtual now + sampled latency), walking ask levels up to the
+    limit price, so large orders partially fill. Filled liquidity is
+    removed from the book until the next recorded update for the token.
+    As in the bot's PositionBook, the USDC spent in a market stays
+    deployed until the market's end time passes on the virtual clock.
+    """
+
+    def __init__(self, records: Iterator[Tuple[float, int, Dict]], start: float,
+                 latency_ms: float = 150, latency_jitter_ms: float = 100,
+                 balance: float = 100.0, seed: int = 0):
+        """
+        Initialize replay client
+
+        Args:
+            records: (timestamp, kind, payload) records, in time order
+            start: Initial virtual time (epoch seconds)
+            latency_ms: Mean order latency
+            latency_jitter_ms: Uniform +/- jitter around the mean
+            balance: Starting USDC balance
+            seed: RNG seed for latency sampling
+        """
+        self.logger = logging.getLogger(__name__)
+        self.simulation_mode = False  # Exercise the executor's live order path
+        self.recorder = None
+
+        self.records = records
+        self.pending: deque = deque()  # Read ahead of the clock, not yet visible
+        self.exhausted = False
+        self.now = start
+
+        self.markets: Dict[str, Dict] = {}
+        self.books: Dict[str, Dict] = {}
+
+        self.latency = latency_ms / 1000
+        self.jitter = latency_jitter_ms / 1000
+        self.rng = random.Random(seed)
+
+        self.balance = balance
+        self.order_seq = 0
+        self.orders: List[Dict] = []
+        self.positions: Dict[str, Dict[str, float]] = {}  # token -> shares, cost
+        self.token_markets: Dict[str, str] = {}  # token -> market id
+        self.locked: Dict[str, float] = {}       # market id -> USDC spent, until it ends
+
+    # Virtual clock
+
+    def advance_to(self, timestamp: float):
+        """Apply every record up to timestamp"""
+        while True:
+            if not self.pending and not self._read_ahead():
+                break
+            if self.pending[0][0] > timestamp:
+                break
+            self._apply(*self.pending.popleft())
+        self.now = timestamp
+        self._release_ended()
+
+    def _read_ahead(self) -> bool:
+        if self.exhausted:
+            return False
+        try:
+            self.pending.append(next(self.records))
+            return True
+        except StopIteration:
+            self.exhausted = True
+            return False
+
+    def _apply(self, timestamp: float, kind: int, payload: Dict):
+        if kind == BOOK:
+            self.books[payload['token_id']] = payload
+        elif kind == MARKET:
+            key = str(payload.get('id') or payload.get('condition_id'))
+            self.markets[key] = payload
+            for token_id in token_ids(payload):
+                if token_id:
+                    self.token_markets[token_id] = key
+
+    def _release_ended(self):
+        """Free the capital of markets whose window has ended"""
+        for key in list(self.locked):
+            market = self.markets.get(key)
+            end_ts = self._end_time(market) if market else None
+            if end_ts is not None and end_ts <= self.now:
+                del self.locked[key]
+
+    @property
+    def deployed_capital(self) -> float:
+        """USDC spent in markets that have not ended yet"""
+        return sum(self.locked.values(), 0.0)
+
+    def _book_at(self, token_id: str, timestamp: float) -> Optional[Dict]:
+        """Book as it will be at a future virtual time (for latency-delayed fills)"""
+        while (not self.pending or self.pending[-1][0] <= timestamp) and self._read_ahead():
+            pass
+
+        book = self.books.get(token_id)
+        for record_ts, kind, payload in self.pending:
+            if record_ts > timestamp:
+                break
+            if kind == BOOK and payload['token_id'] == token_id:
+                book = payload
+        return book
+
+    def _end_time(self, market: Dict) -> Optional[float]:
+        end_time = market.get('end_date_iso') or market.get('end_time')
+        if not isinstance(end_time, str):
+            return None
+        try:
+            return datetime.fromisoformat(end_time.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+
+    def _as_live(self, market: Dict) -> Optional[Dict]:
+        """Copy of a recorded market with its end time shifted onto the real clock"""
+        end_ts = self._end_time(market)
+        if end_ts is None:
+            return dict(market)
+        remaining = end_ts - self.now
+        if remaining <= 0:
+            return None  # Resolved at this point in the replay
+
+        # Whole seconds + 0.5 so the scanner's int() truncation is stable
+        live_end = time.time() + round(remaining) + 0.5
+        market = dict(market)
+        market['end_date_iso'] = datetime.fromtimestamp(live_end, timezone.utc).isoformat()
+        market.pop('end_time', None)
+        return market
+
+    # PolymarketClient interface
+
+    def get_balance(self) -> Dict[str, float]:
+        return {
+            'balance': round(self.balance, 2),
+            'available': round(self.balance, 2),
+            'currency': 'USDC',
+            'locked': round(self.deployed_capital, 2)
+        }
+
+    async def get_markets(self, category: Optional[str] = None) -> List[Dict]:
+        markets = []
+        for market in self.markets.values():
+            if not market.get('active', False):
+                continue
+            if category and market.get('category') != category:
+                continue
+            live = self._as_live(market)
+            if live:
+                markets.append(live)
+        return markets
+
+    async def get_market(self, market_id: str) -> Optional[Dict]:
+        market = self.markets.get(str(market_id))
+        return self._as_live(market) if market else None
+
+    async def get_orderbook(self, token_id: str) -> Optional[Dict]:
+        book = self.books.get(token_id)
+        if not book:
+            return None
+        return {'bids': list(book['bids']), 'asks': list(book['asks'])}
+
+    async def create_order(self, order: Dict) -> Dict:
+        """
+        Fill a buy order against the book after simulated latency
+
+        Returns filled_size as USDC spent, matching AtomicExecutor's
+        dollar-denominated requested size.
+        """
+        self.order_seq += 1
+        order_id = f"replay_{self.order_seq}"
+        token_id = order['token_id']
+        limit = float(order['price'])
+        wanted = float(order['size'])
+
+        delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        book = self._book_at(token_id, self.now + delay)
+
+        filled = 0.0
+        cost = 0.0
+        if book:
+            remaining_asks = []
+            for level in book['asks']:
+                take = 0.0
+                if level['price'] <= limit + 1e-9 and filled < wanted:
+                    take = min(level['size'], wanted - filled)
+                    filled += take
+                    cost += take * level['price']
+                if level['size'] - take > 1e-9:
+                    remaining_asks.append({'price': level['price'], 'size': level['size'] - take})
+            book['asks'] = remaining_asks  # Consumed until the next recorded update
+
+        self.orders.append({
+            'order_id': order_id, 'token_id': token_id, 'limit': limit,
+            'requested': wanted, 'filled': filled, 'latency': delay
+        })
+
+        if filled <= 0:
+            return {'success': False, 'order_id': order_id, 'error': 'No liquidity at limit'}
+
+        position = self.positions.setdefault(token_id, {'shares': 0.0, 'cost': 0.0})
+        position['shares'] += filled
+        position['cost'] += cost
+        self.balance -= cost
+        market_key = self.token_markets.get(token_id, token_id)
+        self.locked[market_key] = self.locked.get(market_key, 0.0) + cost
+
+        return {
+            'success': True,
+            'order_id': order_id,
+            'filled_size': cost,
+            'fill_price': cost / filled
+        }
+
+    async def cancel_order(self, order_id: str) -> Dict:
+        # Orders never rest in the replay; fills already made stand
+        return {'success': True, 'order_id': order_id}
+
+
+@dataclass
+class BacktestResult:
+    """Summary of one replay run"""
+    overrides: Dict = field(default_factory=dict)
+    start: str = ''
+    end: str = ''
+    wall_seconds: float = 0.0
+    speedup: float = 0.0
+    scans: int = 0
+    raw_arbitrage: int = 0
+    opportunities: int = 0
+    executions: int = 0
+    successful: int = 0
+    missed_by_filters: int = 0
+    missed_edge: float = 0.0
+    failed_reasons: Dict[str, int] = field(default_factory=dict)
+    orders: int = 0
+    orders_filled: int = 0
+    orders_partial: int = 0
+    fill_rate: float = 0.0
+    avg_fill_ratio: float = 0.0
+    reported_profit: float = 0.0
+    pnl: float = 0.0
+    hedged_shares: float = 0.0
+    unhedged_value: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class BacktestEngine:
+    """Drives the scanner and executor over a ReplayClient"""
+
+    def __init__(self, config: Dict, reader: OrderbookReader,
+                 scan_interval: Optional[float] = None,
+                 latency_ms: float = 150, latency_jitter_ms: float = 100, seed: int = 0):
+        """
+        Initialize backtest engine
+
+        Args:
+            config: Bot configuration (overrides already applied)
+            reader: Recorded orderbook data
+            scan_interval: Virtual seconds between scans (default: scanner.scan_interval)
+            latency_ms: Mean simulated order latency
+            latency_jitter_ms: Latency jitter
+            seed: RNG seed
+        """
+        self.logger = logging.getLogger(__name__)
+        self.config = config
+        self.reader = reader
+        self.scan_interval = scan_interval or config.get('scanner', {}).get('scan_interval', 2)
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.seed = seed
+
+    async def run(self, start: Optional[float] = None, end: Optional[float] = None,
+                  overrides: Optional[Dict] = None) -> BacktestResult:
+        """
+        Replay [start, end) and collect statistics
+
+        Args:
+            start: Epoch seconds (default: first recorded record)
+            end: Epoch seconds (default: last recorded record)
+            overrides: Recorded in the result for reporting only
+        """
+        recorded = self.reader.time_range()
+        if not recorded:
+            raise ValueError(f"No recorded data in {self.reader.directory}")
+        start = start if start is not None else recorded[0]
+        end = end if end is not None else recorded[1] + self.scan_interval
+
+        capital = self.config.get('capital', {}).get('total_capital', 100)
+        client = ReplayClient(
+            self.reader.iter_records(None, end), start,
+            latency_ms=self.latency_ms, latency_jitter_ms=self.latency_jitter_ms,
+            balance=capital, seed=self.seed
+        )
+        scanner = YesNoArbitrageScanner(client, self.config)
+        executor = AtomicExecutor(client, self.config)
+
+        result = BacktestResult(
+            overrides=overrides or {},
+            start=datetime.fromtimestamp(start).isoformat(),
+            end=datetime.fromtimestamp(end).isoformat()
+        )
+        failures: Counter = Counter()
+        wall_started = time.time()
+
+        tick = start
+        while tick < end:
+            client.advance_to(tick)
+            result.scans += 1
+
+            opportunities = await scanner.scan_markets()
+            result.opportunities += len(opportunities)
+
+            # Mirror ArbitrageBot: best-scored first, one execution per cycle,
+            # sized from the capital not locked in unresolved markets
+            for opp in opportunities:
+                position_size = scanner.calculate_position_size(
+                    opp, deployed=Decimal(str(round(client.deployed_capital, 6))),
+                    capital=scanner.total_capital
+                )
+                if position_size < Decimal('1'):
+                    continue
+
+                result.executions += 1
+                outcome = await executor.execute_arbitrage(opp, position_size)
+                if outcome.success:
+                    result.successful += 1
+                    result.reported_profit += float(outcome.locked_profit)
+                    break
+                failures[outcome.reason[:80]] += 1
+
+            surfaced = {opp['market_id'] for opp in opportunities}
+            live_markets = await client.get_markets()
+            self._count_raw_arbitrage(client, scanner, live_markets, surfaced, result)
+
+            if client.exhausted and not client.pending and tick >= recorded[1]:
+                break
+            tick += self.scan_interval
+
+        result.wall_seconds = round(time.time() - wall_started, 3)
+        result.speedup = round((min(tick, end) - start) / max(result.wall_seconds, 1e-9), 1)
+        result.failed_reasons = dict(failures)
+        self._summarise_fills(client, executor, result)
+        return result
+
+    def _count_raw_arbitrage(self, client: ReplayClient, scanner: YesNoArbitrageScanner,
+                             markets: List[Dict], surfaced: set, result: BacktestResult):
+        """Count markets whose top-of-book summed below $1, and which the filters dropped"""
+        for market in scanner._filter_target_markets(markets):
+            market_id = market.get('id', market.get('condition_id', ''))
+            yes_token, no_token = token_ids(market)
+
+            yes_book = client.books.get(yes_token)
+            no_book = client.books.get(no_token)
+            if not yes_book or not no_book or not yes_book['asks'] or not no_book['asks']:
+                continue
+
+            yes_ask, no_ask = yes_book['asks'][0], no_book['asks'][0]
+            combined = yes_ask['price'] + no_ask['price']
+            if combined >= 1.0:
+                continue
+
+            result.raw_arbitrage += 1
+            if market_id not in surfaced:
+                result.missed_by_filters += 1
+                result.missed_edge += (1.0 - combined) * min(yes_ask['size'], no_ask['size'])
+
+    def _summarise_fills(self, client: ReplayClient, executor: AtomicExecutor,
+                         result: BacktestResult):
+        """Fill statistics and mark-to-market PnL from the replay ledger"""
+        orders = client.orders
+        result.orders = len(orders)
+        result.orders_filled = sum(1 for o in orders if o['filled'] >= o['requested'] - 1e-9)
+        result.orders_partial = sum(1 for o in orders if 0 < o['filled'] < o['requested'] - 1e-9)
+        if orders:
+            result.fill_rate = round(result.orders_filled / len(orders), 4)
+            result.avg_fill_ratio = round(
+                sum(o['filled'] / o['requested'] for o in orders if o['requested']) / len(orders), 4
+            )
+
+        # Pair each market's YES and NO holdings: pairs pay $1, leftovers are
+        # marked at the last recorded best bid
+        pnl = 0.0
+        hedged = 0.0
+        unhedged_value = 0.0
+        seen = set()
+        for market in client.markets.values():
+            yes_token, no_token = token_ids(market)
+
+            yes = client.positions.get(yes_token, {'shares': 0.0, 'cost': 0.0})
+            no = client.positions.get(no_token, {'shares': 0.0, 'cost': 0.0})
+            if not yes['shares'] and not no['shares']:
+                continue
+            seen.update((yes_token, no_token))
+
+            pairs = min(yes['shares'], no['shares'])
+            hedged += pairs
+            pnl += pairs * (1.0 - float(executor.platform_fee))
+            for token, position in ((yes_token, yes), (no_token, no)):
+                leftover = position['shares'] - pairs
+                unhedged_value += leftover * self._last_bid(client, token)
+                pnl -= position['cost']
+
+        for token, position in client.positions.items():
+            if token not in seen:
+                unhedged_value += position['shares'] * self._last_bid(client, token)
+                pnl -= position['cost']
+
+        filled_orders = sum(1 for o in orders if o['filled'] > 0)
+        pnl += unhedged_value - filled_orders * float(executor.gas_estimate)
+
+        result.pnl = round(pnl, 4)
+        result.hedged_shares = round(hedged, 4)
+        result.unhedged_value = round(unhedged_value, 4)
+        result.reported_profit = round(result.reported_profit, 4)
+        result.missed_edge = round(result.missed_edge, 4)
+
+    @staticmethod
+    def _last_bid(client: ReplayClient, token_id: str) -> float:
+        book = client.books.get(token_id)
+        if book and book['bids']:
+            return book['bids'][0]['price']
+        return 0.0
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Replay recorded orderbooks through the scanner/executor")
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--data', default='data/orderbooks', help='Recorder directory')
+    parser.add_argument('--start', help='ISO start time (default: first record)')
+    parser.add_argument('--end', help='ISO end time (default: last record)')
+    parser.add_argument('--scan-interval', type=float, help='Virtual seconds between scans')
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='Config override, e.g. polymarket.min_net_margin=0.02')
+    parser.add_argument('--json', help='Write the result to this file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Per-order failures are summarised in the report instead
+    logging.getLogger('atomic_executor').setLevel(logging.ERROR)
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition('=')
+        overrides[key] = yaml.safe_load(value)
+    config = apply_overrides(config, overrides)
+
+    engine = BacktestEngine(
+        config, OrderbookReader(args.data), scan_interval=args.scan_interval,
+        latency_ms=args.latency_ms, latency_jitter_ms=args.jitter_ms, seed=args.seed
+    )
+    try:
+        result = asyncio.run(engine.run(_parse_time(args.start), _parse_time(args.end), overrides))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    report = result.to_dict()
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Backup Manager
+Online SQLite backups that step through the database in small page batches
+"""
+
+import gzip
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class BackupManager:
+    """
+    Periodic online backup of the trades database
+
+    Uses the SQLite backup API, copying pages_per_step pages at a time and
+    sleeping between steps so the bot's writers can take the lock. A copy
+    finished this way is always consistent, unlike a plain file copy. Each
+    run reports its duration and how write latency during the backup
+    compared with the writes before it.
+    """
+
+    def __init__(self, database, backup_path: str = "data/backups/",
+                 interval_hours: float = 24, keep: int = 7,
+                 pages_per_step: int = 256, step_sleep: float = 0.005,
+                 compress: bool = True):
+        """
+        Initialize backup manager
+
+        Args:
+            database: Database instance to back up
+            backup_path: Directory for backup files
+            interval_hours: Hours between scheduled backups
+            keep: Number of backups to retain
+            pages_per_step: Pages copied per backup step
+            step_sleep: Seconds to yield to writers between steps
+            compress: Gzip finished backups
+        """
+        self.logger = logging.getLogger(__name__)
+        self.database = database
+        self.backup_dir = Path(backup_path)
+        self.interval = interval_hours * 3600
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.compress = compress
+
+        self.last_report: Optional[Dict] = None
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+
+    def start(self):
+        """Start the background scheduler"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+        self.thread.start()
+        self.logger.info(f"Database backups every {self.interval / 3600:g}h -> {self.backup_dir}")
+
+    def stop(self):
+        """Stop the scheduler (an in-progress backup finishes its current step)"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+
+    def _run(self):
+        # Wait out the interval since the newest backup, so restarts don't pile up backups
+        backups = self.list_backups()
+        if backups:
+            age = time.time() - backups[-1].stat().st_mtime
+            delay = max(0.0, self.interval - age)
+        else:
+            delay = 0.0
+
+        while not self.stop_event.wait(delay):
+            try:
+                self.run_backup()
+            except Exception as e:
+                self.logger.error(f"Database backup failed: {e}")
+            delay = self.interval
+
+    def run_backup(self) -> Dict:
+        """
+        Take one backup now
+
+        Returns:
+            Report with path, size, duration and write-latency impact
+        """
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        db_name = Path(self.database.db_path).stem
+        part_path = self.backup_dir / f"{db_name}-{stamp}.db.part"
+        steps = 0
+
+        def progress(status, remaining, total):
+            nonlocal steps
+            steps += 1
+            if self.stop_event.is_set():
+                raise InterruptedError("Backup cancelled")
+
+        started = time.time()
+        source = sqlite3.connect(self.database.db_path)
+        target = sqlite3.connect(str(part_path))
+        try:
+            source.backup(target, pages=self.pages_per_step, progress=progress,
+                          sleep=self.step_sleep)
+        except BaseException:
+            target.close()
+            part_path.unlink(missing_ok=True)
+            raise
+        finally:
+            source.close()
+        target.close()
+        copied_at = time.time()
+
+        if self.compress:
+            final_path = part_path.with_name(f"{db_name}-{stamp}.db.gz")
+            with open(part_path, 'rb') as src, gzip.open(final_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            part_path.unlink()
+        else:
+            final_path = part_path.with_suffix('')
+            part_path.rename(final_path)
+
+        finished = time.time()
+        self._apply_retention()
+
+        report = {
+            'path': str(final_path),
+            'size_bytes': final_path.stat().st_size,
+            'steps': steps,
+            'copy_seconds': round(copied_at - started, 3),
+            'duration_seconds': round(finished - started, 3),
+            'write_latency': self._write_impact(started, finished),
+            'finished_at': datetime.now().isoformat()
+        }
+        self.last_report = report
+
+        impact = report['write_latency']
+        self.logger.info(
+            f"Backup written: {final_path.name} ({report['size_bytes']} bytes, "
+            f"{report['duration_seconds']}s, {steps} steps); "
+            f"write p95 {impact['baseline_p95_ms']}ms -> {impact['during_p95_ms']}ms "
+            f"over {impact['writes_during']} writes"
+        )
+        return report
+
+    def _write_impact(self, started: float, finished: float) -> Dict:
+        """Compare write latency during the backup with the writes before it"""
+        baseline = self.database.write_latencies(until=started)
+        during = self.database.write_latencies(since=started, until=finished)
+
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+
+        return {
+            'writes_during': len(during),
+            'baseline_p95_ms': ms(_percentile(baseline, 95)),
+            'during_p95_ms': ms(_percentile(during, 95)),
+            'during_max_ms': ms(max(during) if during else None)
+        }
+
+    def list_backups(self) -> List[Path]:
+        """Finished backups, oldest first"""
+        db_name = Path(self.database.db_path).stem
+        return sorted(
+            path for path in self.backup_dir.glob(f"{db_name}-*.db*")
+            if not path.name.endswith('.part')
+        )
+
+    def _apply_retention(self):
+        backups = self.list_backups()
+        for path in backups[:max(0, len(backups) - self.keep)]:
+            path.unlink()
+            self.logger.info(f"Removed old backup {path.name}")
@@ -0,0 +1,249 @@
+"""
+Config Manager
+Validation, versioned atomic writes and change detection for config.yaml
+
+The dashboard writes config through write_config(): every version is
+also kept under config/history/ so a bad change can be rolled back.
+The bot polls the file with ConfigWatcher between scan cycles and
+applies the reloadable sections to its live components in place.
+"""
+
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+
+# Sections the dashboard may edit and the bot applies without a restart
+RELOADABLE_SECTIONS = ('polymarket', 'capital', 'risk_management', 'scanner', 'execution')
+
+# Keys inside reloadable sections that are only read at startup: the CLOB
+# connection, credentials and simulated exchange, and the execution mode
+# (a dry_run -> live flip must not happen in the middle of a run)
+RESTART_ONLY_KEYS = {
+    'polymarket': ('api_endpoint', 'chain_id', 'credential_cache', 'simulation'),
+    'execution': ('mode',),
+}
+
+DEFAULT_HISTORY_KEEP = 50
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def resolve_path(path) -> Path:
+    """
+    Resolve a path from config against the project root
+
+    The bot and the dashboard run from different working directories,
+    so relative paths shared between them (sockets, heartbeat, profiler
+    requests) must not depend on the CWD.
+    """
+    path = Path(path).expanduser()
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def validate_settings(settings: dict) -> tuple[bool, str]:
+    """
+    Validate settings before saving to config.
+    Returns (is_valid, error_message)
+    """
+    # Define allowed fields and their validation rules
+    validators = {
+        'execution': {
+            'mode': lambda v: v in ['live', 'dry_run'],
+            'max_slippage': lambda v: isinstance(v, (int, float)) and 0 <= v <= 0.1,
+            'order_timeout': lambda v: isinstance(v, int) and 1 <= v <= 60,
+            'max_retries': lambda v: isinstance(v, int) and 0 <= v <= 10,
+        },
+        'polymarket': {
+            'max_position_size': lambda v: isinstance(v, (int, float)) and 0 < v <= 1000,
+            'min_gross_margin': lambda v: isinstance(v, (int, float)) and 0 < v <= 0.5,
+            'min_net_margin': lambda v: isinstance(v, (int, float)) and 0 < v <= 0.5,
+            'min_dollar_profit': lambda v: isinstance(v, (int, float)) and 0 < v <= 100,
+            'slippage_tolerance': lambda v: isinstance(v, (int, float)) and 0 <= v <= 0.1,
+        },
+        'scanner': {
+            'scan_interval': lambda v: isinstance(v, int) and 1 <= v <= 60,
+            'min_liquidity': lambda v: isinstance(v, (int, float)) and v >= 0,
+            'max_spread': lambda v: isinstance(v, (int, float)) and 0 < v <= 0.2,
+        },
+        'capital': {
+            'total_capital': lambda v: isinstance(v, (int, float)) and v > 0,
+            'max_single_position': lambda v: isinstance(v, (int, float)) and v > 0,
+        },
+        'risk_management': {
+            'max_daily_loss': lambda v: isinstance(v, (int, float)) and v > 0,
+            'max_open_positions': lambda v: isinstance(v, int) and v > 0,
+        }
+    }
+
+    for section, fields in settings.items():
+        if section not in validators:
+            return False, f"Unknown config section: {section}"
+
+        if not isinstance(fields, dict):
+            return False, f"Invalid format for section: {section}"
+
+        for field, value in fields.items():
+            if field in validators[section]:
+                if not validators[section][field](value):
+                    return False, f"Invalid value for {section}.{field}: {value}"
+
+    return True, ""
+
+
+def validate_config(config: Dict) -> Tuple[bool, str]:
+    """Validate the reloadable sections of a full config"""
+    if not isinstance(config, dict):
+        return False, "Config is not a mapping"
+    return validate_settings({s: config[s] for s in RELOADABLE_SECTIONS if s in config})
+
+
+def restart_only_changes(old: Dict, new: Dict) -> List[str]:
+    """'section.key' for each RESTART_ONLY_KEYS value that differs between two configs"""
+    changed = []
+    for section, keys in RESTART_ONLY_KEYS.items():
+        old_section, new_section = old.get(section) or {}, new.get(section) or {}
+        for key in keys:
+            if key in new_section and old_section.get(key) != new_section[key]:
+                changed.append(f"{section}.{key}")
+    return changed
+
+
+def history_dir_for(config_path: Path) -> Path:
+    return Path(config_path).parent / "history"
+
+
+def write_config(config_path: Path, config: Dict, source: str = "",
+                 keep: int = DEFAULT_HISTORY_KEEP) -> int:
+    """
+    Atomically replace config_path and record the new version in history
+
+    The file is written to a temp file in the same directory and renamed
+    over the original, so the bot's watcher never reads a half-written
+    file.
+
+    Args:
+        config_path: config.yaml to replace
+        config: Full config to write
+        source: Who made the change (stored in the history file header)
+        keep: Number of history versions to retain
+
+    Returns:
+        The new version number
+    """
+    config_path = Path(config_path)
+    text = yaml.dump(config, default_flow_style=False)
+
+    history_dir = history_dir_for(config_path)
+    history_dir.mkdir(parents=True, exist_ok=True)
+    versions = list_versions(config_path)
+    version = versions[-1]['version'] + 1 if versions else 1
+    header = f"# version {version} | {datetime.now().isoformat(timespec='seconds')} | {source}\n"
+    (history_dir / f"config-{version:05d}.yaml").write_text(header + text)
+
+    fd, tmp_path = tempfile.mkstemp(dir=str(config_path.parent), prefix=".config-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        if config_path.exists():
+            os.chmod(tmp_path, config_path.stat().st_mode & 0o777)
+        os.replace(tmp_path, config_path)
+    except BaseException:
+        Path(tmp_path).unlink(missing_ok=True)
+        raise
+
+    for old in versions[:max(0, len(versions) + 1 - keep)]:
+        old['path'].unlink(missing_ok=True)
+    return version
+
+
+def list_versions(config_path: Path) -> List[Dict]:
+    """History entries (version, saved_at, source, path), oldest first"""
+    entries = []
+    for path in sorted(history_dir_for(config_path).glob("config-*.yaml")):
+        try:
+            version = int(path.stem.split('-')[1])
+            with open(path) as f:
+                header = f.readline()
+        except (ValueError, OSError):
+            continue
+        parts = [p.strip() for p in header.lstrip('#').split('|')]
+        entries.append({
+            'version': version,
+            'saved_at': parts[1] if len(parts) > 1 else None,
+            'source': parts[2] if len(parts) > 2 else '',
+            'path': path,
+        })
+    return entries
+
+
+def load_version(config_path: Path, version: int) -> Optional[Dict]:
+    """Config stored as `version`, or None if it is not in history"""
+    path = history_dir_for(config_path) / f"config-{version:05d}.yaml"
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+class ConfigWatcher:
+    """
+    Detects changes to a config file by polling its mtime and size
+
+    Polling is one os.stat() per check, cheap enough to do every scan
+    cycle, and needs no inotify/fsevents dependency. Both write_config()
+    and editors that save via rename are picked up.
+    """
+
+    def __init__(self, path: str, load: Callable[[str], Dict], interval: float = 2.0):
+        """
+        Initialize watcher
+
+        Args:
+            path: Config file to watch
+            load: Reads and parses the file (may raise)
+            interval: Minimum seconds between stat() calls
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.load = load
+        self.interval = interval
+        self.last_checked = 0.0
+        self.signature = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def poll(self, now: float) -> Optional[Dict]:
+        """
+        Check for a change
+
+        Args:
+            now: Current time.time()
+
+        Returns:
+            The newly loaded config if the file changed, else None
+        """
+        if now - self.last_checked < self.interval:
+            return None
+        self.last_checked = now
+
+        signature = self._stat()
+        if signature is None or signature == self.signature:
+            return None
+        self.signature = signature
+
+        try:
+            return self.load(self.path)
+        except Exception as e:
+            self.logger.error(f"Config changed but could not be loaded, keeping current: {e}")
+            return None
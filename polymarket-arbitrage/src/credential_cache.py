@@ -0,0 +1,116 @@
+"""
+Credential Cache
+Keeps derived Polymarket API credentials on disk between restarts
+
+Deriving L2 credentials (derive_api_key) is a signed network round trip
+on every start. The result is stable for a given wallet, so it is
+cached in a 0600 file with an expiry, keyed by a fingerprint of the
+wallet and endpoint so a key change is never served stale creds.
+
+If `cryptography` is installed and POLYMARKET_CREDS_KEY holds a Fernet
+key, the file is encrypted; otherwise it relies on file permissions.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_CREDS_PATH = "data/api_creds.json"
+ENCRYPTION_KEY_ENV = "POLYMARKET_CREDS_KEY"
+
+
+def fingerprint(private_key: str, host: str, chain_id: int) -> str:
+    """Stable identifier for one wallet on one endpoint (never the key itself)"""
+    return hashlib.sha256(f"{private_key}|{host}|{chain_id}".encode()).hexdigest()
+
+
+class CredentialCache:
+    """Derived API credentials stored in one small JSON (or Fernet) file"""
+
+    def __init__(self, path: str = DEFAULT_CREDS_PATH, ttl_hours: float = 24 * 7,
+                 encryption_key: Optional[str] = None):
+        """
+        Initialize credential cache
+
+        Args:
+            path: Cache file
+            ttl_hours: Cached credentials older than this are re-derived
+            encryption_key: Fernet key (defaults to $POLYMARKET_CREDS_KEY)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.ttl = ttl_hours * 3600
+        self.fernet = None
+
+        encryption_key = encryption_key or os.getenv(ENCRYPTION_KEY_ENV)
+        if encryption_key:
+            try:
+                from cryptography.fernet import Fernet
+                self.fernet = Fernet(encryption_key.encode())
+            except ImportError:
+                self.logger.warning(f"{ENCRYPTION_KEY_ENV} set but cryptography is not installed; "
+                                    "credential cache is protected by file permissions only")
+            except ValueError as e:
+                self.logger.warning(f"Invalid {ENCRYPTION_KEY_ENV} ({e}); credential cache disabled")
+                self.path = None
+
+    def load(self, key: str) -> Optional[Dict[str, str]]:
+        """
+        Cached credentials for a fingerprint
+
+        Returns:
+            Dict with api_key, api_secret, api_passphrase, or None if
+            missing, expired, unreadable or for another wallet
+        """
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            raw = self.path.read_bytes()
+            if self.fernet:
+                raw = self.fernet.decrypt(raw)
+            entry = json.loads(raw)
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable credential cache: {e}")
+            return None
+
+        if entry.get('fingerprint') != key:
+            return None
+        if time.time() >= entry.get('expires_at', 0):
+            self.logger.info("Cached API credentials expired")
+            return None
+        return entry.get('creds')
+
+    def store(self, key: str, creds: Dict[str, str]):
+        """Write credentials atomically, readable by the owner only"""
+        if self.path is None:
+            return
+        entry = {
+            'fingerprint': key,
+            'created_at': time.time(),
+            'expires_at': time.time() + self.ttl,
+            'creds': creds,
+        }
+        raw = json.dumps(entry).encode()
+        if self.fernet:
+            raw = self.fernet.encrypt(raw)
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(raw)
+            os.chmod(tmp_path, 0o600)  # O_CREAT mode does not apply to an existing file
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not write credential cache: {e}")
+
+    def clear(self):
+        """Drop cached credentials (e.g. after the API rejects them)"""
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
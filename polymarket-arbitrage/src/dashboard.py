@@ -12,16 +12,29 @@ import sqlite3
 import sys
 import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 from pathlib import Path
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
 
-import plotly
-import plotly.graph_objs as go
 import yaml
 from flask import Flask, jsonify, render_template, request, session
 from flask_socketio import SocketIO, emit
 
+from database import Database
+from event_bus import DEFAULT_SOCKET_PATH, OPPORTUNITY, STATUS, TRADE, EventSubscriber
+from heartbeat import DEFAULT_HEARTBEAT_PATH, HeartbeatReader
+from log_tail import LogTail
+from config_manager import (list_versions, load_version, resolve_path, restart_only_changes,
+                            validate_config, validate_settings, write_config)
+from metrics import DEFAULT_METRICS_HOST, DEFAULT_METRICS_PORT
+from profiler import DEFAULT_PROFILE_DIR, DEFAULT_REQUEST_PATH
+from trade_export import FORMATS as EXPORT_FORMATS
+from trade_export import archived_months, parse_date_bound, stream_columnar, stream_csv
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -33,6 +46,23 @@ CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
 AUDIT_LOG_PATH = PROJECT_ROOT / "logs" / "audit.log"
 PID_FILE = PROJECT_ROOT / ".bot.pid"
 
+
+def read_config_section(section: str) -> dict:
+    """One section of config.yaml ({} if the file or section is missing)"""
+    try:
+        with open(str(CONFIG_PATH)) as f:
+            return (yaml.safe_load(f) or {}).get(section) or {}
+    except Exception:
+        return {}
+
+
+# Paths shared with the bot come from the same config, resolved against the project root
+EVENT_SOCKET_PATH = resolve_path(read_config_section('events').get('socket_path', DEFAULT_SOCKET_PATH))
+HEARTBEAT_PATH = resolve_path(read_config_section('heartbeat').get('path', DEFAULT_HEARTBEAT_PATH))
+PROFILE_DIR = resolve_path(read_config_section('profiling').get('output_dir', DEFAULT_PROFILE_DIR))
+PROFILE_REQUEST_PATH = resolve_path(read_config_section('profiling').get('request_path', DEFAULT_REQUEST_PATH))
+ARCHIVE_PATH = resolve_path(read_config_section('database').get('archive_path', 'data/archive/'))
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('DASHBOARD_SECRET_KEY', secrets.token_hex(32))
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Disable caching
@@ -40,6 +70,19 @@ app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0  # Disable caching
 # Initialize SocketIO
 socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
+# Trades database (ensures schema and pagination indexes exist)
+database = Database(str(DB_PATH), archive_dir=str(ARCHIVE_PATH))
+
+# Incremental analytics over the trades database
+analytics_engine = database.analytics
+
+# Bot liveness via the shared heartbeat file
+heartbeat_reader = HeartbeatReader(str(HEARTBEAT_PATH))
+
+# Incremental tail of the bot log; /api/logs can only see this many recent entries
+LOG_TAIL_WINDOW = int(read_config_section('logging').get('tail_window', 1000))
+log_tail = LogTail(str(LOG_PATH), max_lines=LOG_TAIL_WINDOW)
+
 # Setup audit logging
 audit_logger = logging.getLogger('audit')
 audit_handler = logging.FileHandler(AUDIT_LOG_PATH)
@@ -68,54 +111,23 @@ def require_local_access(f):
     return decorated_function
 
 
-def validate_settings(settings: dict) -> tuple[bool, str]:
+def get_bot_liveness():
     """
-    Validate settings before saving to config.
-    Returns (is_valid, error_message)
-    """
-    # Define allowed fields and their validation rules
-    validators = {
-        'execution': {
-            'mode': lambda v: v in ['live', 'dry_run'],
-            'max_slippage': lambda v: isinstance(v, (int, float)) and 0 <= v <= 0.1,
-            'order_timeout': lambda v: isinstance(v, int) and 1 <= v <= 60,
-            'max_retries': lambda v: isinstance(v, int) and 0 <= v <= 10,
-        },
-        'polymarket': {
-            'max_position_size': lambda v: isinstance(v, (int, float)) and 0 < v <= 1000,
-            'min_gross_margin': lambda v: isinstance(v, (int, float)) and 0 < v <= 0.5,
-            'min_net_margin': lambda v: isinstance(v, (int, float)) and 0 < v <= 0.5,
-            'min_dollar_profit': lambda v: isinstance(v, (int, float)) and 0 < v <= 100,
-            'slippage_tolerance': lambda v: isinstance(v, (int, float)) and 0 <= v <= 0.1,
-        },
-        'scanner': {
-            'scan_interval': lambda v: isinstance(v, int) and 1 <= v <= 60,
-            'min_liquidity': lambda v: isinstance(v, (int, float)) and v >= 0,
-            'max_spread': lambda v: isinstance(v, (int, float)) and 0 < v <= 0.2,
-        },
-        'capital': {
-            'total_capital': lambda v: isinstance(v, (int, float)) and v > 0,
-            'max_single_position': lambda v: isinstance(v, (int, float)) and v > 0,
-        },
-        'risk_management': {
-            'max_daily_loss': lambda v: isinstance(v, (int, float)) and v > 0,
-            'max_open_positions': lambda v: isinstance(v, int) and v > 0,
-        }
-    }
+    Read bot liveness from the heartbeat file
     
-    for section, fields in settings.items():
-        if section not in validators:
-            return False, f"Unknown config section: {section}"
-        
-        if not isinstance(fields, dict):
-            return False, f"Invalid format for section: {section}"
-        
-        for field, value in fields.items():
-            if field in validators[section]:
-                if not validators[section][field](value):
-                    return False, f"Invalid value for {section}.{field}: {value}"
-    
-    return True, ""
+    Returns:
+        Tuple of (is_running, heartbeat dict or None)
+    """
+    heartbeat = heartbeat_reader.read()
+    return bool(heartbeat and heartbeat['alive']), heartbeat
+
+
+def get_metrics_url() -> str:
+    """Base URL of the bot's metrics endpoint, from the metrics config section"""
+    metrics_config = read_config_section('metrics')
+    host = metrics_config.get('host', DEFAULT_METRICS_HOST)
+    port = metrics_config.get('port', DEFAULT_METRICS_PORT)
+    return f"http://{host}:{port}"
 
 
 def get_db_connection():
@@ -135,22 +147,8 @@ def index():
 def api_status():
     """Get bot status"""
     try:
-        # Check if bot is running by checking process
-        import subprocess
-        try:
-            result = subprocess.run(
-                ['pgrep', '-f', 'arbitrage_bot.py'],
-                capture_output=True,
-                text=True
-            )
-            is_running = bool(result.stdout.strip())
-        except:
-            # Fallback to log file check
-            if LOG_PATH.exists():
-                log_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(str(LOG_PATH)))
-                is_running = log_age.total_seconds() < 300  # Updated in last 5 minutes
-            else:
-                is_running = False
+        # Liveness from the bot's heartbeat file (no process spawn)
+        is_running, heartbeat = get_bot_liveness()
         
         # Get stats from database
         conn = get_db_connection()
@@ -185,7 +183,8 @@ def api_status():
         
         return jsonify({
             'running': is_running,
-            'mode': 'dry_run',  # TODO: Read from config
+            'mode': heartbeat['mode'] if heartbeat else 'dry_run',
+            'heartbeat': heartbeat,
             'today': {
                 'trades': today['total_trades'] or 0,
                 'wins': today['winning_trades'] or 0,
@@ -205,171 +204,239 @@ def api_status():
         return jsonify({'error': str(e)}), 500
 
 
+TRADE_COLUMNS = ('market_name', 'trade_type', 'expected_profit', 'actual_profit', 'status', 'simulated')
+OPPORTUNITY_COLUMNS = ('market_name', 'opportunity_type', 'expected_profit', 'executed')
+MAX_PAGE_SIZE = 500
+
+
+def _format_trade(row: dict) -> dict:
+    """Compact trade row for JSON responses"""
+    return {
+        'id': row['id'],
+        'timestamp': row['timestamp'],
+        'market': row['market_name'],
+        'type': row['trade_type'],
+        'expected_profit': round(row['expected_profit'] or 0, 2),
+        'actual_profit': round(row['actual_profit'] or 0, 2),
+        'status': row['status'],
+        'simulated': bool(row['simulated'])
+    }
+
+
+def _bool_arg(name: str):
+    """Parse an optional boolean query parameter"""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _paged_response(items: list, next_cursor):
+    """List body with the next-page cursor in headers"""
+    response = jsonify(items)
+    months = archived_months(str(ARCHIVE_PATH))
+    if months:
+        # Pages cover the live DB only, not rotated-out months
+        response.headers['X-Archived-Months'] = ','.join(months)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    return response
+
+
 @app.route('/api/trades')
 def api_trades():
-    """Get recent trades"""
+    """
+    Get trades, newest first
+    
+    Query params: limit, cursor (from X-Next-Cursor), market_id, status,
+    simulated, type
+    
+    Archived months are not paged; X-Archived-Months lists them.
+    """
     try:
-        limit = int(request.args.get('limit', 50))
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                id,
-                timestamp,
-                market_name,
-                trade_type,
-                expected_profit,
-                actual_profit,
-                status,
-                simulated
-            FROM trades
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        
-        trades = []
-        for row in cursor.fetchall():
-            trades.append({
-                'id': row['id'],
-                'timestamp': row['timestamp'],
-                'market': row['market_name'],
-                'type': row['trade_type'],
-                'expected_profit': round(row['expected_profit'] or 0, 2),
-                'actual_profit': round(row['actual_profit'] or 0, 2),
-                'status': row['status'],
-                'simulated': bool(row['simulated'])
-            })
-        
-        conn.close()
+        limit = min(int(request.args.get('limit', 50)), MAX_PAGE_SIZE)
+        
+        rows, next_cursor = database.get_trades(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            market_id=request.args.get('market_id'),
+            status=request.args.get('status'),
+            simulated=_bool_arg('simulated'),
+            trade_type=request.args.get('type'),
+            columns=TRADE_COLUMNS
+        )
         
-        return jsonify(trades)
+        return _paged_response([_format_trade(row) for row in rows], next_cursor)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+# Chart payload cache: days -> (etag, payload), least recently used evicted
+CHART_CACHE = OrderedDict()
+CHART_CACHE_SIZE = 8
+MAX_CHART_DAYS = 365
+
+
 @app.route('/api/chart/profit')
 def api_chart_profit():
-    """Get profit chart data"""
+    """
+    Get daily profit series for client-side charting
+    
+    Served from the daily rollups. The ETag changes only when a trade is
+    added (or the day rolls over), so unchanged charts cost a 304.
+    Pass format=plotly for a server-built Plotly figure (needs plotly).
+    """
     try:
-        days = int(request.args.get('days', 7))
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        days = max(1, min(int(request.args.get('days', 7)), MAX_CHART_DAYS))
         
-        cursor.execute("""
-            SELECT 
-                date(timestamp) as day,
-                SUM(actual_profit) as profit,
-                COUNT(*) as trades
-            FROM trades
-            WHERE timestamp >= date('now', '-' || ? || ' days')
-            GROUP BY date(timestamp)
-            ORDER BY day ASC
-        """, (days,))
+        if request.args.get('format') == 'plotly':
+            return api_chart_profit_plotly(days)
         
-        data = cursor.fetchall()
+        conn = get_db_connection()
+        last_trade_id = conn.execute("SELECT MAX(id) FROM trades").fetchone()[0] or 0
         conn.close()
         
-        dates = [row['day'] for row in data]
-        profits = [row['profit'] or 0 for row in data]
-        trades = [row['trades'] for row in data]
-        
-        # Create Plotly chart
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=dates,
-            y=profits,
-            name='Daily Profit',
-            marker_color=['green' if p >= 0 else 'red' for p in profits]
-        ))
-        
-        fig.update_layout(
-            title=f'Profit/Loss - Last {days} Days',
-            xaxis_title='Date',
-            yaxis_title='Profit (USDC)',
-            hovermode='x unified',
-            template='plotly_dark'
-        )
+        etag = f"profit-{days}-{last_trade_id}-{datetime.now().date().isoformat()}"
         
-        return jsonify(json.loads(fig.to_json()))
+        if etag in request.if_none_match:
+            response = app.response_class(status=304)
+        else:
+            cached = CHART_CACHE.get(days)
+            if cached and cached[0] == etag:
+                CHART_CACHE.move_to_end(days)
+                payload = cached[1]
+            else:
+                dates, profits, trades = analytics_engine.get_daily_series(days)
+                payload = {
+                    'days': days,
+                    'dates': dates,
+                    'profits': [round(p, 4) for p in profits],
+                    'trades': trades
+                }
+                CHART_CACHE[days] = (etag, payload)
+                CHART_CACHE.move_to_end(days)
+                while len(CHART_CACHE) > CHART_CACHE_SIZE:
+                    CHART_CACHE.popitem(last=False)
+            response = jsonify(payload)
+        
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+def api_chart_profit_plotly(days: int):
+    """Legacy server-rendered Plotly figure (plotly is an optional import)"""
+    try:
+        import plotly.graph_objs as go
+    except ImportError:
+        return jsonify({'error': 'plotly is not installed'}), 501
+    
+    dates, profits, _ = analytics_engine.get_daily_series(days)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        x=dates,
+        y=profits,
+        name='Daily Profit',
+        marker_color=['green' if p >= 0 else 'red' for p in profits]
+    ))
+    
+    fig.update_layout(
+        title=f'Profit/Loss - Last {days} Days',
+        xaxis_title='Date',
+        yaxis_title='Profit (USDC)',
+        hovermode='x unified',
+        template='plotly_dark'
+    )
+    
+    return app.response_class(fig.to_json(), mimetype='application/json')
+
+
 @app.route('/api/logs')
 def api_logs():
-    """Get recent log entries"""
+    """
+    Get recent log entries, optionally filtered by level/module
+    
+    Only the last LOG_TAIL_WINDOW entries (logging.tail_window) are kept,
+    so `lines` is capped at that and level/module filters search that
+    window, not the whole file. X-Log-Window reports the window size.
+    """
     try:
-        lines = int(request.args.get('lines', 100))
-        
-        if not LOG_PATH.exists():
-            return jsonify([])
-        
-        # Read last N lines
-        with open(str(LOG_PATH), 'r') as f:
-            log_lines = f.readlines()
-        
-        recent_lines = log_lines[-lines:]
-        
-        # Parse and format
-        logs = []
-        for line in recent_lines:
-            # Parse log format: "2026-01-31 10:36:47,947 - module - LEVEL - message"
-            parts = line.split(' - ', 3)
-            if len(parts) >= 4:
-                logs.append({
-                    'timestamp': parts[0],
-                    'module': parts[1],
-                    'level': parts[2],
-                    'message': parts[3].strip()
-                })
+        lines = max(1, min(int(request.args.get('lines', 100)), LOG_TAIL_WINDOW))
+        level = request.args.get('level')
+        module = request.args.get('module')
         
-        return jsonify(logs)
+        response = jsonify(log_tail.tail(lines, level=level, module=module))
+        response.headers['X-Log-Window'] = str(LOG_TAIL_WINDOW)
+        return response
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/metrics')
+def api_metrics():
+    """
+    Bot metrics, proxied from its local metrics endpoint
+    
+    Query params: format=prometheus for the raw text exposition
+    """
+    raw = request.args.get('format') == 'prometheus'
+    url = get_metrics_url() + ('/metrics' if raw else '/metrics.json')
+    try:
+        with urlopen(url, timeout=2) as response:
+            body = response.read()
+    except (URLError, OSError) as e:
+        return jsonify({'error': f'Bot metrics unavailable: {e}'}), 503
+    
+    if raw:
+        return app.response_class(body, mimetype='text/plain')
+    return app.response_class(body, mimetype='application/json')
+
+
 @app.route('/api/opportunities')
 def api_opportunities():
-    """Get recent opportunities (detected but not necessarily executed)"""
+    """
+    Get opportunities (detected but not necessarily executed), newest first
+    
+    Query params: limit, cursor (from X-Next-Cursor), market_id, type,
+    executed
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                id,
-                timestamp,
-                market_name,
-                opportunity_type,
-                expected_profit,
-                executed
-            FROM opportunities
-            ORDER BY timestamp DESC
-            LIMIT 50
-        """)
-        
-        opportunities = []
-        for row in cursor.fetchall():
-            opportunities.append({
-                'id': row['id'],
-                'timestamp': row['timestamp'],
-                'market': row['market_name'],
-                'type': row['opportunity_type'],
-                'expected_profit': round(row['expected_profit'] or 0, 2),
-                'executed': bool(row['executed'])
-            })
+        limit = min(int(request.args.get('limit', 50)), MAX_PAGE_SIZE)
+        
+        rows, next_cursor = database.get_opportunities(
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            market_id=request.args.get('market_id'),
+            opportunity_type=request.args.get('type'),
+            executed=_bool_arg('executed'),
+            columns=OPPORTUNITY_COLUMNS
+        )
         
-        conn.close()
+        opportunities = [{
+            'id': row['id'],
+            'timestamp': row['timestamp'],
+            'market': row['market_name'],
+            'type': row['opportunity_type'],
+            'expected_profit': round(row['expected_profit'] or 0, 2),
+            'executed': bool(row['executed'])
+        } for row in rows]
         
-        return jsonify(opportunities)
+        return _paged_response(opportunities, next_cursor)
         
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -455,15 +522,11 @@ def api_bot_stop():
             except (ProcessLookupError, ValueError):
                 pass  # Process already dead or invalid PID
         else:
-            # Fallback to pkill only if no PID file
-            result = subprocess.run(
-                ['pgrep', '-f', 'arbitrage_bot.py'],
-                capture_output=True,
-                text=True
-            )
-            if result.stdout.strip():
-                pid = result.stdout.strip().split()[0]
-                os.kill(int(pid), 15)
+            # Fallback to the PID published in the heartbeat
+            is_running, heartbeat = get_bot_liveness()
+            if is_running:
+                pid = heartbeat['pid']
+                os.kill(pid, 15)
         
         BOT_PROCESS = None
         BOT_STATUS = 'stopped'
@@ -530,6 +593,73 @@ def api_bot_pause():
         }), 500
 
 
+@app.route('/api/bot/profile', methods=['POST'])
+@require_local_access
+def api_bot_profile():
+    """
+    Profile the running bot without stopping it (SIGUSR2)
+    
+    JSON body: mode ('sample' for N seconds of stack samples, 'scan' for
+    cProfile of the next scan cycle), seconds (sample mode, default 10)
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        mode = data.get('mode', 'sample')
+        if mode not in ('sample', 'scan'):
+            return jsonify({'success': False, 'error': "mode must be 'sample' or 'scan'"}), 400
+        try:
+            seconds = float(data.get('seconds', 10))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'seconds must be a number'}), 400
+        if not 0 < seconds <= 300:
+            return jsonify({'success': False, 'error': 'seconds must be between 0 and 300'}), 400
+        
+        is_running, heartbeat = get_bot_liveness()
+        if not is_running:
+            audit_log("BOT_PROFILE", "Bot not running", success=False)
+            return jsonify({'success': False, 'error': 'Bot is not running'})
+        
+        suffix = 'folded' if mode == 'sample' else 'prof'
+        output = f"profile-{mode}-{datetime.now():%Y%m%d-%H%M%S}.{suffix}"
+        
+        # The bot reads (and deletes) the request file when it gets the signal
+        PROFILE_REQUEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+        PROFILE_REQUEST_PATH.write_text(json.dumps({'mode': mode, 'seconds': seconds, 'output': output}))
+        os.kill(heartbeat['pid'], signal.SIGUSR2)
+        
+        audit_log("BOT_PROFILE", f"PID: {heartbeat['pid']} | {mode} | {output}")
+        
+        return jsonify({
+            'success': True,
+            'mode': mode,
+            'seconds': seconds if mode == 'sample' else None,
+            'output': str(PROFILE_DIR / output)
+        })
+        
+    except Exception as e:
+        audit_log("BOT_PROFILE", str(e), success=False)
+        return jsonify({'success': False, 'error': 'Failed to start profiling'}), 500
+
+
+@app.route('/api/bot/profile', methods=['GET'])
+@require_local_access
+def api_bot_profiles():
+    """List profile files written by the bot, newest first"""
+    try:
+        files = sorted(
+            (p for pattern in ('profile-*.folded', 'profile-*.prof')
+             for p in PROFILE_DIR.glob(pattern)),
+            key=lambda p: p.stat().st_mtime, reverse=True
+        )
+        return jsonify({'profiles': [{
+            'name': p.name,
+            'size': p.stat().st_size,
+            'modified': datetime.fromtimestamp(p.stat().st_mtime).isoformat()
+        } for p in files]})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/bot/restart', methods=['POST'])
 @require_local_access
 def api_bot_restart():
@@ -585,23 +715,18 @@ def api_bot_status():
     global BOT_STATUS
     
     try:
-        result = subprocess.run(
-            ['pgrep', '-f', 'arbitrage_bot.py'],
-            capture_output=True,
-            text=True
-        )
-        
-        is_running = bool(result.stdout.strip())
+        is_running, heartbeat = get_bot_liveness()
         
-        if is_running and BOT_STATUS == 'stopped':
-            BOT_STATUS = 'running'
-        elif not is_running:
+        if is_running:
+            BOT_STATUS = 'paused' if heartbeat['paused'] else 'running'
+        else:
             BOT_STATUS = 'stopped'
         
         return jsonify({
             'status': BOT_STATUS,
             'running': is_running,
-            'pid': result.stdout.strip() if is_running else None
+            'pid': heartbeat['pid'] if is_running else None,
+            'heartbeat': heartbeat
         })
         
     except Exception as e:
@@ -613,48 +738,41 @@ def api_bot_status():
 
 @app.route('/api/trades/export', methods=['GET'])
 def api_export_trades():
-    """Export trades as CSV"""
+    """
+    Stream trades as CSV (default), Parquet or Arrow
+    
+    Query params: format=csv|parquet|arrow, start/end=ISO date or datetime
+    
+    A range starting before the oldest live trade (or no start) includes
+    archived months.
+    """
     try:
-        import csv
-        import io
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                id, timestamp, market_name, trade_type,
-                expected_profit, actual_profit, status, simulated
-            FROM trades
-            ORDER BY timestamp DESC
-        """)
+        fmt = request.args.get('format', 'csv').lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"Unsupported format: {fmt}"}), 400
         
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Header
-        writer.writerow(['ID', 'Timestamp', 'Market', 'Type', 
-                        'Expected Profit', 'Actual Profit', 'Status', 'Simulated'])
+        try:
+            start = parse_date_bound(request.args.get('start'))
+            end = parse_date_bound(request.args.get('end'), end=True)
+        except ValueError:
+            return jsonify({'error': 'start/end must be ISO dates'}), 400
         
-        # Data rows
-        for row in rows:
-            writer.writerow([
-                row['id'], row['timestamp'], row['market_name'],
-                row['trade_type'], row['expected_profit'],
-                row['actual_profit'], row['status'], row['simulated']
-            ])
+        if fmt == 'csv':
+            body = stream_csv(str(DB_PATH), start, end, archive_dir=str(ARCHIVE_PATH))
+        else:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                return jsonify({'error': f"{fmt} export requires pyarrow"}), 501
+            body = stream_columnar(str(DB_PATH), fmt, start, end, archive_dir=str(ARCHIVE_PATH))
         
-        output.seek(0)
+        mimetype, extension = EXPORT_FORMATS[fmt]
         
         from flask import Response
         return Response(
-            output.getvalue(),
-            mimetype='text/csv',
-            headers={'Content-Disposition': 'attachment; filename=trades_export.csv'}
+            body,
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=trades_export.{extension}'}
         )
         
     except Exception as e:
@@ -666,8 +784,9 @@ def api_export_trades():
 def handle_connect():
     """Handle client connection"""
     emit('connected', {'status': 'connected', 'timestamp': datetime.now().isoformat()})
-    # Send initial data
+    # Send initial data; later changes arrive as pushed deltas
     emit('status_update', get_status_data())
+    emit('trades_update', get_trades_data())
 
 
 @socketio.on('disconnect')
@@ -691,13 +810,7 @@ def handle_request_trades():
 def get_status_data():
     """Get current status data for WebSocket"""
     try:
-        import subprocess
-        result = subprocess.run(
-            ['pgrep', '-f', 'arbitrage_bot.py'],
-            capture_output=True,
-            text=True
-        )
-        is_running = bool(result.stdout.strip())
+        is_running, heartbeat = get_bot_liveness()
         
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -726,7 +839,8 @@ def get_status_data():
         
         return {
             'running': is_running,
-            'mode': 'live',
+            'mode': heartbeat['mode'] if heartbeat else 'live',
+            'heartbeat': heartbeat,
             'today': {
                 'trades': today['total_trades'] or 0,
                 'wins': today['winning_trades'] or 0,
@@ -748,45 +862,126 @@ def get_status_data():
 def get_trades_data(limit=20):
     """Get recent trades data for WebSocket"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                id, timestamp, market_name, trade_type,
-                expected_profit, actual_profit, status, simulated
-            FROM trades
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """, (limit,))
-        
-        trades = []
-        for row in cursor.fetchall():
-            trades.append({
-                'id': row['id'],
-                'timestamp': row['timestamp'],
-                'market': row['market_name'],
-                'type': row['trade_type'],
-                'expected_profit': round(row['expected_profit'] or 0, 2),
-                'actual_profit': round(row['actual_profit'] or 0, 2),
-                'status': row['status'],
-                'simulated': bool(row['simulated'])
-            })
-        conn.close()
-        return trades
+        rows, _ = database.get_trades(limit=limit, columns=TRADE_COLUMNS)
+        return [_format_trade(row) for row in rows]
     except Exception as e:
         return {'error': str(e)}
 
 
-def broadcast_updates():
-    """Background thread to broadcast updates to all clients"""
+def stream_logs(interval: float = 1.0):
+    """Background thread pushing newly appended log lines to clients"""
+    last_seq, _ = log_tail.since(0)
+    while True:
+        time.sleep(interval)
+        try:
+            last_seq, new_entries = log_tail.since(last_seq)
+            if new_entries:
+                socketio.emit('log_lines', new_entries)
+        except Exception as e:
+            print(f"Log stream error: {e}")
+
+
+# Live status cache, seeded once from the DB and then advanced by bot events
+LIVE_STATUS = None
+LIVE_STATUS_LOCK = threading.Lock()
+
+
+def _compact_trade(trade: dict) -> dict:
+    """Shape a trade event like a get_trades_data() row"""
+    return {
+        'id': trade.get('id'),
+        'timestamp': trade.get('timestamp'),
+        'market': trade.get('market_name') or '',
+        'type': trade.get('type'),
+        'expected_profit': round(trade.get('expected_profit') or 0, 2),
+        'actual_profit': round(trade.get('actual_profit') or 0, 2),
+        'status': trade.get('status'),
+        'simulated': bool(trade.get('simulated'))
+    }
+
+
+def _apply_trade_to_status(status: dict, trade: dict) -> dict:
+    """Advance cached today/all-time stats by one trade, return the delta"""
+    profit = trade.get('actual_profit') or 0
+    day = str(trade.get('timestamp') or datetime.now().isoformat())[:10]
+
+    today = status['today']
+    if status.get('_day') != day or today['trades'] == 0:
+        today.update({'trades': 0, 'wins': 0, 'profit': 0, 'avg_profit': 0,
+                      'best_trade': profit, 'worst_trade': profit})
+        status['_day'] = day
+
+    today['trades'] += 1
+    today['wins'] += 1 if profit > 0 else 0
+    today['profit'] = round(today['profit'] + profit, 2)
+    today['avg_profit'] = round(today['profit'] / today['trades'], 2)
+    today['best_trade'] = round(max(today['best_trade'], profit), 2)
+    today['worst_trade'] = round(min(today['worst_trade'], profit), 2)
+
+    status['all_time']['trades'] += 1
+    status['all_time']['profit'] = round(status['all_time']['profit'] + profit, 2)
+    status['timestamp'] = datetime.now().isoformat()
+
+    return {'today': today, 'all_time': status['all_time'], 'timestamp': status['timestamp']}
+
+
+def handle_bot_event(event: dict):
+    """Push a bot event to all clients as a delta"""
+    global LIVE_STATUS
+
+    event_type = event.get('type')
+    data = event.get('data', {})
+
+    with LIVE_STATUS_LOCK:
+        if LIVE_STATUS is None or 'error' in LIVE_STATUS:
+            LIVE_STATUS = get_status_data()
+            LIVE_STATUS['_day'] = datetime.now().date().isoformat()
+
+        if event_type == TRADE:
+            delta = _apply_trade_to_status(LIVE_STATUS, data)
+            socketio.emit('trade_added', _compact_trade(data))
+            socketio.emit('status_delta', delta)
+
+        elif event_type == OPPORTUNITY:
+            socketio.emit('opportunity_added', data)
+
+        elif event_type == STATUS:
+            delta = {k: data[k] for k in ('running', 'paused', 'mode') if k in data}
+            LIVE_STATUS.update(delta)
+            socketio.emit('status_delta', delta)
+
+
+def check_liveness(last_state=None):
+    """
+    Compare the bot's heartbeat with the last seen state
+
+    Returns:
+        Tuple of (state, status delta or None if unchanged)
+    """
+    is_running, heartbeat = get_bot_liveness()
+    state = (is_running, bool(heartbeat and heartbeat['paused']))
+    if state == last_state:
+        return state, None
+    delta = {'running': state[0], 'paused': state[1]}
+    if heartbeat:
+        delta['mode'] = heartbeat['mode']
+    return state, delta
+
+
+def watch_liveness(interval: float = 3.0):
+    """Background thread pushing liveness changes a bot cannot announce itself (crash, kill)"""
+    state, _ = check_liveness()
     while True:
-        time.sleep(2)  # Update every 2 seconds
+        time.sleep(interval)
         try:
-            socketio.emit('status_update', get_status_data())
-            socketio.emit('trades_update', get_trades_data())
+            state, delta = check_liveness(state)
+            if delta:
+                with LIVE_STATUS_LOCK:
+                    if LIVE_STATUS is not None:
+                        LIVE_STATUS.update(delta)
+                socketio.emit('status_delta', delta)
         except Exception as e:
-            print(f"Broadcast error: {e}")
+            print(f"Liveness watch error: {e}")
 
 
 @app.route('/api/config', methods=['GET'])
@@ -821,6 +1016,9 @@ def api_update_config():
         with open(str(CONFIG_PATH), 'r') as f:
             config = yaml.safe_load(f)
         
+        # The running bot keeps these until it is restarted
+        restart_required = restart_only_changes(config, new_config)
+        
         # Update only allowed fields
         allowed_fields = ['polymarket', 'capital', 'risk_management', 'scanner', 'execution']
         changes = []
@@ -832,18 +1030,58 @@ def api_update_config():
                     config[field] = new_config[field]
                 changes.append(field)
         
-        # Save updated config
-        with open(str(CONFIG_PATH), 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+        # Save updated config (atomic; the running bot reloads it)
+        version = write_config(CONFIG_PATH, config, source=f"CONFIG_UPDATE {', '.join(changes)}")
         
-        audit_log("CONFIG_UPDATE", f"Updated sections: {', '.join(changes)}")
+        audit_log("CONFIG_UPDATE", f"Updated sections: {', '.join(changes)} (version {version})")
         
-        return jsonify({'success': True, 'message': 'Configuration updated'})
+        return jsonify({'success': True, 'message': 'Configuration updated', 'version': version,
+                        'restart_required': restart_required})
     except Exception as e:
         audit_log("CONFIG_UPDATE", str(e), success=False)
         return jsonify({'success': False, 'error': 'Failed to update configuration'}), 500
 
 
+@app.route('/api/config/history', methods=['GET'])
+@require_local_access
+def api_config_history():
+    """List saved config versions, newest first"""
+    try:
+        versions = [
+            {k: v for k, v in entry.items() if k != 'path'}
+            for entry in reversed(list_versions(CONFIG_PATH))
+        ]
+        return jsonify({'versions': versions})
+    except Exception as e:
+        return jsonify({'error': 'Failed to read config history'}), 500
+
+
+@app.route('/api/config/rollback', methods=['POST'])
+@require_local_access
+def api_config_rollback():
+    """Restore a saved config version (saved again as a new version)"""
+    try:
+        version = (request.get_json(silent=True) or {}).get('version')
+        if not isinstance(version, int):
+            return jsonify({'success': False, 'error': 'version must be an integer'}), 400
+        
+        config = load_version(CONFIG_PATH, version)
+        if config is None:
+            return jsonify({'success': False, 'error': f'Unknown config version: {version}'}), 404
+        
+        is_valid, error_msg = validate_config(config)
+        if not is_valid:
+            audit_log("CONFIG_ROLLBACK", f"Version {version} invalid: {error_msg}", success=False)
+            return jsonify({'success': False, 'error': error_msg}), 400
+        
+        new_version = write_config(CONFIG_PATH, config, source=f"CONFIG_ROLLBACK to {version}")
+        audit_log("CONFIG_ROLLBACK", f"Restored version {version} as {new_version}")
+        return jsonify({'success': True, 'version': new_version})
+    except Exception as e:
+        audit_log("CONFIG_ROLLBACK", str(e), success=False)
+        return jsonify({'success': False, 'error': 'Failed to roll back configuration'}), 500
+
+
 @app.route('/api/markets', methods=['GET'])
 def api_markets():
     """Get available markets from Polymarket"""
@@ -861,82 +1099,9 @@ def api_markets():
 
 @app.route('/api/analytics', methods=['GET'])
 def api_analytics():
-    """Get performance analytics"""
+    """Get performance analytics (all-time plus 24h/7d/30d windows)"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get all trades for analytics
-        cursor.execute("""
-            SELECT 
-                timestamp, actual_profit, expected_profit, status
-            FROM trades
-            ORDER BY timestamp ASC
-        """)
-        trades = cursor.fetchall()
-        conn.close()
-        
-        if not trades:
-            return jsonify({
-                'total_trades': 0,
-                'total_profit': 0,
-                'win_rate': 0,
-                'avg_profit': 0,
-                'sharpe_ratio': 0,
-                'max_drawdown': 0,
-                'profit_factor': 0
-            })
-        
-        # Calculate metrics
-        profits = [t['actual_profit'] or 0 for t in trades]
-        total_profit = sum(profits)
-        wins = [p for p in profits if p > 0]
-        losses = [p for p in profits if p < 0]
-        
-        win_rate = len(wins) / len(profits) * 100 if profits else 0
-        avg_profit = total_profit / len(profits) if profits else 0
-        
-        # Sharpe Ratio (simplified)
-        import statistics
-        if len(profits) > 1:
-            std_dev = statistics.stdev(profits)
-            sharpe_ratio = (avg_profit / std_dev) if std_dev > 0 else 0
-        else:
-            sharpe_ratio = 0
-        
-        # Max Drawdown
-        cumulative = []
-        running_total = 0
-        for p in profits:
-            running_total += p
-            cumulative.append(running_total)
-        
-        peak = cumulative[0] if cumulative else 0
-        max_drawdown = 0
-        for value in cumulative:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak if peak > 0 else 0
-            max_drawdown = max(max_drawdown, drawdown)
-        
-        # Profit Factor
-        total_wins = sum(wins) if wins else 0
-        total_losses = abs(sum(losses)) if losses else 0
-        profit_factor = total_wins / total_losses if total_losses > 0 else float('inf')
-        
-        return jsonify({
-            'total_trades': len(trades),
-            'total_profit': round(total_profit, 2),
-            'win_rate': round(win_rate, 2),
-            'avg_profit': round(avg_profit, 4),
-            'sharpe_ratio': round(sharpe_ratio, 2),
-            'max_drawdown': round(max_drawdown * 100, 2),
-            'profit_factor': round(profit_factor, 2) if profit_factor != float('inf') else 'N/A',
-            'best_trade': round(max(profits), 2) if profits else 0,
-            'worst_trade': round(min(profits), 2) if profits else 0,
-            'avg_win': round(sum(wins) / len(wins), 4) if wins else 0,
-            'avg_loss': round(sum(losses) / len(losses), 4) if losses else 0
-        })
+        return jsonify(analytics_engine.get_summary())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -996,6 +1161,9 @@ def api_save_settings():
         with open(str(CONFIG_PATH)) as f:
             config = yaml.safe_load(f)
 
+        # The running bot keeps these until it is restarted
+        restart_required = restart_only_changes(config, settings)
+        
         # Update specific fields (allowlisted only)
         allowed_sections = ['execution', 'polymarket', 'scanner', 'capital', 'risk_management']
         changes = []
@@ -1007,13 +1175,13 @@ def api_save_settings():
                     config[section] = settings[section]
                 changes.append(section)
 
-        # Save back to file
-        with open(str(CONFIG_PATH), 'w') as f:
-            yaml.dump(config, f, default_flow_style=False)
+        # Save back to file (atomic; the running bot reloads it)
+        version = write_config(CONFIG_PATH, config, source=f"SETTINGS_SAVE {', '.join(changes)}")
 
-        audit_log("SETTINGS_SAVE", f"Updated sections: {', '.join(changes)}")
+        audit_log("SETTINGS_SAVE", f"Updated sections: {', '.join(changes)} (version {version})")
         
-        return jsonify({'success': True, 'message': 'Settings saved'})
+        return jsonify({'success': True, 'message': 'Settings saved', 'version': version,
+                        'restart_required': restart_required})
     except Exception as e:
         audit_log("SETTINGS_SAVE", str(e), success=False)
         return jsonify({'success': False, 'error': 'Failed to save settings'}), 500
@@ -1036,9 +1204,17 @@ if __name__ == '__main__':
     Press Ctrl+C to stop
     """)
     
-    # Start background broadcast thread
-    broadcast_thread = threading.Thread(target=broadcast_updates, daemon=True)
-    broadcast_thread.start()
+    # Receive pushed bot events (no polling)
+    event_subscriber = EventSubscriber(str(EVENT_SOCKET_PATH), handle_bot_event)
+    event_subscriber.start()
+    
+    # Stream appended log lines (offset polling, no re-reads)
+    log_thread = threading.Thread(target=stream_logs, daemon=True)
+    log_thread.start()
+    
+    # Clients no longer poll status, so watch the heartbeat for a dead bot
+    liveness_thread = threading.Thread(target=watch_liveness, daemon=True)
+    liveness_thread.start()
     
     # Run with SocketIO
     socketio.run(app, host='0.0.0.0', port=8000, debug=False, allow_unsafe_werkzeug=True)
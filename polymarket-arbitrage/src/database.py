@@ -3,22 +3,40 @@ Database Module
 SQLite database for storing trade history and analytics
 """
 
+import base64
+import json
 import logging
 import sqlite3
-from typing import Dict, List, Optional
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from .analytics_engine import AnalyticsEngine
+    from .archive import PartitionArchive
+    from .metrics import DB_WRITE
+except ImportError:
+    # Run from src/ (bot, dashboard) rather than as the src package
+    # (start_all.sh, preflight_check.py)
+    from analytics_engine import AnalyticsEngine
+    from archive import PartitionArchive
+    from metrics import DB_WRITE
+
 
 class Database:
     """SQLite database for trade history"""
     
-    def __init__(self, db_path: str = "data/trades.db"):
+    def __init__(self, db_path: str = "data/trades.db", archive_dir: Optional[str] = None,
+                 compress_after_months: int = 3):
         """
         Initialize database
         
         Args:
             db_path: Path to SQLite database file
+            archive_dir: Monthly partition directory (defaults to <db dir>/archive)
+            compress_after_months: Compress partitions older than this
         """
         self.logger = logging.getLogger(__name__)
         self.db_path = db_path
@@ -26,6 +44,19 @@ class Database:
         # Create data directory if it doesn't exist
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
+        # Incremental analytics (running accumulators + rollups)
+        self.analytics = AnalyticsEngine(db_path)
+        
+        # (finished_at, seconds) for recent writes, used to measure backup impact
+        self.write_timings: deque = deque(maxlen=2048)
+        
+        # Monthly partitions for history moved out of the live tables
+        self.archive = PartitionArchive(
+            db_path,
+            archive_dir or str(Path(db_path).parent / "archive"),
+            compress_after_months
+        )
+        
         # Initialize database
         self._init_database()
         
@@ -84,11 +115,46 @@ class Database:
                 )
             """)
             
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_market_id ON trades(market_id)")
+            # Held YES/NO shares, one row per market until redeemed
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS positions (
+                    market_id TEXT PRIMARY KEY,
+                    market_name TEXT,
+                    yes_token_id TEXT,
+                    no_token_id TEXT,
+                    yes_shares REAL DEFAULT 0,
+                    no_shares REAL DEFAULT 0,
+                    cost REAL DEFAULT 0,
+                    opened_at REAL,
+                    resolves_at REAL,
+                    status TEXT NOT NULL,
+                    winner TEXT,
+                    payout REAL,
+                    redeemed_at REAL,
+                    simulated BOOLEAN DEFAULT 0
+                )
+            """)
+            
+            # Create indexes (composite (timestamp, id) keys serve keyset pagination)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_ts_id ON trades(timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_market_ts ON trades(market_id, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_status_ts ON trades(status, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_simulated_ts ON trades(simulated, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_type_ts ON trades(trade_type, timestamp, id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_date ON metrics(date)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_timestamp ON opportunities(timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_ts_id ON opportunities(timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_market_ts ON opportunities(market_id, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_type_ts ON opportunities(opportunity_type, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_opportunities_executed_ts ON opportunities(executed, timestamp, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_status ON positions(status)")
+            
+            # Superseded by the composite indexes above
+            cursor.execute("DROP INDEX IF EXISTS idx_trades_timestamp")
+            cursor.execute("DROP INDEX IF EXISTS idx_trades_market_id")
+            cursor.execute("DROP INDEX IF EXISTS idx_opportunities_timestamp")
+            
+            # Analytics accumulators and rollups
+            AnalyticsEngine.init_schema(cursor)
             
             conn.commit()
     
@@ -102,6 +168,7 @@ class Database:
         Returns:
             Inserted trade ID
         """
+        started = time.perf_counter()
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
@@ -122,9 +189,18 @@ class Database:
                 trade.get('details', '')
             ))
             
-            conn.commit()
             trade_id = cursor.lastrowid
             
+            # Update running analytics in the same transaction
+            self.analytics.record_trade(
+                cursor, trade_id,
+                trade.get('actual_profit'),
+                trade.get('timestamp')
+            )
+            
+            conn.commit()
+            self._record_write(started, 'trades')
+            
             # Update daily metrics
             self._update_daily_metrics(trade)
             
@@ -140,6 +216,7 @@ class Database:
         Returns:
             Inserted opportunity ID
         """
+        started = time.perf_counter()
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
@@ -158,8 +235,60 @@ class Database:
             ))
             
             conn.commit()
+            self._record_write(started, 'opportunities')
             return cursor.lastrowid
     
+    def save_position(self, position: Dict):
+        """
+        Insert or update a position (keyed by market_id)
+        
+        Args:
+            position: Position.to_dict()
+        """
+        started = time.perf_counter()
+        columns = ('market_id', 'market_name', 'yes_token_id', 'no_token_id', 'yes_shares',
+                   'no_shares', 'cost', 'opened_at', 'resolves_at', 'status', 'winner',
+                   'payout', 'redeemed_at', 'simulated')
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO positions ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                tuple(position.get(c) for c in columns)
+            )
+            conn.commit()
+        self._record_write(started, 'positions')
+    
+    def get_unredeemed_positions(self) -> List[Dict]:
+        """Positions the bot still holds (status other than 'redeemed'/'unclaimed'/'abandoned')"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM positions WHERE status NOT IN ('redeemed', 'unclaimed', 'abandoned') "
+                "ORDER BY opened_at"
+            ).fetchall()
+            return [dict(row) for row in rows]
+    
+    def _record_write(self, started: float, table: str):
+        elapsed = time.perf_counter() - started
+        self.write_timings.append((time.time(), elapsed))
+        DB_WRITE.observe(elapsed, table=table)
+    
+    def write_latencies(self, since: float = 0.0, until: Optional[float] = None) -> List[float]:
+        """
+        Get recent write latencies
+        
+        Args:
+            since: Only writes finished at or after this epoch time
+            until: Only writes finished before this epoch time
+            
+        Returns:
+            Write durations in seconds
+        """
+        return [
+            seconds for finished, seconds in list(self.write_timings)
+            if finished >= since and (until is None or finished < until)
+        ]
+    
     def _update_daily_metrics(self, trade: Dict):
         """Update daily performance metrics"""
         today = datetime.now().date()
@@ -209,28 +338,145 @@ class Database:
             
             conn.commit()
     
-    def get_trades(self, limit: int = 100, offset: int = 0) -> List[Dict]:
+    def get_trades(self, limit: int = 100, cursor: Optional[str] = None,
+                   market_id: Optional[str] = None, status: Optional[str] = None,
+                   simulated: Optional[bool] = None, trade_type: Optional[str] = None,
+                   columns: Sequence[str] = ('*',)) -> Tuple[List[Dict], Optional[str]]:
         """
-        Get recent trades
+        Get a page of trades, newest first
+        
+        Uses keyset pagination on (timestamp, id), so every page costs the
+        same regardless of how deep into history it is.
         
         Args:
             limit: Maximum number of trades to return
-            offset: Number of trades to skip
+            cursor: Opaque cursor from a previous page (None for the first)
+            market_id: Filter by market
+            status: Filter by status
+            simulated: Filter by simulated flag
+            trade_type: Filter by trade type
+            columns: Columns to select
+            
+        Returns:
+            Tuple of (trade dicts, cursor for the next page or None)
+        """
+        return self._keyset_page('trades', columns, limit, cursor, {
+            'market_id': market_id,
+            'status': status,
+            'simulated': simulated,
+            'trade_type': trade_type,
+        })
+    
+    def get_settlements_since(self, since: datetime, simulated: Optional[bool] = None) -> List[Dict]:
+        """
+        Realised PnL of positions settled at or after `since`, oldest first
+        
+        Args:
+            since: Earliest settlement time
+            simulated: Filter by simulated flag
             
         Returns:
-            List of trade dicts
+            Dicts with timestamp (epoch) and profit (payout - cost)
         """
+        query = ("SELECT redeemed_at AS timestamp, payout - cost AS profit FROM positions "
+                 "WHERE status IN ('redeemed', 'unclaimed') AND redeemed_at >= ?")
+        params: List = [since.timestamp()]
+        if simulated is not None:
+            query += " AND simulated = ?"
+            params.append(simulated)
         with sqlite3.connect(self.db_path) as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM trades
-                ORDER BY timestamp DESC
-                LIMIT ? OFFSET ?
-            """, (limit, offset))
+            rows = conn.execute(query + " ORDER BY redeemed_at", params).fetchall()
+            return [dict(row) for row in rows]
+    
+    def get_opportunities(self, limit: int = 50, cursor: Optional[str] = None,
+                          market_id: Optional[str] = None,
+                          opportunity_type: Optional[str] = None,
+                          executed: Optional[bool] = None,
+                          columns: Sequence[str] = ('*',)) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Get a page of opportunities, newest first
+        
+        Args:
+            limit: Maximum number of opportunities to return
+            cursor: Opaque cursor from a previous page (None for the first)
+            market_id: Filter by market
+            opportunity_type: Filter by opportunity type
+            executed: Filter by executed flag
+            columns: Columns to select
             
-            return [dict(row) for row in cursor.fetchall()]
+        Returns:
+            Tuple of (opportunity dicts, cursor for the next page or None)
+        """
+        return self._keyset_page('opportunities', columns, limit, cursor, {
+            'market_id': market_id,
+            'opportunity_type': opportunity_type,
+            'executed': executed,
+        })
+    
+    def _keyset_page(self, table: str, columns: Sequence[str], limit: int,
+                     cursor: Optional[str], filters: Dict) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch one (timestamp, id)-ordered page with equality filters
+        
+        Each page is a range scan of the (timestamp, id) or (filter,
+        timestamp, id) index, with no sort step. The index only covers the
+        query when nothing beyond id, timestamp and the filter column is
+        selected; otherwise each returned row costs one table lookup.
+        """
+        clauses = []
+        params = []
+        
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(int(value) if isinstance(value, bool) else value)
+        
+        if cursor:
+            clauses.append("(timestamp, id) < (?, ?)")
+            params.extend(self.decode_cursor(cursor))
+        
+        select = ', '.join(columns)
+        if '*' not in columns:
+            select = ', '.join(dict.fromkeys(['id', 'timestamp', *columns]))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"""
+                SELECT {select} FROM {table}
+                {where}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            """, (*params, limit + 1)).fetchall()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1]['timestamp'], rows[-1]['id'])
+        
+        return [dict(row) for row in rows], next_cursor
+    
+    @staticmethod
+    def encode_cursor(timestamp, row_id: int) -> str:
+        """Encode a (timestamp, id) position as an opaque cursor"""
+        raw = json.dumps([str(timestamp), row_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """
+        Decode a cursor produced by encode_cursor
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+            return str(timestamp), int(row_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
     
     def get_daily_stats(self, date: Optional[datetime.date] = None) -> Optional[Dict]:
         """
@@ -320,29 +566,21 @@ class Database:
                 'avg_profit': 0
             }
     
-    def cleanup_old_data(self, days: int = 90):
+    def cleanup_old_data(self, days: int = 90) -> int:
         """
-        Delete data older than specified days
+        Archive data older than specified days
+        
+        Closed months are moved into monthly partition files instead of
+        being deleted, so the history stays available through
+        self.archive.iter_rows().
         
         Args:
-            days: Keep data newer than this many days
-        """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+            days: Keep data newer than this many days in the live tables
             
-            # Delete old trades
-            cursor.execute("""
-                DELETE FROM trades
-                WHERE timestamp < date('now', '-' || ? || ' days')
-            """, (days,))
-            
-            # Delete old opportunities
-            cursor.execute("""
-                DELETE FROM opportunities
-                WHERE timestamp < date('now', '-' || ? || ' days')
-            """, (days,))
-            
-            deleted = cursor.rowcount
-            conn.commit()
-            
-            self.logger.info(f"Cleaned up {deleted} old records")
+        Returns:
+            Number of rows archived
+        """
+        archived = self.archive.rotate(days)
+        if archived:
+            self.logger.info(f"Archived {archived} old records")
+        return archived
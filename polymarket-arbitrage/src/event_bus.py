@@ -0,0 +1,152 @@
+"""
+Event Bus
+Push-based bot -> dashboard events over a Unix datagram socket
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+
+# Event types
+TRADE = 'trade'
+OPPORTUNITY = 'opportunity'
+STATUS = 'status'
+
+DEFAULT_SOCKET_PATH = "data/events.sock"
+
+# Keep datagrams well under the default Unix socket buffer
+MAX_EVENT_BYTES = 16384
+
+
+def _json_default(value):
+    """Serialise datetimes and Decimals found in event payloads"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return float(value) if hasattr(value, '__float__') else str(value)
+
+
+class EventPublisher:
+    """
+    Fire-and-forget event publisher used by the bot
+
+    Sends are non-blocking: if no dashboard is listening or its buffer
+    is full the event is dropped, so publishing never stalls trading.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        """
+        Initialize event publisher
+
+        Args:
+            socket_path: Path of the subscriber's Unix socket
+        """
+        self.logger = logging.getLogger(__name__)
+        self.socket_path = str(socket_path)
+        self.dropped = 0
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def publish(self, event_type: str, data: Dict) -> bool:
+        """
+        Publish an event
+
+        Args:
+            event_type: One of TRADE, OPPORTUNITY, STATUS
+            data: JSON-serialisable payload
+
+        Returns:
+            True if the datagram was handed to the kernel
+        """
+        payload = json.dumps(
+            {'type': event_type, 'ts': time.time(), 'data': data},
+            default=_json_default
+        ).encode()
+
+        if len(payload) > MAX_EVENT_BYTES:
+            self.logger.debug("Dropping oversized %s event (%d bytes)", event_type, len(payload))
+            self.dropped += 1
+            return False
+
+        try:
+            self.sock.sendto(payload, self.socket_path)
+            return True
+        except (FileNotFoundError, ConnectionRefusedError, BlockingIOError):
+            # No listener, or listener is behind - drop rather than block
+            self.dropped += 1
+            return False
+        except OSError as e:
+            self.logger.debug("Event publish failed: %s", e)
+            self.dropped += 1
+            return False
+
+    def close(self):
+        self.sock.close()
+
+
+class EventSubscriber:
+    """
+    Receives bot events on a Unix datagram socket
+
+    Runs a daemon thread that blocks in recv(), so an idle bot costs
+    nothing: no polling, no database queries.
+    """
+
+    def __init__(self, socket_path: str, handler: Callable[[Dict], None]):
+        """
+        Initialize event subscriber
+
+        Args:
+            socket_path: Path to bind the Unix socket at
+            handler: Called with each decoded event dict
+        """
+        self.logger = logging.getLogger(__name__)
+        self.socket_path = str(socket_path)
+        self.handler = handler
+        self.sock: Optional[socket.socket] = None
+        self.thread: Optional[threading.Thread] = None
+        self.running = False
+
+    def start(self):
+        """Bind the socket and start the receive thread"""
+        Path(self.socket_path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Remove a stale socket left by a previous run
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(self.socket_path)
+        self.running = True
+
+        self.thread = threading.Thread(target=self._run, name="event-subscriber", daemon=True)
+        self.thread.start()
+
+        self.logger.info(f"Listening for bot events on {self.socket_path}")
+
+    def stop(self):
+        """Stop receiving and remove the socket file"""
+        self.running = False
+        if self.sock:
+            self.sock.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def _run(self):
+        while self.running:
+            try:
+                payload = self.sock.recv(MAX_EVENT_BYTES)
+            except OSError:
+                break  # Socket closed
+
+            try:
+                self.handler(json.loads(payload))
+            except Exception as e:
+                self.logger.error(f"Error handling bot event: {e}")
@@ -0,0 +1,202 @@
+"""
+Heartbeat Channel
+Bot liveness published through a small memory-mapped status file
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_HEARTBEAT_PATH = "data/heartbeat.bin"
+
+MAGIC = 0x4842  # "HB"
+VERSION = 1
+
+# seq is a seqlock counter: odd while the writer is mid-update
+HEADER = struct.Struct('<HHQ')  # magic, version, seq
+BODY = struct.Struct('<iQddddd???8s')
+# pid, iteration, started_at, updated_at, last_scan_time,
+# last_scan_duration, scan_interval, running, paused,
+# circuit_breaker, mode
+RECORD_SIZE = HEADER.size + BODY.size
+
+# Grace period on top of a few missed scan intervals
+STALE_GRACE_SECONDS = 30
+
+
+class HeartbeatWriter:
+    """
+    Publishes bot state to a memory-mapped file
+
+    Each beat is a couple of in-memory stores, so it is cheap enough to
+    call on every loop iteration.
+    """
+
+    def __init__(self, path: str = DEFAULT_HEARTBEAT_PATH, mode: str = 'live',
+                 scan_interval: float = 0):
+        """
+        Initialize heartbeat writer
+
+        Args:
+            path: Heartbeat file path
+            mode: Execution mode reported to readers
+            scan_interval: Expected seconds between beats
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = str(path)
+        self.mode = mode
+        self.scan_interval = scan_interval
+
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.iteration = 0
+        self.last_scan_time = 0.0
+        self.last_scan_duration = 0.0
+        self.seq = 0
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, RECORD_SIZE)
+            self.map = mmap.mmap(fd, RECORD_SIZE)
+        finally:
+            os.close(fd)
+
+    def record_scan(self, started: float, duration: float):
+        """Remember the timing of the last completed scan"""
+        self.last_scan_time = started
+        self.last_scan_duration = duration
+
+    def beat(self, running: bool = True, paused: bool = False,
+             circuit_breaker: bool = False, iteration: Optional[int] = None):
+        """
+        Publish current state
+
+        Args:
+            running: Main loop is active
+            paused: Trading paused (risk limits / manual)
+            circuit_breaker: Risk circuit breaker engaged
+            iteration: Main loop iteration (defaults to an internal counter)
+        """
+        self.iteration = iteration if iteration is not None else self.iteration + 1
+
+        body = BODY.pack(
+            self.pid, self.iteration, self.started_at, time.time(),
+            self.last_scan_time, self.last_scan_duration, float(self.scan_interval),
+            running, paused, circuit_breaker,
+            self.mode.encode()[:8]
+        )
+
+        # Seqlock write: odd seq -> body -> even seq
+        self.seq += 1
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, VERSION, self.seq)
+        self.map[HEADER.size:RECORD_SIZE] = body
+        self.seq += 1
+        self.map[:HEADER.size] = HEADER.pack(MAGIC, VERSION, self.seq)
+
+    def close(self, clear: bool = True):
+        """Mark the bot as stopped and release the mapping"""
+        if clear:
+            self.beat(running=False, iteration=self.iteration)
+        self.map.close()
+
+
+class HeartbeatReader:
+    """Reads the heartbeat file without spawning processes"""
+
+    def __init__(self, path: str = DEFAULT_HEARTBEAT_PATH):
+        self.path = str(path)
+        self.map: Optional[mmap.mmap] = None
+        self.inode = None
+        self.lock = threading.Lock()
+
+    def read(self) -> Optional[Dict]:
+        """
+        Read the latest heartbeat
+
+        Returns:
+            Heartbeat dict with a derived 'alive' flag, or None if no
+            bot has ever published one
+        """
+        with self.lock:
+            return self._read_locked()
+
+    def _read_locked(self) -> Optional[Dict]:
+        if not self._ensure_mapped():
+            return None
+
+        for _ in range(10):
+            magic, version, seq1 = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            if seq1 % 2:
+                time.sleep(0.0001)  # Writer mid-update
+                continue
+
+            values = BODY.unpack_from(self.map, HEADER.size)
+            _, _, seq2 = HEADER.unpack_from(self.map, 0)
+            if seq1 == seq2:
+                break
+        else:
+            return None
+
+        (pid, iteration, started_at, updated_at, last_scan_time,
+         last_scan_duration, scan_interval, running, paused,
+         circuit_breaker, mode) = values
+
+        age = time.time() - updated_at
+        stale_after = scan_interval * 3 + STALE_GRACE_SECONDS
+
+        return {
+            'pid': pid,
+            'iteration': iteration,
+            'started_at': started_at,
+            'updated_at': updated_at,
+            'age_seconds': round(age, 3),
+            'last_scan_time': last_scan_time or None,
+            'last_scan_duration': last_scan_duration,
+            'scan_interval': scan_interval,
+            'running': running,
+            'paused': paused,
+            'circuit_breaker': circuit_breaker,
+            'mode': mode.rstrip(b'\x00').decode(errors='replace'),
+            'alive': running and age <= stale_after and _pid_exists(pid)
+        }
+
+    def _ensure_mapped(self) -> bool:
+        """Map the file, remapping if the bot recreated it"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        if stat.st_size < RECORD_SIZE:
+            return False
+
+        if self.map is None or stat.st_ino != self.inode:
+            if self.map is not None:
+                self.map.close()
+            with open(self.path, 'rb') as f:
+                self.map = mmap.mmap(f.fileno(), RECORD_SIZE, access=mmap.ACCESS_READ)
+            self.inode = stat.st_ino
+
+        return True
+
+
+def _pid_exists(pid: int) -> bool:
+    """Signal-0 probe; no fork/exec"""
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
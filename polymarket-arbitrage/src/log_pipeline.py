@@ -0,0 +1,170 @@
+"""
+Log Pipeline
+Queue-based logging that keeps formatting and file I/O off the event loop
+
+Loggers only enqueue LogRecords. A QueueListener thread does the
+%-formatting, JSON encoding, writing and rotation. Call sites use
+%-style arguments (logger.info("x=%s", x)), so a disabled level costs
+one isEnabledFor() check and an enabled one defers string building to
+the listener thread.
+
+File records are JSON lines:
+
+    {"ts": "2026-01-31T10:36:47.947", "level": "INFO", "logger": "arbitrage_bot",
+     "msg": "...", "market_id": "..."}
+
+Anything passed via extra={...} becomes a top-level field.
+"""
+
+import atexit
+import json
+import logging
+import queue
+from collections import OrderedDict
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Optional
+
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied extras
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes 1 in `every` records per message template at or below `level`
+
+    Keyed on (logger, unformatted msg), so a per-market DEBUG line like
+    "Skipping %s: spread %.3f" is sampled as one stream however many
+    markets it covers. The first record of each template always passes;
+    passed records carry `sampled=every`. Counts are kept for the
+    `max_templates` most recently seen templates, so a pre-formatted
+    message (an f-string) cannot grow them without bound.
+    """
+
+    def __init__(self, every: int = 10, level: int = logging.DEBUG, max_templates: int = 1024):
+        super().__init__()
+        self.every = max(1, every)
+        self.level = level
+        self.max_templates = max_templates
+        self.counts: OrderedDict = OrderedDict()  # (logger, msg) -> records seen
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level or self.every == 1:
+            return True
+        key = (record.name, str(record.msg))
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        self.counts.move_to_end(key)
+        if len(self.counts) > self.max_templates:
+            self.counts.popitem(last=False)
+        if count % self.every:
+            return False
+        record.sampled = self.every
+        return True
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues the record as-is
+
+    The stock prepare() formats the message on the calling thread (it is
+    built for pickling across processes); in-process the listener can do
+    it. Arguments are formatted when the listener gets to them, so pass
+    values rather than objects that are mutated right after logging.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(log_config: Dict) -> QueueListener:
+    """
+    Route the root logger through a queue to console and file handlers
+
+    Args:
+        log_config: 'logging' config section (level, console, file,
+            file_path, file_format, max_bytes, backup_count,
+            debug_sample_rate)
+
+    Returns:
+        The running QueueListener (stopped and drained at exit)
+    """
+    global _listener
+
+    level = getattr(logging, str(log_config.get('level', 'INFO')).upper(), logging.INFO)
+
+    handlers = []
+    if log_config.get('console', True):
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(CONSOLE_FORMAT, datefmt='%H:%M:%S'))
+        handlers.append(console)
+
+    if log_config.get('file', True):
+        file_path = Path(log_config.get('file_path', 'logs/bot.log'))
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            file_path,
+            maxBytes=log_config.get('max_bytes', 10485760),
+            backupCount=log_config.get('backup_count', 5),
+            encoding='utf-8'
+        )
+        if log_config.get('file_format', 'json') == 'json':
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+
+    _stop_listener()
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    sample_rate = log_config.get('debug_sample_rate', 1)
+    if sample_rate > 1:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def _stop_listener():
+    """Drain and stop the current listener"""
+    global _listener
+    # Python < 3.12 raises if stop() is called twice
+    if _listener and _listener._thread:
+        _listener.stop()
+    _listener = None
+
+
+atexit.register(_stop_listener)
@@ -0,0 +1,199 @@
+"""
+Log Tail Service
+Reads the end of the bot log without loading the whole file
+"""
+
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+
+
+# JSON record keys mapped onto entry fields; any other key is passed through
+JSON_FIELDS = {'ts': 'timestamp', 'logger': 'module', 'level': 'level', 'msg': 'message'}
+
+
+def parse_line(line: str) -> Optional[Dict]:
+    """
+    Parse one log line
+
+    Formats: JSON records written by log_pipeline.JsonFormatter, or text
+    "2026-01-31 10:36:47,947 - module - LEVEL - message"
+
+    Returns:
+        Log entry dict, or None for continuation lines (tracebacks etc.)
+    """
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return None
+        entry = {field: record.pop(key, '') for key, field in JSON_FIELDS.items()}
+        entry.update(record)
+        return entry
+
+    parts = line.split(' - ', 3)
+    if len(parts) < 4:
+        return None
+
+    return {
+        'timestamp': parts[0],
+        'module': parts[1],
+        'level': parts[2],
+        'message': parts[3].strip()
+    }
+
+
+class LogTail:
+    """
+    Incremental tail of a (rotating) log file
+
+    The first read seeks backwards from EOF in blocks until enough
+    lines are found. After that only bytes appended since the cached
+    offset are read, and parsed entries are kept in a bounded window,
+    so memory and latency depend on the window size, not the file size.
+    """
+
+    def __init__(self, path: str, max_lines: int = 1000, block_size: int = 8192):
+        """
+        Initialize log tail
+
+        Args:
+            path: Log file path
+            max_lines: Parsed entries kept in memory
+            block_size: Read size when seeking backwards
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = str(path)
+        self.max_lines = max_lines
+        self.block_size = block_size
+
+        # Read appended bytes up to this size; beyond it, re-seek from EOF
+        self.max_catch_up = block_size * 128
+
+        self.lock = threading.Lock()
+        self.entries: deque = deque(maxlen=max_lines)  # (seq, entry)
+        self.seq = 0
+        self.inode = None
+        self.offset = 0
+        self.partial = b''
+
+    def tail(self, lines: int = 100, level: Optional[str] = None,
+             module: Optional[str] = None) -> List[Dict]:
+        """
+        Get the most recent log entries
+
+        Args:
+            lines: Maximum entries to return
+            level: Minimum level (e.g. 'WARNING')
+            module: Logger name prefix
+
+        Returns:
+            Entries oldest first
+        """
+        with self.lock:
+            self._sync()
+            matched = []
+            for _, entry in reversed(self.entries):
+                if len(matched) >= lines:
+                    break
+                if self._matches(entry, level, module):
+                    matched.append(entry)
+
+        matched.reverse()
+        return matched
+
+    def since(self, seq: int, level: Optional[str] = None,
+              module: Optional[str] = None) -> Tuple[int, List[Dict]]:
+        """
+        Get entries appended after a sequence number
+
+        Args:
+            seq: Last sequence number the caller has seen
+
+        Returns:
+            Tuple of (latest sequence number, new entries oldest first)
+        """
+        with self.lock:
+            self._sync()
+            new = [entry for entry_seq, entry in self.entries
+                   if entry_seq > seq and self._matches(entry, level, module)]
+            return self.seq, new
+
+    def _sync(self):
+        """Bring the cached window up to date with the file"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+
+        rotated = stat.st_ino != self.inode or stat.st_size < self.offset
+        if rotated or stat.st_size - self.offset > self.max_catch_up:
+            self._reset()
+            self.inode = stat.st_ino
+            self._read_backwards(stat.st_size)
+        elif stat.st_size > self.offset:
+            self._read_forward(stat.st_size)
+
+    def _reset(self):
+        self.entries.clear()
+        self.inode = None
+        self.offset = 0
+        self.partial = b''
+
+    def _read_backwards(self, size: int):
+        """Load the last max_lines lines by reading blocks back from EOF"""
+        chunks = []
+        newlines = 0
+        position = size
+
+        with open(self.path, 'rb') as f:
+            while position > 0 and newlines <= self.max_lines:
+                read_size = min(self.block_size, position)
+                position -= read_size
+                f.seek(position)
+                chunk = f.read(read_size)
+                chunks.append(chunk)
+                newlines += chunk.count(b'\n')
+
+        data = b''.join(reversed(chunks))
+        if position > 0:
+            # Drop the (probably partial) first line
+            data = data[data.find(b'\n') + 1:]
+
+        self.offset = size
+        self._ingest(data)
+
+    def _read_forward(self, size: int):
+        """Read bytes appended since the cached offset"""
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+
+        self.offset += len(data)
+        self._ingest(data)
+
+    def _ingest(self, data: bytes):
+        data = self.partial + data
+        lines = data.split(b'\n')
+        self.partial = lines.pop()  # Incomplete trailing line, if any
+
+        for raw in lines:
+            entry = parse_line(raw.decode('utf-8', errors='replace'))
+            if entry:
+                self.seq += 1
+                self.entries.append((self.seq, entry))
+
+    @staticmethod
+    def _matches(entry: Dict, level: Optional[str], module: Optional[str]) -> bool:
+        if level and LEVELS.get(entry['level'], 0) < LEVELS.get(level.upper(), 0):
+            return False
+        if module and not entry['module'].startswith(module):
+            return False
+        return True
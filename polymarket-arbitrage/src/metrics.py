@@ -0,0 +1,426 @@
+"""
+Metrics
+In-process counters, gauges and histograms with a local Prometheus endpoint
+
+Recording is a dict update under an uncontended lock; nothing is
+formatted until something scrapes, so an unscraped bot pays almost
+nothing. Queue depths and similar values are read through callback
+gauges at scrape time instead of being pushed on every change.
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9464
+
+# Seconds; covers sub-millisecond DB writes up to minute-long scans
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], key: LabelKey, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, key)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> LabelKey:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def render(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def snapshot(self) -> List[Dict]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def snapshot(self) -> List[Dict]:
+        return [{'labels': self._labels(k), 'value': v} for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+        self._functions: Dict[LabelKey, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Evaluate function on every scrape instead of storing a value"""
+        self._functions[self._key(labels)] = function
+
+    def _collect(self) -> Dict[LabelKey, float]:
+        values = dict(self._values)
+        for key, function in list(self._functions.items()):
+            try:
+                values[key] = float(function())
+            except Exception:
+                continue
+        return values
+
+    def render(self) -> Iterator[str]:
+        for key, value in sorted(self._collect().items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+    def snapshot(self) -> List[Dict]:
+        return [{'labels': self._labels(k), 'value': v} for k, v in sorted(self._collect().items())]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Approximate quantile by linear interpolation inside the bucket"""
+        series = self._series.get(self._key(labels))
+        return self._quantile(series, q) if series else None
+
+    def _quantile(self, series: list, q: float) -> Optional[float]:
+        counts, _, total = series
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self) -> Iterator[str]:
+        for key, (counts, total_sum, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total_sum)}"
+            yield f"{self.name}_count{labels} {total}"
+
+    def snapshot(self) -> List[Dict]:
+        return [{
+            'labels': self._labels(key),
+            'count': series[2],
+            'sum': series[1],
+            'p50': self._quantile(series, 0.50),
+            'p95': self._quantile(series, 0.95),
+            'p99': self._quantile(series, 0.99),
+        } for key, series in sorted(self._series.items())]
+
+
+class MetricsRegistry:
+    """Named collection of metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly view of every metric"""
+        return {
+            name: {'type': metric.kind, 'help': metric.documentation, 'samples': metric.snapshot()}
+            for name, metric in sorted(self._metrics.items())
+        }
+
+
+REGISTRY = MetricsRegistry()
+
+# Hot-path metrics shared by the bot's components
+SCAN_DURATION = REGISTRY.histogram(
+    'bot_scan_duration_seconds', 'Duration of one scan/validate/execute cycle')
+OPPORTUNITIES_FOUND = REGISTRY.counter(
+    'bot_opportunities_found_total', 'Opportunities surfaced by the scanner')
+OPPORTUNITIES_EXECUTED = REGISTRY.counter(
+    'bot_opportunities_executed_total', 'Opportunities sent to the executor, by outcome', ['result'])
+API_LATENCY = REGISTRY.histogram(
+    'polymarket_api_latency_seconds', 'Polymarket API call latency', ['endpoint'])
+API_ERRORS = REGISTRY.counter(
+    'polymarket_api_errors_total', 'Failed Polymarket API calls', ['endpoint'])
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    'polymarket_rate_limit_wait_seconds', 'Time spent waiting on the client-side rate limiter',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+LOOP_LAG = REGISTRY.histogram(
+    'bot_event_loop_lag_seconds', 'How late the event loop ran a periodic timer')
+DB_WRITE = REGISTRY.histogram(
+    'db_write_duration_seconds', 'SQLite insert duration', ['table'])
+QUEUE_DEPTH = REGISTRY.gauge(
+    'bot_queue_depth', 'Items waiting in internal queues', ['queue'])
+STARTUP_PHASE = REGISTRY.gauge(
+    'bot_startup_phase_seconds', 'Duration of each startup phase', ['phase'])
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator observing the duration of every call (sync or async)"""
+    def decorator(function):
+        if asyncio.iscoroutinefunction(function):
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await function(*args, **kwargs)
+                finally:
+                    histogram.observe(time.perf_counter() - started, **labels)
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+        return wrapper
+    return decorator
+
+
+class LoopLagMonitor:
+    """
+    Asyncio task that measures event-loop lag
+
+    Sleeps for `interval` and records how much later than requested it
+    woke up; anything blocking the loop shows up directly.
+    """
+
+    def __init__(self, histogram: Histogram = LOOP_LAG, interval: float = 0.25):
+        self.histogram = histogram
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, loop.time() - expected))
+
+    def start(self):
+        """Start on the running loop"""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+
+class StartupTimer:
+    """
+    Wall-clock breakdown of bot startup
+
+    Phases may run concurrently (in threads); each is timed on its own
+    and `total` is measured from the timer's origin, so overlapping
+    phases show up as a total below their sum.
+    """
+
+    def __init__(self, gauge: Gauge = STARTUP_PHASE, origin: Optional[float] = None):
+        """
+        Args:
+            gauge: Gauge receiving each phase duration
+            origin: perf_counter() value startup is measured from (default: now)
+        """
+        self.gauge = gauge
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = seconds
+        self.gauge.set(seconds, phase=name)
+
+    def mark(self, name: str) -> float:
+        """Record `name` as the time elapsed since the origin"""
+        elapsed = time.perf_counter() - self.origin
+        self.record(name, elapsed)
+        return elapsed
+
+    def summary(self) -> str:
+        return ', '.join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+
+
+class MetricsServer:
+    """
+    Serves a registry over HTTP from a daemon thread
+
+    GET /metrics        Prometheus text format
+    GET /metrics.json   MetricsRegistry.snapshot()
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, host: str = DEFAULT_METRICS_HOST,
+                 port: int = DEFAULT_METRICS_PORT):
+        self.logger = logging.getLogger(__name__)
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?', 1)[0]
+                if path == '/metrics':
+                    body = registry.render().encode()
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif path == '/metrics.json':
+                    body = json.dumps(registry.snapshot()).encode()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            self.logger.error(f"Metrics endpoint unavailable on {self.host}:{self.port}: {e}")
+            return
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+        self.logger.info(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -0,0 +1,247 @@
+"""
+Notification Dispatcher
+Background, rate-limited delivery in front of NotificationService
+
+The trading loop calls submit(), which never awaits: the notice is
+coalesced, folded into a digest or put on a bounded queue, and a
+worker task delivers it within Telegram's rate limits. A slow or
+failing Telegram API therefore costs the trading task nothing.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from metrics import QUEUE_DEPTH, REGISTRY
+
+
+NOTIFICATIONS = REGISTRY.counter(
+    'bot_notifications_total', 'Notifications submitted, by outcome', ['outcome'])
+
+# Notice kinds
+MESSAGE = 'message'
+ALERT = 'alert'
+TRADE = 'trade'
+
+
+@dataclass
+class Notice:
+    title: str
+    message: str
+    kind: str = MESSAGE
+    submitted: float = 0.0
+    retries: int = 0
+
+    @property
+    def force(self) -> bool:
+        # Alerts ignore quiet hours
+        return self.kind == ALERT
+
+
+class TokenBucket:
+    """Allows `rate` sends per second on average with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        self._refill()
+        while self.tokens < 1:
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+class NotificationDispatcher:
+    """
+    Queue + worker task in front of a NotificationService
+
+    - Coalescing: a notice with the same title and text as one sent in
+      the last coalesce_seconds is counted, not sent; the count goes out
+      as a single "repeated N times" follow-up when the window closes.
+    - Digest: trade notices are batched into one message every
+      digest_interval_seconds (or once digest_max_items pile up).
+    - Rate limit: token bucket at messages_per_minute with a small burst;
+      Telegram's retry_after on flood errors is honoured.
+    - Bounded queue: when full, new notices are dropped and counted.
+    """
+
+    def __init__(self, service, config: Dict):
+        """
+        Initialize dispatcher
+
+        Args:
+            service: NotificationService doing the actual sends
+            config: Full bot configuration (reads notifications.dispatcher)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.service = service
+
+        dispatch_config = config.get('notifications', {}).get('dispatcher', {})
+        self.coalesce_seconds = dispatch_config.get('coalesce_seconds', 300)
+        self.digest_enabled = dispatch_config.get('digest', True)
+        self.digest_interval = dispatch_config.get('digest_interval_seconds', 300)
+        self.digest_max_items = dispatch_config.get('digest_max_items', 20)
+        self.send_timeout = dispatch_config.get('send_timeout_seconds', 10)
+        self.bucket = TokenBucket(
+            dispatch_config.get('messages_per_minute', 20) / 60,
+            dispatch_config.get('burst', 3)
+        )
+
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=dispatch_config.get('queue_size', 100))
+        self.recent: Dict[Tuple[str, str], List] = {}  # key -> [first sent, suppressed count]
+        self.digest: List[Notice] = []
+        self.digest_started = 0.0
+        self.task: Optional[asyncio.Task] = None
+        self.stopping = False
+        self.dropped = 0
+
+        QUEUE_DEPTH.set_function(self.queue.qsize, queue='notifications')
+
+    def submit(self, title: str, message: str, kind: str = MESSAGE) -> bool:
+        """
+        Hand a notice to the dispatcher without waiting
+
+        Args:
+            title: Notice title
+            message: Notice body
+            kind: MESSAGE, ALERT (ignores quiet hours) or TRADE (digested)
+
+        Returns:
+            True if the notice was queued or added to the digest
+        """
+        now = time.time()
+        key = (title, message)
+        recent = self.recent.get(key)
+        if recent and now - recent[0] < self.coalesce_seconds:
+            recent[1] += 1
+            NOTIFICATIONS.inc(outcome='coalesced')
+            return False
+
+        notice = Notice(title, message, kind, now)
+
+        if kind == TRADE and self.digest_enabled:
+            if not self.digest:
+                self.digest_started = now
+            self.digest.append(notice)
+            NOTIFICATIONS.inc(outcome='digested')
+            if len(self.digest) >= self.digest_max_items:
+                self._flush_digest()
+            return True
+
+        self.recent[key] = [now, 0]
+        return self._enqueue(notice)
+
+    def _enqueue(self, notice: Notice) -> bool:
+        try:
+            self.queue.put_nowait(notice)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            NOTIFICATIONS.inc(outcome='dropped')
+            self.logger.warning("Notification queue full, dropped: %s", notice.title)
+            return False
+
+    def _flush_digest(self):
+        """Queue the pending trade notices as one message"""
+        if not self.digest:
+            return
+        items, self.digest = self.digest, []
+        if len(items) == 1:
+            self._enqueue(items[0])
+            return
+
+        body = '\n\n'.join(f"{n.title}\n{n.message}" for n in items)
+        self._enqueue(Notice(f"📬 {len(items)} trades", body, MESSAGE, time.time()))
+
+    def _flush_coalesced(self, now: float):
+        """Report notices suppressed in windows that have closed"""
+        for key, (first_sent, suppressed) in list(self.recent.items()):
+            if now - first_sent < self.coalesce_seconds:
+                continue
+            del self.recent[key]
+            if suppressed:
+                title, message = key
+                self._enqueue(Notice(
+                    f"🔁 {title}",
+                    f"{message}\n\nRepeated {suppressed} more time(s) in the last "
+                    f"{self.coalesce_seconds // 60:.0f} min",
+                    MESSAGE, now
+                ))
+
+    def start(self):
+        """Start the worker on the running loop"""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self.stopping:
+            now = time.time()
+            self._flush_coalesced(now)
+            if self.digest and now - self.digest_started >= self.digest_interval:
+                self._flush_digest()
+
+            try:
+                notice = await asyncio.wait_for(self.queue.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                continue
+            await self._deliver(notice)
+
+    async def _deliver(self, notice: Notice):
+        await self.bucket.acquire()
+        try:
+            await asyncio.wait_for(
+                self.service.send_message(notice.title, notice.message, force=notice.force),
+                timeout=self.send_timeout
+            )
+            NOTIFICATIONS.inc(outcome='sent')
+        except Exception as e:
+            # Telegram flood control says how long to back off
+            retry_after = getattr(e, 'retry_after', None)
+            if retry_after and notice.retries < 3:
+                notice.retries += 1
+                self.logger.warning("Telegram rate limited, retrying in %ss", retry_after)
+                await asyncio.sleep(float(getattr(retry_after, 'total_seconds', lambda: retry_after)()))
+                self._enqueue(notice)
+                return
+            NOTIFICATIONS.inc(outcome='failed')
+            self.logger.error("Notification failed (%s): %s", notice.title, e)
+
+    async def close(self, timeout: float = 5.0, worker_timeout: float = 2.0):
+        """
+        Flush the digest, deliver what is queued and stop
+
+        Args:
+            timeout: Seconds for delivering the queued notices
+            worker_timeout: Seconds the worker gets to finish its in-flight
+                send before it is cancelled; not taken from `timeout`, so a
+                stuck send cannot starve the final notices ("Bot Stopped")
+        """
+        if self.task:
+            # Let the worker finish its current send rather than cancelling
+            # it mid-get (wait_for can swallow a cancel that races a result)
+            self.stopping = True
+            await asyncio.wait([self.task], timeout=worker_timeout)
+            if not self.task.done():
+                self.task.cancel()
+                await asyncio.wait([self.task])
+            self.task = None
+
+        self._flush_digest()
+        deadline = time.monotonic() + timeout
+        while not self.queue.empty() and time.monotonic() < deadline:
+            try:
+                await asyncio.wait_for(self._deliver(self.queue.get_nowait()),
+                                       timeout=max(0.1, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                break
@@ -3,16 +3,16 @@ Notification Service
 Sends alerts via Telegram and other channels
 """
 
+import asyncio
+import importlib.util
 import logging
 from typing import Dict, Optional
 from datetime import datetime, time as dt_time
 
-try:
-    import telegram
-    from telegram import Bot
-    TELEGRAM_AVAILABLE = True
-except ImportError:
-    TELEGRAM_AVAILABLE = False
+# python-telegram-bot (and httpx under it) is imported by the background
+# connect, not at startup
+TELEGRAM_AVAILABLE = importlib.util.find_spec('telegram') is not None
+if not TELEGRAM_AVAILABLE:
     logging.warning("python-telegram-bot not installed. Notifications disabled.")
 
 
@@ -29,6 +29,15 @@ class NotificationService:
         self.config = config.get('notifications', {})
         self.logger = logging.getLogger(__name__)
         
+        # Telegram connects lazily in the background (see start())
+        self.telegram_bot = None
+        self.telegram_connected = asyncio.Event()
+        self.connect_task: Optional[asyncio.Task] = None
+        telegram_config = self.config.get('telegram', {})
+        self.connect_timeout = telegram_config.get('connect_timeout_seconds', 5)
+        self.retry_initial = telegram_config.get('retry_initial_seconds', 10)
+        self.retry_max = telegram_config.get('retry_max_seconds', 300)
+        
         # Telegram setup
         self.telegram_enabled = self._setup_telegram()
         
@@ -45,7 +54,7 @@ class NotificationService:
         self.logger.info(f"Notification service initialized (Telegram: {self.telegram_enabled})")
     
     def _setup_telegram(self) -> bool:
-        """Setup Telegram bot"""
+        """Check Telegram is configured; the connection is made by start()"""
         if not TELEGRAM_AVAILABLE:
             return False
         
@@ -61,20 +70,50 @@ class NotificationService:
             self.logger.warning("Telegram credentials not configured")
             return False
         
+        self.telegram_token = bot_token
+        self.telegram_chat_id = chat_id
+        return True
+    
+    def start(self):
+        """Connect to Telegram in the background (call from the running loop)"""
+        if self.telegram_enabled and self.connect_task is None:
+            self.connect_task = asyncio.get_running_loop().create_task(self._connect_loop())
+    
+    async def _connect_loop(self):
+        """Connect, retrying with exponential backoff until it succeeds"""
+        delay = self.retry_initial
+        while not await self._connect():
+            self.logger.warning(f"Telegram unreachable, retrying in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max)
+    
+    async def _connect(self) -> bool:
+        """One connection attempt, bounded by connect_timeout"""
         try:
-            self.telegram_bot = Bot(token=bot_token)
-            self.telegram_chat_id = chat_id
-            
-            # Test connection
-            self.telegram_bot.get_me()
-            
+            if self.telegram_bot is None:
+                from telegram import Bot
+                self.telegram_bot = Bot(token=self.telegram_token)
+            await asyncio.wait_for(self._call(self.telegram_bot.get_me), timeout=self.connect_timeout)
+            self.telegram_connected.set()
             self.logger.info("✅ Telegram bot connected")
             return True
-            
         except Exception as e:
-            self.logger.error(f"Failed to initialize Telegram bot: {e}")
+            self.logger.error(f"Failed to connect Telegram bot: {e!r}")
             return False
     
+    @staticmethod
+    async def _call(method, *args, **kwargs):
+        """Await a python-telegram-bot method: coroutine in v20+, blocking call before"""
+        if asyncio.iscoroutinefunction(method):
+            return await method(*args, **kwargs)
+        return await asyncio.to_thread(method, *args, **kwargs)
+    
+    async def close(self):
+        """Stop connection retries"""
+        if self.connect_task and not self.connect_task.done():
+            self.connect_task.cancel()
+        self.connect_task = None
+    
     def _setup_email(self) -> bool:
         """Setup email notifications"""
         email_config = self.config.get('email', {})
@@ -115,7 +154,7 @@ class NotificationService:
         """
         # Check quiet hours
         if not force and self._is_quiet_hours():
-            self.logger.debug(f"Skipping notification (quiet hours): {title}")
+            self.logger.debug("Skipping notification (quiet hours): %s", title)
             return
         
         # Format message
@@ -144,14 +183,25 @@ class NotificationService:
     
     async def _send_telegram(self, message: str):
         """Send message via Telegram"""
+        self.start()
+        try:
+            # Give an in-flight connection attempt a chance before giving up
+            await asyncio.wait_for(self.telegram_connected.wait(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning("Telegram not connected, message not sent")
+            return
+        
         try:
             # Remove markdown formatting to avoid parsing errors
             clean_message = message.replace('*', '')
-            await self.telegram_bot.send_message(
+            await self._call(
+                self.telegram_bot.send_message,
                 chat_id=self.telegram_chat_id,
                 text=clean_message
             )
         except Exception as e:
+            if getattr(e, 'retry_after', None):
+                raise  # flood control: the dispatcher backs off and resends
             self.logger.error(f"Error sending Telegram message: {e}")
     
     async def _send_email(self, title: str, message: str):
@@ -49,7 +49,7 @@ class OpportunityScanner:
         for category in categories:
             try:
                 markets = await self.client.get_markets(category)
-                self.logger.debug(f"Scanning {len(markets)} markets in {category}")
+                self.logger.debug("Scanning %d markets in %s", len(markets), category)
                 
                 # Scan each market
                 for market in markets:
@@ -0,0 +1,389 @@
+"""
+Orderbook Recorder
+Compact binary log of every market list and orderbook the bot looked at
+
+Layout (one directory, rolling segments):
+
+    book-<YYYYmmdd-HHMMSS>.seg   compressed blocks, appended
+    book-<YYYYmmdd-HHMMSS>.idx   one INDEX entry per block
+
+Each block holds length-prefixed records (RECORD header + body) and is
+compressed as a unit with zstd, or zlib when zstandard is not installed.
+The index gives each block's time range and offset, so a reader maps
+the segment and decompresses only the blocks it needs.
+"""
+
+import json
+import logging
+import mmap
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DEFAULT_RECORD_PATH = "data/orderbooks"
+
+# Record kinds
+BOOK = 1
+MARKET = 2
+
+# Block codecs
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+RECORD = struct.Struct('<IdB')    # body length, timestamp, kind
+BOOK_HEADER = struct.Struct('<HHH')  # token id length, bid levels, ask levels
+LEVEL = struct.Struct('<Hd')      # price in ticks, size
+BLOCK = struct.Struct('<4sBII')   # magic, codec, compressed length, raw length
+INDEX = struct.Struct('<ddQII')   # first ts, last ts, block offset, block length, records
+
+BLOCK_MAGIC = b'OBK1'
+PRICE_TICK = 10000  # Prices stored in 0.0001 units
+MAX_PRICE_TICKS = 0xFFFF
+
+# Market fields needed to replay a scan
+MARKET_FIELDS = (
+    'id', 'condition_id', 'question', 'category', 'active',
+    'yes_token_id', 'no_token_id', 'tokens', 'end_date_iso', 'end_time'
+)
+
+
+def _pack_levels(levels: List[Dict]) -> List[bytes]:
+    """Packed levels, skipping malformed ones and prices LEVEL cannot hold (0 to 6.5535)"""
+    packed = []
+    for level in levels:
+        try:
+            ticks = round(float(level['price']) * PRICE_TICK)
+            size = float(level['size'])
+        except (KeyError, TypeError, ValueError, OverflowError):
+            continue
+        if 0 <= ticks <= MAX_PRICE_TICKS:
+            packed.append(LEVEL.pack(ticks, size))
+    return packed
+
+
+def encode_book(token_id: str, book: Dict) -> bytes:
+    """Pack an orderbook ({'bids': [...], 'asks': [...]}) into a record body"""
+    token = token_id.encode()
+    bids = _pack_levels(book.get('bids', []))
+    asks = _pack_levels(book.get('asks', []))
+    return b''.join([BOOK_HEADER.pack(len(token), len(bids), len(asks)), token, *bids, *asks])
+
+
+def decode_book(body: bytes) -> Dict:
+    """Unpack a BOOK record body"""
+    token_len, n_bids, n_asks = BOOK_HEADER.unpack_from(body, 0)
+    offset = BOOK_HEADER.size
+    token_id = bytes(body[offset:offset + token_len]).decode()
+    offset += token_len
+
+    levels = [
+        {'price': ticks / PRICE_TICK, 'size': size}
+        for ticks, size in LEVEL.iter_unpack(body[offset:offset + LEVEL.size * (n_bids + n_asks)])
+    ]
+    return {'token_id': token_id, 'bids': levels[:n_bids], 'asks': levels[n_bids:]}
+
+
+def _compress(data: bytes) -> Tuple[int, bytes]:
+    if zstandard:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 6)
+
+
+def _decompress(codec: int, data, raw_length: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if not zstandard:
+            raise RuntimeError("Segment is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=raw_length)
+    return zlib.decompress(data)
+
+
+class OrderbookRecorder:
+    """
+    Appends market and orderbook snapshots to rolling segment files
+
+    record_*() only packs the record into an in-memory block; full
+    blocks are compressed and written by a background thread, so the
+    scan loop pays for a struct.pack, not for compression or I/O. A
+    book identical to the previous one for the same token is skipped;
+    the last record is kept for the `max_tracked` most recently seen
+    tokens and markets, as every 15-minute market brings new ones.
+    Recording never raises into the caller: a record that cannot be
+    encoded is logged and dropped.
+    The writer also wakes every flush_interval and writes out a partial
+    block that has waited that long, so quiet periods do not leave
+    records in memory until the next record or close().
+    """
+
+    def __init__(self, path: str = DEFAULT_RECORD_PATH, block_bytes: int = 256 * 1024,
+                 flush_interval: float = 5.0, segment_bytes: int = 64 * 1024 * 1024,
+                 max_tracked: int = 4096):
+        """
+        Initialize recorder
+
+        Args:
+            path: Directory for segment and index files
+            block_bytes: Uncompressed bytes per compressed block
+            flush_interval: Max seconds a record waits before its block is written
+            segment_bytes: Roll to a new segment past this size
+            max_tracked: Tokens (and markets) whose last record is kept for de-duplication
+        """
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(path)
+        self.block_bytes = block_bytes
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.block = bytearray()
+        self.block_first_ts = 0.0
+        self.block_last_ts = 0.0
+        self.block_records = 0
+        self.block_opened = 0.0  # Wall-clock time of the block's first record
+
+        self.max_tracked = max_tracked
+        self.last_books: OrderedDict = OrderedDict()    # token_id -> last body
+        self.last_markets: OrderedDict = OrderedDict()  # market id -> last body
+
+        self.records = 0
+        self.skipped = 0
+        self.errors = 0
+
+        self.segment = None
+        self.index = None
+        self.queue: queue.Queue = queue.Queue(maxsize=64)
+        self.writer = threading.Thread(target=self._write_loop, name="book-recorder", daemon=True)
+        self.writer.start()
+
+    def record_book(self, token_id: str, book: Dict, timestamp: Optional[float] = None):
+        """Record an orderbook fetched for a token"""
+        try:
+            body = encode_book(token_id, book)
+            if not self._changed(self.last_books, token_id, body):
+                self.skipped += 1
+                return
+            self._append(BOOK, body, timestamp)
+        except Exception as e:
+            self.errors += 1
+            self.logger.warning("Orderbook recorder dropped book for %s: %s", token_id, e)
+
+    def record_markets(self, markets: List[Dict], timestamp: Optional[float] = None):
+        """Record market metadata (only markets whose fields changed)"""
+        for market in markets:
+            try:
+                key = str(market.get('id') or market.get('condition_id'))
+                body = json.dumps(
+                    {field: market[field] for field in MARKET_FIELDS if field in market},
+                    separators=(',', ':'), default=str
+                ).encode()
+                if self._changed(self.last_markets, key, body):
+                    self._append(MARKET, body, timestamp)
+            except Exception as e:
+                self.errors += 1
+                self.logger.warning("Orderbook recorder dropped market: %s", e)
+
+    def _changed(self, last: OrderedDict, key: str, body: bytes) -> bool:
+        """Remember body as key's latest record; False if it equals the previous one"""
+        if last.get(key) == body:
+            last.move_to_end(key)
+            return False
+        last[key] = body
+        last.move_to_end(key)
+        if len(last) > self.max_tracked:
+            last.popitem(last=False)
+        return True
+
+    def _append(self, kind: int, body: bytes, timestamp: Optional[float]):
+        timestamp = timestamp if timestamp is not None else time.time()
+        with self.lock:
+            if not self.block_records:
+                self.block_first_ts = timestamp
+                self.block_opened = time.time()
+            self.block += RECORD.pack(len(body), timestamp, kind)
+            self.block += body
+            self.block_last_ts = timestamp
+            self.block_records += 1
+            self.records += 1
+
+            if (len(self.block) >= self.block_bytes or
+                    time.time() - self.block_opened >= self.flush_interval):
+                self._hand_off()
+
+    def _hand_off(self):
+        """Queue the current block for the writer (caller holds the lock)"""
+        if not self.block_records:
+            return
+        item = (bytes(self.block), self.block_first_ts, self.block_last_ts, self.block_records)
+        self.block = bytearray()
+        self.block_records = 0
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Writer can't keep up (disk stall); drop rather than block the scan
+            self.logger.warning(f"Orderbook recorder backlog full, dropped {item[3]} records")
+
+    def flush(self):
+        """Write out the current block and wait for the writer"""
+        with self.lock:
+            self._hand_off()
+        self.queue.join()
+
+    def close(self):
+        """Flush and stop the writer thread"""
+        self.flush()
+        self.queue.put(None)
+        self.writer.join(timeout=5)
+
+    def _flush_stale(self):
+        """Hand off a partial block that has waited flush_interval (writer thread)"""
+        with self.lock:
+            if self.block_records and time.time() - self.block_opened >= self.flush_interval:
+                self._hand_off()
+
+    def _write_loop(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._flush_stale()
+                continue
+            try:
+                if item is None:
+                    self._close_segment()
+                    return
+                self._write_block(*item)
+            except Exception as e:
+                self.logger.error(f"Orderbook recorder write failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write_block(self, raw: bytes, first_ts: float, last_ts: float, count: int):
+        if self.segment is None or self.segment.tell() >= self.segment_bytes:
+            self._open_segment(first_ts)
+
+        codec, payload = _compress(raw)
+        offset = self.segment.tell()
+        self.segment.write(BLOCK.pack(BLOCK_MAGIC, codec, len(payload), len(raw)))
+        self.segment.write(payload)
+        self.segment.flush()
+
+        # Index last, so readers only ever see complete blocks
+        self.index.write(INDEX.pack(first_ts, last_ts, offset, BLOCK.size + len(payload), count))
+        self.index.flush()
+
+    def _open_segment(self, timestamp: float):
+        self._close_segment()
+        name = datetime.fromtimestamp(timestamp).strftime('book-%Y%m%d-%H%M%S')
+        self.segment = open(self.directory / f"{name}.seg", 'ab')
+        self.index = open(self.directory / f"{name}.idx", 'ab')
+
+    def _close_segment(self):
+        if self.segment:
+            self.segment.close()
+            self.index.close()
+            self.segment = None
+            self.index = None
+
+
+class OrderbookReader:
+    """
+    Reads recorded segments through mmap
+
+    Blocks outside the requested time range are never touched, and
+    decompression works directly on the mapped pages.
+    """
+
+    def __init__(self, path: str = DEFAULT_RECORD_PATH):
+        self.directory = Path(path)
+
+    def segments(self) -> List[Path]:
+        """Segment files, oldest first"""
+        return sorted(self.directory.glob('book-*.seg'))
+
+    def blocks(self, segment: Path) -> List[Tuple[float, float, int, int, int]]:
+        """Index entries (first_ts, last_ts, offset, length, records) for a segment"""
+        index_path = segment.with_suffix('.idx')
+        if not index_path.exists():
+            return []
+        data = index_path.read_bytes()
+        usable = len(data) - len(data) % INDEX.size
+        return list(INDEX.iter_unpack(data[:usable]))
+
+    def time_range(self) -> Optional[Tuple[float, float]]:
+        """(first, last) recorded timestamp, or None if nothing is recorded"""
+        first = last = None
+        for segment in self.segments():
+            for first_ts, last_ts, _, _, _ in self.blocks(segment):
+                first = first_ts if first is None else min(first, first_ts)
+                last = last_ts if last is None else max(last, last_ts)
+        return (first, last) if first is not None else None
+
+    def iter_records(self, start: Optional[float] = None, end: Optional[float] = None,
+                     kinds: Tuple[int, ...] = (BOOK, MARKET)) -> Iterator[Tuple[float, int, Dict]]:
+        """
+        Iterate decoded records in recording order
+
+        Args:
+            start: Inclusive lower timestamp bound (epoch seconds)
+            end: Exclusive upper timestamp bound
+            kinds: Record kinds to decode
+
+        Yields:
+            (timestamp, kind, payload) where payload is a book dict
+            (token_id, bids, asks) or a market dict
+        """
+        for segment in self.segments():
+            blocks = [
+                entry for entry in self.blocks(segment)
+                if (start is None or entry[1] >= start) and (end is None or entry[0] < end)
+            ]
+            if not blocks:
+                continue
+
+            with open(segment, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for _, _, offset, length, _ in blocks:
+                            yield from self._iter_block(view, offset, start, end, kinds)
+                    finally:
+                        view.release()
+
+    def _iter_block(self, view: memoryview, offset: int, start: Optional[float],
+                    end: Optional[float], kinds: Tuple[int, ...]):
+        magic, codec, compressed_len, raw_len = BLOCK.unpack_from(view, offset)
+        if magic != BLOCK_MAGIC:
+            raise ValueError(f"Corrupt block at offset {offset}")
+
+        payload = view[offset + BLOCK.size:offset + BLOCK.size + compressed_len]
+        raw = memoryview(_decompress(codec, payload, raw_len))
+
+        position = 0
+        while position < len(raw):
+            length, timestamp, kind = RECORD.unpack_from(raw, position)
+            position += RECORD.size
+            body = raw[position:position + length]
+            position += length
+
+            if kind not in kinds:
+                continue
+            if (start is not None and timestamp < start) or (end is not None and timestamp >= end):
+                continue
+
+            if kind == BOOK:
+                yield timestamp, kind, decode_book(body)
+            else:
+                yield timestamp, kind, json.loads(bytes(body))
@@ -0,0 +1,222 @@
+"""
+Parameter Sweep
+Runs the replay backtest over a parameter grid on every CPU core
+
+Usage:
+    python src/param_sweep.py --config config/config.yaml --data data/orderbooks \
+        --param polymarket.min_net_margin=0.01,0.015,0.02 \
+        --param yes_no_arbitrage.profit_weight=50,100,200 \
+        --rank-by pnl --csv sweep.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import yaml
+
+from backtest import BacktestEngine, apply_overrides
+from orderbook_recorder import OrderbookReader
+
+
+# Tunables most worth sweeping (see --preset)
+DEFAULT_GRID = {
+    'polymarket.min_gross_margin': [0.02, 0.025, 0.03],
+    'polymarket.min_net_margin': [0.01, 0.015, 0.02],
+    'polymarket.slippage_tolerance': [0.0025, 0.005],
+    'yes_no_arbitrage.profit_weight': [50, 100, 200],
+    'yes_no_arbitrage.time_weight': [1, 2, 4],
+    'yes_no_arbitrage.liquidity_weight': [0.005, 0.01],
+    'capital.max_single_position': [10, 20, 30],
+}
+
+REPORT_COLUMNS = (
+    'pnl', 'reported_profit', 'successful', 'executions', 'fill_rate',
+    'avg_fill_ratio', 'opportunities', 'missed_by_filters', 'missed_edge',
+    'unhedged_value'
+)
+
+# Per-process state set up once by _init_worker
+_worker: Dict = {}
+
+
+def build_grid(spec: Dict[str, List]) -> List[Dict]:
+    """Cartesian product of {dotted key: [values]} as a list of override dicts"""
+    keys = list(spec)
+    return [dict(zip(keys, values)) for values in itertools.product(*(spec[k] for k in keys))]
+
+
+def _init_worker(config: Dict, data_path: str, engine_kwargs: Dict,
+                 start: Optional[float], end: Optional[float]):
+    """
+    Process initializer: open the recorded data once per worker
+
+    The reader mmaps the segment files, so every worker shares the same
+    page-cache pages instead of holding its own copy of the data.
+    """
+    logging.getLogger().setLevel(logging.ERROR)
+    _worker.update(
+        config=config,
+        reader=OrderbookReader(data_path),
+        engine_kwargs=engine_kwargs,
+        start=start,
+        end=end
+    )
+
+
+def _run_one(overrides: Dict) -> Dict:
+    """Run one grid point in a worker"""
+    config = apply_overrides(_worker['config'], overrides)
+    engine = BacktestEngine(config, _worker['reader'], **_worker['engine_kwargs'])
+    result = asyncio.run(engine.run(_worker['start'], _worker['end'], overrides))
+    return result.to_dict()
+
+
+def run_sweep(config: Dict, data_path: str, grid: List[Dict], workers: Optional[int] = None,
+              engine_kwargs: Optional[Dict] = None, start: Optional[float] = None,
+              end: Optional[float] = None, rank_by: str = 'pnl') -> List[Dict]:
+    """
+    Evaluate every grid point in parallel
+
+    Args:
+        config: Base bot configuration
+        data_path: Recorder directory
+        grid: Override dicts (see build_grid)
+        workers: Processes (default: CPU count)
+        engine_kwargs: BacktestEngine options (scan_interval, latency_ms, ...)
+        start: Replay start (epoch seconds)
+        end: Replay end (epoch seconds)
+        rank_by: Result field to sort by, descending
+
+    Returns:
+        Backtest result dicts, best first
+    """
+    workers = workers or os.cpu_count() or 1
+    # A few chunks per worker keeps cores busy without per-task IPC overhead
+    chunksize = max(1, len(grid) // (workers * 4))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(config, data_path, engine_kwargs or {}, start, end)
+    ) as pool:
+        results = list(pool.map(_run_one, grid, chunksize=chunksize))
+
+    results.sort(key=lambda r: r.get(rank_by, 0), reverse=True)
+    return results
+
+
+def format_table(results: List[Dict], keys: List[str], limit: int = 20) -> str:
+    """Ranked plain-text table of the top results"""
+    headers = ['#'] + [key.split('.')[-1] for key in keys] + list(REPORT_COLUMNS)
+    rows = []
+    for rank, result in enumerate(results[:limit], 1):
+        rows.append([str(rank)] +
+                    [str(result['overrides'].get(key)) for key in keys] +
+                    [f"{result[col]:.4g}" if isinstance(result[col], float) else str(result[col])
+                     for col in REPORT_COLUMNS])
+
+    widths = [max(len(h), *(len(r[i]) for r in rows)) if rows else len(h)
+              for i, h in enumerate(headers)]
+    lines = ['  '.join(h.rjust(w) for h, w in zip(headers, widths))]
+    lines += ['  '.join(c.rjust(w) for c, w in zip(row, widths)) for row in rows]
+    return '\n'.join(lines)
+
+
+def _parse_param(text: str):
+    key, _, values = text.partition('=')
+    return key, [yaml.safe_load(v) for v in values.split(',')]
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over recorded orderbooks")
+    parser.add_argument('--config', default='config/config.yaml')
+    parser.add_argument('--data', default='data/orderbooks', help='Recorder directory')
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=V1,V2,...',
+                        help='Grid axis, e.g. polymarket.min_net_margin=0.01,0.02')
+    parser.add_argument('--grid', help='YAML file of {key: [values]}')
+    parser.add_argument('--preset', action='store_true', help='Use the built-in default grid')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='Fixed override applied to every run')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--start', help='ISO start time')
+    parser.add_argument('--end', help='ISO end time')
+    parser.add_argument('--scan-interval', type=float)
+    parser.add_argument('--latency-ms', type=float, default=150)
+    parser.add_argument('--jitter-ms', type=float, default=100)
+    parser.add_argument('--rank-by', default='pnl')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--csv', help='Write all results to this CSV file')
+    parser.add_argument('--json', help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    config = apply_overrides(config, {
+        key: yaml.safe_load(value)
+        for key, _, value in (item.partition('=') for item in args.set)
+    })
+
+    spec: Dict[str, List] = {}
+    if args.preset:
+        spec.update(DEFAULT_GRID)
+    if args.grid:
+        with open(args.grid) as f:
+            spec.update(yaml.safe_load(f))
+    spec.update(dict(_parse_param(p) for p in args.param))
+    if not spec:
+        parser.error("No grid given (use --param, --grid or --preset)")
+
+    grid = build_grid(spec)
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Sweeping {len(grid)} combinations on {workers} workers...")
+
+    start = datetime.fromisoformat(args.start).timestamp() if args.start else None
+    end = datetime.fromisoformat(args.end).timestamp() if args.end else None
+
+    started = time.time()
+    try:
+        results = run_sweep(
+            config, args.data, grid, workers,
+            engine_kwargs={
+                'scan_interval': args.scan_interval,
+                'latency_ms': args.latency_ms,
+                'latency_jitter_ms': args.jitter_ms,
+            },
+            start=start, end=end, rank_by=args.rank_by
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.time() - started
+
+    keys = list(spec)
+    print(format_table(results, keys, args.top))
+    print(f"\n{len(grid)} runs in {elapsed:.1f}s ({len(grid) / elapsed:.1f} runs/s)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['rank'] + keys + list(REPORT_COLUMNS))
+            for rank, result in enumerate(results, 1):
+                writer.writerow([rank] + [result['overrides'].get(k) for k in keys] +
+                                [result[col] for col in REPORT_COLUMNS])
+
+
+if __name__ == "__main__":
+    main()
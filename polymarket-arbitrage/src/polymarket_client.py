@@ -3,23 +3,49 @@ Polymarket API Client
 Wrapper for Polymarket CLOB API
 """
 
+import asyncio
 import logging
 import time
 from decimal import Decimal
 from typing import Dict, List, Optional
 
 try:
-    from py_clob_client.client import ApiCreds, ClobClient
-    from py_clob_client.clob_types import OrderArgs, OrderType
-    from py_clob_client.order_builder.constants import BUY, SELL
+    from .credential_cache import DEFAULT_CREDS_PATH, CredentialCache, fingerprint
+    from .metrics import API_ERRORS, API_LATENCY, RATE_LIMIT_WAIT, timed
+    from .sim_exchange import SimulatedExchange
 except ImportError:
-    logging.warning("py-clob-client not installed. Running in simulation mode.")
-    ClobClient = None
-    ApiCreds = None
-    OrderArgs = None
-    OrderType = None
-    BUY = "buy"
-    SELL = "sell"
+    # Run from src/ (bot, dashboard) rather than as the src package
+    # (start_all.sh, preflight_check.py)
+    from credential_cache import DEFAULT_CREDS_PATH, CredentialCache, fingerprint
+    from metrics import API_ERRORS, API_LATENCY, RATE_LIMIT_WAIT, timed
+    from sim_exchange import SimulatedExchange
+
+# py_clob_client pulls in web3/eth_account (~1s to import); it is only
+# loaded when live credentials are present, see _import_clob()
+ClobClient = None
+ApiCreds = None
+OrderArgs = None
+OrderType = None
+BUY = "buy"
+SELL = "sell"
+
+# Minimum seconds between credential re-derivations after auth errors
+AUTH_REFRESH_INTERVAL = 60
+
+
+def _import_clob() -> bool:
+    """Import py_clob_client on first live use"""
+    global ClobClient, ApiCreds, OrderArgs, OrderType, BUY, SELL
+    if ClobClient is not None:
+        return True
+    try:
+        from py_clob_client.client import ApiCreds, ClobClient
+        from py_clob_client.clob_types import OrderArgs, OrderType
+        from py_clob_client.order_builder.constants import BUY, SELL
+    except ImportError:
+        logging.warning("py-clob-client not installed. Running in simulation mode.")
+        return False
+    return True
 
 
 class PolymarketClient:
@@ -40,18 +66,9 @@ class PolymarketClient:
         self.config = config
         
         # Initialize client
-        if private_key and ClobClient and ApiCreds:
+        if private_key and _import_clob():
             try:
-                # Initialize temporary client to derive API credentials
-                temp_client = ClobClient(
-                    host=config.get('api_endpoint', 'https://clob.polymarket.com'),
-                    key=private_key,
-                    chain_id=config.get('chain_id', 137)
-                )
-                
-                # Derive fresh API credentials from private key
-                creds = temp_client.derive_api_key()
-                self.logger.info(f"✅ Derived API credentials: {creds.api_key[:10]}...")
+                creds = self._load_api_creds(private_key)
                 
                 # Get wallet address from private key
                 from eth_account import Account
@@ -82,17 +99,98 @@ class PolymarketClient:
             self.simulation_mode = True
             self.logger.warning("⚠️  Running in simulation mode (no credentials)")
         
+        self.creds_refreshed_at = 0.0
+        
         # Rate limiting
         self.last_request_time = 0
         self.min_request_interval = 1.0 / config.get('max_requests_per_second', 10)
+        
+        # Optional OrderbookRecorder; every fetched market list and book is appended to it
+        self.recorder = None
+        
+        # Local matching engine backing simulation mode
+        self.sim = SimulatedExchange(config.get('simulation', {})) if self.simulation_mode else None
+    
+    def apply_config(self, config: Dict):
+        """
+        Apply a reloaded polymarket section
+        
+        Only the request rate and fee/gas settings take effect; the
+        endpoint, chain, credential cache and simulated exchange are
+        set up once (config_manager.RESTART_ONLY_KEYS).
+        """
+        self.config = config
+        self.min_request_interval = 1.0 / config.get('max_requests_per_second', 10)
+    
+    def _load_api_creds(self, private_key: str, use_cache: bool = True):
+        """API credentials from the on-disk cache, deriving (and caching) them if needed"""
+        host = self.config.get('api_endpoint', 'https://clob.polymarket.com')
+        chain_id = self.config.get('chain_id', 137)
+        
+        cache_config = self.config.get('credential_cache', {})
+        cache = None
+        if cache_config.get('enabled', True):
+            cache = CredentialCache(
+                cache_config.get('path', DEFAULT_CREDS_PATH),
+                ttl_hours=cache_config.get('ttl_hours', 24 * 7)
+            )
+            key = fingerprint(private_key, host, chain_id)
+            if not use_cache:
+                cache.clear()  # Rejected by the API; never fall back to these
+            cached = cache.load(key) if use_cache else None
+            if cached:
+                self.logger.info(f"✅ Using cached API credentials: {cached['api_key'][:10]}...")
+                return ApiCreds(**cached)
+        
+        # Temporary client to derive API credentials (signed network call)
+        temp_client = ClobClient(host=host, key=private_key, chain_id=chain_id)
+        creds = temp_client.derive_api_key()
+        self.logger.info(f"✅ Derived API credentials: {creds.api_key[:10]}...")
+        
+        if cache:
+            cache.store(key, {
+                'api_key': creds.api_key,
+                'api_secret': creds.api_secret,
+                'api_passphrase': creds.api_passphrase,
+            })
+        return creds
+    
+    def _handle_auth_error(self, error: Exception) -> bool:
+        """
+        Re-derive API credentials after the CLOB rejects them (401/403)
+        
+        Cached credentials can be revoked or rotated before their TTL; the
+        cache is dropped and fresh credentials derived and cached, so the
+        next request (and the next restart) uses them. At most once per
+        AUTH_REFRESH_INTERVAL, as both legs of a trade fail together.
+        
+        Returns:
+            True if the error was an auth rejection and credentials were refreshed
+        """
+        if getattr(error, 'status_code', None) not in (401, 403):
+            return False
+        if time.time() - self.creds_refreshed_at < AUTH_REFRESH_INTERVAL:
+            return False
+        self.creds_refreshed_at = time.time()
+        
+        self.logger.warning("API credentials rejected (HTTP %s), re-deriving", error.status_code)
+        try:
+            self.client.set_api_creds(self._load_api_creds(self.private_key, use_cache=False))
+        except Exception as e:
+            self.logger.error("Could not re-derive API credentials: %s", e)
+            return False
+        return True
     
     def _rate_limit(self):
         """Enforce rate limiting"""
         elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_request_interval:
-            time.sleep(self.min_request_interval - elapsed)
+        wait = max(0.0, self.min_request_interval - elapsed)
+        if wait:
+            time.sleep(wait)
+        RATE_LIMIT_WAIT.observe(wait)
         self.last_request_time = time.time()
 
+    @timed(API_LATENCY, endpoint='get_balance')
     def get_balance(self) -> Dict[str, float]:
         """
         Get USDC balance on Polygon
@@ -101,13 +199,7 @@ class PolymarketClient:
             Dict with 'balance' (total USDC) and 'available' (not in open orders)
         """
         if self.simulation_mode:
-            # Return simulated balance with locked field for consistency
-            return {
-                'balance': 100.0,
-                'available': 100.0,
-                'currency': 'USDC',
-                'locked': 0.0
-            }
+            return self.sim.get_balance()
 
         try:
             self._rate_limit()
@@ -157,6 +249,8 @@ class PolymarketClient:
                 }
 
         except Exception as e:
+            API_ERRORS.inc(endpoint='get_balance')
+            self._handle_auth_error(e)
             self.logger.error(f"Error fetching balance: {e}")
             import traceback
             self.logger.error(traceback.format_exc())
@@ -167,6 +261,7 @@ class PolymarketClient:
                 'error': str(e)
             }
 
+    @timed(API_LATENCY, endpoint='get_markets')
     async def get_markets(self, category: Optional[str] = None) -> List[Dict]:
         """
         Get all active markets
@@ -178,7 +273,14 @@ class PolymarketClient:
             List of market dictionaries
         """
         if self.simulation_mode:
-            return self._get_simulated_markets(category)
+            await self.sim.read_delay()
+            markets = self.sim.get_markets()
+            if category:
+                markets = [m for m in markets if m.get('category') == category]
+            markets = [m for m in markets if m.get('active', False)]
+            if self.recorder:
+                self.recorder.record_markets(markets)
+            return markets
         
         try:
             self._rate_limit()
@@ -202,14 +304,19 @@ class PolymarketClient:
             # Filter active markets only
             markets = [m for m in markets if m.get('active', False)]
             
+            if self.recorder:
+                self.recorder.record_markets(markets)
+            
             return markets
             
         except Exception as e:
+            API_ERRORS.inc(endpoint='get_markets')
             self.logger.error(f"Error fetching markets: {e}")
             import traceback
             self.logger.error(traceback.format_exc())
             return []
     
+    @timed(API_LATENCY, endpoint='get_market')
     async def get_market(self, market_id: str) -> Optional[Dict]:
         """
         Get specific market data
@@ -221,7 +328,8 @@ class PolymarketClient:
             Market data dict or None
         """
         if self.simulation_mode:
-            return self._get_simulated_market(market_id)
+            await self.sim.read_delay()
+            return self.sim.get_market(market_id)
         
         try:
             self._rate_limit()
@@ -229,9 +337,11 @@ class PolymarketClient:
             return market
             
         except Exception as e:
-            self.logger.error(f"Error fetching market {market_id}: {e}")
+            API_ERRORS.inc(endpoint='get_market')
+            self.logger.error("Error fetching market %s: %s", market_id, e)
             return None
     
+    @timed(API_LATENCY, endpoint='get_orderbook')
     async def get_orderbook(self, token_id: str) -> Optional[Dict]:
         """
         Get orderbook for a token
@@ -243,23 +353,133 @@ class PolymarketClient:
             Orderbook data with bids and asks
         """
         if self.simulation_mode:
-            return self._get_simulated_orderbook(token_id)
+            await self.sim.read_delay()
+            book = self.sim.get_orderbook(token_id)
+            if self.recorder:
+                self.recorder.record_book(token_id, book)
+            return book
         
         try:
             self._rate_limit()
             orderbook = self.client.get_order_book(token_id)
             
-            return {
+            book = {
                 'bids': [{'price': float(b['price']), 'size': float(b['size'])} 
                          for b in orderbook.get('bids', [])],
                 'asks': [{'price': float(a['price']), 'size': float(a['size'])} 
                          for a in orderbook.get('asks', [])]
             }
             
+            if self.recorder:
+                self.recorder.record_book(token_id, book)
+            
+            return book
+            
         except Exception as e:
-            self.logger.error(f"Error fetching orderbook for {token_id}: {e}")
+            API_ERRORS.inc(endpoint='get_orderbook')
+            self.logger.error("Error fetching orderbook for %s: %s", token_id, e)
             return None
     
+    @timed(API_LATENCY, endpoint='create_order')
+    async def create_order(self, order: Dict) -> Dict:
+        """
+        Place a limit order
+        
+        Args:
+            order: token_id, side ('buy'/'sell'), price, size (shares),
+                   optional order_type ('GTC', 'IOC', 'FOK')
+            
+        Returns:
+            Dict with success, order_id, filled_size (USDC spent),
+            fill_price (average) and error
+        """
+        if self.simulation_mode:
+            return await self.sim.create_order(order)
+        
+        try:
+            self._rate_limit()
+            order_args = OrderArgs(
+                token_id=order['token_id'],
+                price=float(order['price']),
+                size=float(order['size']),
+                side=BUY if order.get('side', 'buy') == 'buy' else SELL
+            )
+            # IOC maps to Polymarket's fill-and-kill (FAK): fill what the book has at
+            # the limit and cancel the rest. Anything else rests as GTC
+            time_in_force = {'IOC': 'FAK', 'FOK': 'FOK'}.get(order.get('order_type', 'GTC').upper(), 'GTC')
+            
+            # Blocking HTTP calls; run them off the event loop so both legs go out together
+            signed = await asyncio.to_thread(self.client.create_order, order_args)
+            response = await asyncio.to_thread(
+                self.client.post_order, signed, getattr(OrderType, time_in_force, OrderType.GTC)
+            )
+            
+            if not response or not response.get('success', False):
+                return {
+                    'success': False,
+                    'order_id': (response or {}).get('orderID'),
+                    'error': (response or {}).get('errorMsg') or 'Order rejected'
+                }
+            
+            # For a buy, makingAmount is USDC paid and takingAmount is shares received
+            spent = float(response.get('makingAmount') or 0)
+            shares = float(response.get('takingAmount') or 0)
+            return {
+                'success': True,
+                'order_id': response.get('orderID'),
+                'status': response.get('status'),
+                'filled_size': spent,
+                'filled_shares': shares,
+                'fill_price': spent / shares if shares else float(order['price']),
+                'error': None
+            }
+            
+        except Exception as e:
+            API_ERRORS.inc(endpoint='create_order')
+            # Derivation is a blocking network call; the order itself is not retried
+            await asyncio.to_thread(self._handle_auth_error, e)
+            self.logger.error("Error placing order on %s: %s", order.get('token_id'), e)
+            return {'success': False, 'error': str(e)}
+    
+    @timed(API_LATENCY, endpoint='cancel_order')
+    async def cancel_order(self, order_id: str) -> Dict:
+        """
+        Cancel an open order
+        
+        Args:
+            order_id: Order identifier
+            
+        Returns:
+            Dict with success and error
+        """
+        if self.simulation_mode:
+            return await self.sim.cancel_order(order_id)
+        
+        try:
+            self._rate_limit()
+            await asyncio.to_thread(self.client.cancel, order_id)
+            return {'success': True, 'order_id': order_id}
+        except Exception as e:
+            API_ERRORS.inc(endpoint='cancel_order')
+            await asyncio.to_thread(self._handle_auth_error, e)
+            self.logger.error("Error cancelling order %s: %s", order_id, e)
+            return {'success': False, 'order_id': order_id, 'error': str(e)}
+
+    async def redeem(self, market_id: str) -> Optional[float]:
+        """
+        Redeem winning shares of a resolved market
+
+        Args:
+            market_id: Market (condition) identifier
+
+        Returns:
+            USDC credited, or None if this client cannot redeem (live
+            redemption is an on-chain CTF call, not part of the CLOB API)
+        """
+        if self.simulation_mode:
+            return self.sim.redeem(market_id)
+        return None
+
     async def execute_arbitrage(self, opportunity: Dict) -> Dict:
         """
         Execute an arbitrage trade
@@ -271,7 +491,7 @@ class PolymarketClient:
             Result dict with success status and details
         """
         if self.simulation_mode:
-            return self._simulate_execution(opportunity)
+            return await self._simulate_execution(opportunity)
         
         try:
             # Extract trade details
@@ -369,84 +589,43 @@ class PolymarketClient:
     
     # Simulation mode methods
     
-    def _get_simulated_markets(self, category: Optional[str] = None) -> List[Dict]:
-        """Return simulated market data"""
-        simulated = [
-            {
-                'id': 'sim_market_1',
-                'question': 'Will Bitcoin reach $100k by end of 2024?',
-                'category': 'Crypto',
-                'active': True,
-                'yes_price': 0.65,
-                'no_price': 0.35,
-                'volume_24h': 50000
-            },
-            {
-                'id': 'sim_market_2',
-                'question': 'Will there be a US recession in 2024?',
-                'category': 'Politics',
-                'active': True,
-                'yes_price': 0.42,
-                'no_price': 0.58,
-                'volume_24h': 75000
-            }
-        ]
+    async def _simulate_execution(self, opportunity: Dict) -> Dict:
+        """Execute both legs of an opportunity on the simulated exchange"""
+        token_a = opportunity.get('token_a_id') or opportunity.get('yes_token_id')
+        token_b = opportunity.get('token_b_id') or opportunity.get('no_token_id')
+        price_a = opportunity.get('price_a', opportunity.get('yes_price'))
+        price_b = opportunity.get('price_b', opportunity.get('no_price'))
+        amount = opportunity.get('amount') or opportunity.get('position_size', 10)
         
-        if category:
-            simulated = [m for m in simulated if m['category'] == category]
+        if not token_a or not token_b or price_a is None or price_b is None:
+            return {'success': False, 'error': 'Opportunity has no tradable tokens', 'simulated': True}
         
-        return simulated
-    
-    def _get_simulated_market(self, market_id: str) -> Optional[Dict]:
-        """Return simulated market"""
-        markets = self._get_simulated_markets()
-        for market in markets:
-            if market['id'] == market_id:
-                return market
-        return None
-    
-    def _get_simulated_orderbook(self, token_id: str) -> Dict:
-        """Return simulated orderbook"""
-        import random
-        
-        base_price = 0.5 + random.uniform(-0.2, 0.2)
-        
-        return {
-            'bids': [
-                {'price': base_price - 0.01, 'size': 100},
-                {'price': base_price - 0.02, 'size': 200},
-                {'price': base_price - 0.03, 'size': 300}
-            ],
-            'asks': [
-                {'price': base_price + 0.01, 'size': 100},
-                {'price': base_price + 0.02, 'size': 200},
-                {'price': base_price + 0.03, 'size': 300}
-            ]
-        }
-    
-    def _simulate_execution(self, opportunity: Dict) -> Dict:
-        """Simulate trade execution"""
-        import random
-
-        # Simulate with 95% success rate
-        success = random.random() > 0.05
+        # Equal share counts on both legs, sized to `amount` USDC in total
+        shares = float(amount) / (float(price_a) + float(price_b))
+        result_a, result_b = await asyncio.gather(
+            self.sim.create_order({'token_id': token_a, 'side': 'buy', 'price': price_a,
+                                   'size': shares, 'order_type': 'IOC'}),
+            self.sim.create_order({'token_id': token_b, 'side': 'buy', 'price': price_b,
+                                   'size': shares, 'order_type': 'IOC'})
+        )
         
-        if success:
-            # Simulate slippage
-            slippage = random.uniform(0, 0.002)  # 0-0.2% slippage
-            actual_profit = opportunity['expected_profit'] * (1 - slippage)
-            
-            return {
-                'success': True,
-                'profit': actual_profit,
-                'order_a_id': f"sim_order_{int(time.time())}_a",
-                'order_b_id': f"sim_order_{int(time.time())}_b",
-                'timestamp': time.time(),
-                'simulated': True
-            }
-        else:
+        if not (result_a.get('success') and result_b.get('success')):
             return {
                 'success': False,
-                'error': 'Simulated failure',
+                'error': result_a.get('error') or result_b.get('error'),
                 'simulated': True
             }
+        
+        hedged = min(result_a['filled_shares'], result_b['filled_shares'])
+        cost = result_a['filled_size'] + result_b['filled_size']
+        fee = self.config.get('platform_fee', 0.02) * hedged
+        
+        return {
+            'success': hedged > 0,
+            'profit': hedged - cost - fee,
+            'order_a_id': result_a.get('order_id'),
+            'order_b_id': result_b.get('order_id'),
+            'timestamp': time.time(),
+            'simulated': True,
+            'error': None if hedged > 0 else 'No liquidity at limit'
+        }
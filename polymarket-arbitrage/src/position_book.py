@@ -0,0 +1,345 @@
+"""
+Position Book
+Tracks held YES/NO shares from fill through resolution and redemption
+
+Every fill the executor reports is booked against its market. Once a
+market's window has ended the book polls it until it resolves, redeems
+the winning shares and releases the cost basis (plus profit, with
+auto_reinvest) back to the deployable pool. With 15-minute markets the
+time capital spends locked up, not the margin, limits how much the bot
+can trade, so capital is released the moment a payout lands.
+
+With a RedemptionBatcher, resolved positions are redeemed together in
+a background task (see redemption_batcher.py) and each payout is net
+of its share of the transaction's gas.
+
+A client that cannot redeem (live mode: redemption is an on-chain CTF
+call outside the CLOB API) would otherwise pin resolved positions, and
+their capital and slots, forever. Once the winner is known their payout
+is fixed, so they are released as UNCLAIMED with the winning shares as
+payout, and left to be redeemed on-chain outside the bot. That frees the
+slot, but not the money: until redeemed the payout is not in the wallet,
+so it is tracked as unclaimed_value and its cost stays out of capital().
+
+Rows are persisted so positions survive a restart.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from metrics import REGISTRY
+
+
+POSITIONS_OPEN = REGISTRY.gauge('bot_positions_open', 'Markets with unredeemed shares')
+CAPITAL_DEPLOYED = REGISTRY.gauge('bot_capital_deployed_usdc', 'Cost basis of unredeemed positions')
+REDEMPTIONS = REGISTRY.counter('bot_redemptions_total', 'Redeemed positions')
+CAPITAL_LOCKED = REGISTRY.histogram(
+    'bot_capital_lock_seconds', 'Time from first fill to redemption',
+    buckets=(60, 300, 600, 900, 1200, 1800, 3600, 7200, 21600, 86400))
+
+# Position status
+OPEN = 'open'            # Market still trading
+RESOLVED = 'resolved'    # Winner known, awaiting redemption
+REDEEMED = 'redeemed'    # Payout received, capital released
+UNCLAIMED = 'unclaimed'  # Resolved, capital released; redeem on-chain outside the bot
+ABANDONED = 'abandoned'  # Simulated position from a previous run
+
+
+@dataclass
+class Position:
+    market_id: str
+    market_name: str
+    yes_token_id: str
+    no_token_id: str
+    yes_shares: float = 0.0
+    no_shares: float = 0.0
+    cost: float = 0.0          # USDC spent on both legs
+    opened_at: float = 0.0
+    resolves_at: float = 0.0   # Window end (epoch); polled for resolution from then
+    status: str = OPEN
+    winner: Optional[str] = None
+    payout: Optional[float] = None   # Net of redemption gas when batched
+    redeemed_at: Optional[float] = None
+    simulated: bool = False
+
+    @property
+    def paired_shares(self) -> float:
+        """YES+NO pairs, each worth exactly $1 at resolution"""
+        return min(self.yes_shares, self.no_shares)
+
+    @property
+    def winning_shares(self) -> float:
+        """Shares that pay $1 each once resolved"""
+        return self.yes_shares if self.winner == 'YES' else self.no_shares
+
+    @property
+    def profit(self) -> Optional[float]:
+        return None if self.payout is None else self.payout - self.cost
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class PositionBook:
+    """Held positions and the capital they lock up"""
+
+    def __init__(self, client, config: Dict, database=None, batcher=None):
+        """
+        Initialize position book
+
+        Args:
+            client: PolymarketClient (get_market, redeem)
+            config: Full bot configuration (reads the resolution section)
+            database: Database for persistence (optional)
+            batcher: RedemptionBatcher; without one each position is
+                redeemed on its own through client.redeem
+        """
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.database = database
+        self.batcher = batcher
+
+        resolution_config = config.get('resolution', {})
+        self.check_interval = resolution_config.get('check_interval', 30)
+        self.auto_reinvest = resolution_config.get('auto_reinvest', True)
+        self.max_concurrent_checks = resolution_config.get('max_concurrent_checks', 10)
+
+        self.positions: Dict[str, Position] = {}
+        self.realized_profit = 0.0
+        self.unclaimed_value = 0.0   # Payout of UNCLAIMED positions, not yet in the wallet
+        self.unclaimed_cost = 0.0    # Their cost basis, spent and not yet returned
+        self.last_check = 0.0
+        self.redemption_task: Optional[asyncio.Task] = None
+        self.completed: List[Position] = []  # Redeemed by the background task, not yet reported
+
+        if database:
+            self._load()
+
+        POSITIONS_OPEN.set_function(lambda: self.open_count)
+        CAPITAL_DEPLOYED.set_function(lambda: self.deployed_capital)
+
+    def _load(self):
+        """Rehydrate unredeemed positions from the database"""
+        for row in self.database.get_unredeemed_positions():
+            position = Position(**{k: row[k] for k in Position.__dataclass_fields__})
+            position.simulated = bool(position.simulated)
+            if position.simulated and self.client.simulation_mode:
+                # The simulated exchange starts fresh every run
+                position.status = ABANDONED
+                self._save(position)
+                continue
+            self.positions[position.market_id] = position
+        if self.positions:
+            self.logger.info(f"Loaded {len(self.positions)} open positions "
+                             f"(${self.deployed_capital:.2f} deployed)")
+
+    def _save(self, position: Position):
+        if not self.database:
+            return
+        try:
+            self.database.save_position(position.to_dict())
+        except Exception as e:
+            self.logger.error(f"Failed to persist position {position.market_id}: {e}")
+
+    @property
+    def open_count(self) -> int:
+        return len(self.positions)
+
+    @property
+    def deployed_capital(self) -> float:
+        """USDC tied up in positions not yet redeemed"""
+        return sum((p.cost for p in self.positions.values()), 0.0)
+
+    def capital(self, base: Decimal) -> Decimal:
+        """Trading capital: base plus realized profit when auto_reinvest is on,
+        less the cost of positions whose payout is still unclaimed"""
+        capital = base - Decimal(str(round(self.unclaimed_cost, 6)))
+        if self.auto_reinvest:
+            capital += Decimal(str(round(self.realized_profit, 6)))
+        return capital
+
+    def add_fill(self, opportunity: Dict, result) -> Optional[Position]:
+        """
+        Book the shares bought by one execution
+
+        Args:
+            opportunity: Executed opportunity (market and token ids, time_remaining)
+            result: ExecutionResult; unhedged fills from a failed execution
+                are booked too, since those shares are held all the same
+
+        Returns:
+            The market's position, or None if nothing was filled
+        """
+        legs = {}
+        for name, order in (('yes', result.yes_order), ('no', result.no_order)):
+            if order and order.filled_size > 0 and order.fill_price > 0:
+                legs[name] = (float(order.filled_size / order.fill_price), float(order.filled_size))
+        if not legs:
+            return None
+
+        now = time.time()
+        market_id = opportunity['market_id']
+        position = self.positions.get(market_id)
+        if position is None:
+            position = Position(
+                market_id=market_id,
+                market_name=opportunity.get('market_name', ''),
+                yes_token_id=opportunity.get('yes_token_id', ''),
+                no_token_id=opportunity.get('no_token_id', ''),
+                opened_at=now,
+                resolves_at=now + float(opportunity.get('time_remaining') or 0),
+                simulated=bool(self.client.simulation_mode)
+            )
+            self.positions[market_id] = position
+
+        shares, spent = legs.get('yes', (0.0, 0.0))
+        position.yes_shares += shares
+        position.cost += spent
+        shares, spent = legs.get('no', (0.0, 0.0))
+        position.no_shares += shares
+        position.cost += spent
+
+        self._save(position)
+        return position
+
+    async def settle(self, now: Optional[float] = None, force: bool = False,
+                     capital: Optional[Decimal] = None) -> List[Position]:
+        """
+        Check ended markets for resolution and redeem the resolved ones
+
+        Cheap to call every cycle: markets are only polled once their
+        window has ended, and at most every check_interval seconds.
+
+        Args:
+            now: Current epoch time
+            force: Ignore check_interval (and send any pending batch)
+            capital: Trading capital, for the batcher's utilisation trigger
+
+        Returns:
+            Positions redeemed since the last call
+        """
+        now = now or time.time()
+        redeemed, self.completed = self.completed, []
+
+        due = [p for p in self.positions.values()
+               if p.resolves_at <= now and (p.status == OPEN or (p.status == RESOLVED and not self.batcher))]
+        if due and (force or now - self.last_check >= self.check_interval):
+            self.last_check = now
+            redeemed.extend(await self._check(due))
+
+        if self.batcher:
+            self._schedule_redemption(now, force, capital)
+        return redeemed
+
+    async def _check(self, due: List[Position]) -> List[Position]:
+        semaphore = asyncio.Semaphore(self.max_concurrent_checks)
+
+        async def check(position: Position):
+            async with semaphore:
+                if position.status == OPEN:
+                    await self._check_resolution(position)
+                if position.status == RESOLVED and not self.batcher:
+                    return await self._redeem(position)
+
+        results = await asyncio.gather(*(check(p) for p in due), return_exceptions=True)
+        redeemed = []
+        for position, outcome in zip(due, results):
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Settling {position.market_id} failed: {outcome}")
+            elif outcome:
+                redeemed.append(position)
+        return redeemed
+
+    def _schedule_redemption(self, now: float, force: bool, capital: Optional[Decimal]):
+        """Start a batched redemption in the background when the batcher says so"""
+        if self.redemption_task and not self.redemption_task.done():
+            return
+        market_ids = [p.market_id for p in self.positions.values() if p.status == RESOLVED]
+        utilisation = self.deployed_capital / float(capital) if capital else 0.0
+        if market_ids and (force or self.batcher.due(market_ids, now, utilisation)):
+            self.redemption_task = asyncio.create_task(self._redeem_batch(market_ids))
+
+    async def _redeem_batch(self, market_ids: List[str]):
+        try:
+            results = await self.batcher.redeem(market_ids)
+        except Exception as e:
+            self.logger.error(f"Batched redemption failed: {e}")
+            return
+        for market_id, (payout, gas) in results.items():
+            position = self.positions.get(market_id)
+            if position:
+                self._release(position, payout - gas)
+                self.completed.append(position)
+
+    async def wait_for_redemptions(self):
+        """Let an in-flight batched redemption finish (shutdown)"""
+        if self.redemption_task:
+            await asyncio.gather(self.redemption_task, return_exceptions=True)
+
+    async def _check_resolution(self, position: Position):
+        market = await self.client.get_market(position.market_id)
+        if not market or not market.get('closed'):
+            return
+
+        winner = market.get('winner')
+        if not winner:
+            for token in market.get('tokens', []):
+                if token.get('winner'):
+                    winner = 'YES' if token.get('token_id') == position.yes_token_id else 'NO'
+        if not winner:
+            return  # Closed but not settled yet
+
+        position.status = RESOLVED
+        position.winner = winner
+        self._save(position)
+        self.logger.info(f"🏁 {position.market_name[:50]} resolved {winner}",
+                         extra={'market_id': position.market_id})
+
+    async def _redeem(self, position: Position) -> bool:
+        payout = await self.client.redeem(position.market_id)
+        if payout is None:
+            # This client cannot redeem; the payout is fixed by the winner, so
+            # stop holding capital and a slot against it
+            self._release(position, position.winning_shares, status=UNCLAIMED)
+            self.logger.warning(
+                "%s resolved %s: %.2f winning shares must be redeemed on-chain",
+                position.market_name[:50], position.winner, position.winning_shares,
+                extra={'market_id': position.market_id}
+            )
+            return True
+        self._release(position, payout)
+        return True
+
+    def _release(self, position: Position, payout: float, status: str = REDEEMED):
+        """Record the payout and return the position's capital to the pool"""
+        position.status = status
+        position.payout = payout
+        position.redeemed_at = time.time()
+        self._save(position)
+        del self.positions[position.market_id]
+
+        if status == UNCLAIMED:
+            self.unclaimed_value += payout
+            self.unclaimed_cost += position.cost
+            return
+        self.realized_profit += position.profit
+        REDEMPTIONS.inc()
+        CAPITAL_LOCKED.observe(position.redeemed_at - position.opened_at)
+        self.logger.info(
+            "💵 Redeemed %s: payout $%.2f, cost $%.2f, profit $%.2f, capital locked %.0fs",
+            position.market_name[:50], position.payout, position.cost, position.profit,
+            position.redeemed_at - position.opened_at, extra={'market_id': position.market_id}
+        )
+
+    def get_status(self) -> Dict:
+        return {
+            'open_positions': self.open_count,
+            'deployed_capital': self.deployed_capital,
+            'realized_profit': self.realized_profit,
+            'unclaimed_value': self.unclaimed_value,
+            'awaiting_redemption': sum(1 for p in self.positions.values() if p.status == RESOLVED),
+        }
@@ -0,0 +1,203 @@
+"""
+Profiler
+On-demand profiling of the running bot, without stopping trading
+
+Two modes:
+
+    sample  A background thread samples the main thread's stack every
+            few milliseconds for N seconds and writes collapsed stacks
+            ("frame;frame;frame count" per line), the input format of
+            flamegraph.pl, speedscope and inferno.
+    scan    cProfile around the next _scan_and_execute() call, written
+            as a .prof file (snakeviz, flameprof, pstats) plus a text
+            summary of the top functions.
+
+Requests arrive as SIGUSR2, optionally with a JSON request file
+written by the dashboard naming the mode, duration and output file.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+
+DEFAULT_PROFILE_DIR = "logs"
+DEFAULT_REQUEST_PATH = "data/profile_request.json"
+
+MAX_SAMPLE_SECONDS = 300
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_name}:{frame.f_lineno}"
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval
+
+    Runs in its own daemon thread and only reads sys._current_frames(),
+    so the sampled thread is never paused or instrumented.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        """
+        Initialize sampler
+
+        Args:
+            thread_id: Thread to sample (threading.get_ident() of the event loop thread)
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+    def sample(self, seconds: float):
+        """Collect samples for `seconds` (blocks the calling thread)"""
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+            time.sleep(self.interval)
+
+    def write_collapsed(self, path: Path):
+        """Write collapsed stacks, most frequent first"""
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilerHook:
+    """
+    Profiling entry points for ArbitrageBot
+
+    request() is safe to call from a signal handler: sampling starts a
+    thread straight away, a scan profile is applied by run_scan() on the
+    next cycle.
+    """
+
+    def __init__(self, output_dir: str = DEFAULT_PROFILE_DIR,
+                 request_path: str = DEFAULT_REQUEST_PATH, interval: float = 0.005):
+        """
+        Initialize profiler hook
+
+        Args:
+            output_dir: Directory for profile files
+            request_path: JSON request file read on SIGUSR2
+            interval: Stack sampling interval in seconds
+        """
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(output_dir)
+        self.request_path = Path(request_path)
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+
+        self.sampling: Optional[threading.Thread] = None
+        self.pending_scan: Optional[Path] = None
+        self.last_output: Optional[Path] = None
+
+    def _output_path(self, mode: str, output: Optional[str]) -> Path:
+        if output:
+            # Only ever write inside the profile directory
+            return self.output_dir / Path(output).name
+        suffix = 'folded' if mode == 'sample' else 'prof'
+        return self.output_dir / f"profile-{mode}-{datetime.now():%Y%m%d-%H%M%S}.{suffix}"
+
+    def handle_signal(self):
+        """SIGUSR2: read the request file if present, otherwise sample for 10s"""
+        request: Dict = {}
+        try:
+            if self.request_path.exists():
+                request = json.loads(self.request_path.read_text())
+                self.request_path.unlink()
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable profile request: {e}")
+        self.request(request.get('mode', 'sample'), request.get('seconds', 10), request.get('output'))
+
+    def request(self, mode: str = 'sample', seconds: float = 10,
+                output: Optional[str] = None) -> Optional[Path]:
+        """
+        Request a profile
+
+        Args:
+            mode: 'sample' (stack sampling) or 'scan' (cProfile of the next scan)
+            seconds: Sampling duration (sample mode)
+            output: Output file name inside the profile directory
+
+        Returns:
+            Path the profile will be written to, or None if one is already running
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path = self._output_path(mode, output)
+
+        if mode == 'scan':
+            if self.pending_scan:
+                return None
+            self.pending_scan = path
+            return path
+
+        if self.sampling and self.sampling.is_alive():
+            return None
+        seconds = max(0.1, min(float(seconds), MAX_SAMPLE_SECONDS))
+        self.sampling = threading.Thread(
+            target=self._sample, args=(seconds, path), name="profiler", daemon=True
+        )
+        self.sampling.start()
+        return path
+
+    def _sample(self, seconds: float, path: Path):
+        sampler = StackSampler(self.thread_id, self.interval)
+        try:
+            sampler.sample(seconds)
+            sampler.write_collapsed(path)
+            self.last_output = path
+            self.logger.info(f"🔬 Wrote {sampler.samples} stack samples ({seconds:.0f}s) to {path}")
+        except Exception as e:
+            self.logger.error(f"Stack sampling failed: {e}")
+
+    async def run_scan(self, scan: Callable[[], Awaitable]):
+        """Run one scan cycle, under cProfile if a scan profile was requested"""
+        path = self.pending_scan
+        if path is None:
+            return await scan()
+
+        self.pending_scan = None
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            return await scan()
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            try:
+                self._write_profile(profile, path, elapsed)
+            except Exception as e:
+                self.logger.error(f"Writing scan profile failed: {e}")
+
+    def _write_profile(self, profile: cProfile.Profile, path: Path, elapsed: float):
+        profile.dump_stats(str(path))
+
+        summary = io.StringIO()
+        summary.write(f"_scan_and_execute took {elapsed:.3f}s\n\n")
+        pstats.Stats(profile, stream=summary).sort_stats('cumulative').print_stats(40)
+        path.with_suffix('.txt').write_text(summary.getvalue())
+
+        self.last_output = path
+        self.logger.info(f"🔬 Wrote scan profile ({elapsed:.2f}s) to {path}")
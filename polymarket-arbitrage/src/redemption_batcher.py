@@ -0,0 +1,171 @@
+"""
+Redemption Batcher
+Redeems resolved positions from many markets in as few transactions as possible
+
+Redeeming winning shares is an on-chain call with a fixed base cost
+plus a small cost per market. Redeeming every 15-minute position on
+its own pays the base cost every time; collecting resolved positions
+and redeeming them together splits it across the batch. A batch is
+sent when it is full, when the oldest resolved position has waited
+max_wait_seconds, or sooner when capital utilisation is high and the
+payouts are needed to keep trading.
+
+The amortised gas per position feeds back into the scanner's net
+margin and the executor's locked-profit estimate (gas_per_position()).
+
+ChainStub stands in for the chain in simulation and tests.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import REGISTRY
+
+
+BATCH_SIZE = REGISTRY.histogram(
+    'bot_redemption_batch_size', 'Positions redeemed per transaction',
+    buckets=(1, 2, 3, 5, 8, 13, 20, 30, 50))
+REDEMPTION_GAS = REGISTRY.counter('bot_redemption_gas_usdc_total', 'Gas spent on redemptions (USDC)')
+
+
+@dataclass
+class RedemptionReceipt:
+    tx_hash: str
+    market_ids: List[str]
+    payouts: Dict[str, float]   # market_id -> USDC credited
+    gas_usdc: float
+    confirmed_at: float = field(default_factory=time.time)
+
+
+class ChainStub:
+    """
+    Local stand-in for batched CTF redemption
+
+    Charges base_gas + per_position_gas * n per transaction and waits
+    block_time before "confirming". Payouts come from `payout` (the
+    simulated exchange's redeem in simulation mode).
+    """
+
+    def __init__(self, payout: Callable[[str], float], base_gas: float = 0.04,
+                 per_position_gas: float = 0.01, block_time: float = 0.0,
+                 charge: Optional[Callable[[float], None]] = None):
+        """
+        Initialize chain stub
+
+        Args:
+            payout: market_id -> USDC credited for that market's winning shares
+            base_gas: USDC per transaction
+            per_position_gas: Additional USDC per market in the transaction
+            block_time: Seconds until a transaction confirms
+            charge: Called with the gas of each transaction (e.g. debit a balance)
+        """
+        self.payout = payout
+        self.base_gas = base_gas
+        self.per_position_gas = per_position_gas
+        self.block_time = block_time
+        self.charge = charge
+        self.transactions: List[RedemptionReceipt] = []
+        self._nonce = itertools.count(1)
+
+    def estimate_gas(self, count: int) -> float:
+        return self.base_gas + self.per_position_gas * count
+
+    async def redeem_batch(self, market_ids: Sequence[str]) -> RedemptionReceipt:
+        if self.block_time:
+            await asyncio.sleep(self.block_time)
+        gas = self.estimate_gas(len(market_ids))
+        if self.charge:
+            self.charge(gas)
+        receipt = RedemptionReceipt(
+            tx_hash=f"0xstub{next(self._nonce):060x}",
+            market_ids=list(market_ids),
+            payouts={market_id: self.payout(market_id) for market_id in market_ids},
+            gas_usdc=gas
+        )
+        self.transactions.append(receipt)
+        return receipt
+
+
+class RedemptionBatcher:
+    """Decides when to redeem and splits each transaction's gas across its positions"""
+
+    def __init__(self, chain, config: Dict):
+        """
+        Initialize batcher
+
+        Args:
+            chain: Object with estimate_gas(count) and async redeem_batch(market_ids)
+            config: Full bot configuration (reads resolution.batch)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.chain = chain
+
+        batch_config = config.get('resolution', {}).get('batch', {})
+        self.max_batch_size = max(1, batch_config.get('max_batch_size', 20))
+        self.max_wait = batch_config.get('max_wait_seconds', 120)
+        self.utilisation_threshold = batch_config.get('utilisation_threshold', 0.7)
+
+        self.queued_at: Dict[str, float] = {}  # market_id -> first seen resolved
+        self.recent_sizes: deque = deque(maxlen=20)
+
+    def due(self, market_ids: Sequence[str], now: float, utilisation: float = 0.0) -> bool:
+        """
+        Whether the resolved positions should be redeemed now
+
+        Args:
+            market_ids: Markets resolved and awaiting redemption
+            now: Current epoch time
+            utilisation: Deployed capital / trading capital
+        """
+        for market_id in market_ids:
+            self.queued_at.setdefault(market_id, now)
+        if not market_ids:
+            return False
+        if len(market_ids) >= self.max_batch_size:
+            return True
+        if utilisation >= self.utilisation_threshold:
+            return True
+        oldest = min(self.queued_at[m] for m in market_ids)
+        return now - oldest >= self.max_wait
+
+    async def redeem(self, market_ids: Sequence[str]) -> Dict[str, Tuple[float, float]]:
+        """
+        Redeem in transactions of up to max_batch_size markets
+
+        Returns:
+            market_id -> (payout, gas share) for every confirmed market
+        """
+        results: Dict[str, Tuple[float, float]] = {}
+        for start in range(0, len(market_ids), self.max_batch_size):
+            chunk = list(market_ids[start:start + self.max_batch_size])
+            try:
+                receipt = await self.chain.redeem_batch(chunk)
+            except Exception as e:
+                self.logger.error(f"Redemption of {len(chunk)} markets failed: {e}")
+                continue
+
+            share = receipt.gas_usdc / len(chunk)
+            for market_id in chunk:
+                results[market_id] = (receipt.payouts.get(market_id, 0.0), share)
+                self.queued_at.pop(market_id, None)
+
+            self.recent_sizes.append(len(chunk))
+            BATCH_SIZE.observe(len(chunk))
+            REDEMPTION_GAS.inc(receipt.gas_usdc)
+            self.logger.info(
+                "⛓️  Redeemed %d markets in %s: $%.2f paid out, gas $%.4f ($%.4f each)",
+                len(chunk), receipt.tx_hash[:12], sum(receipt.payouts.values()),
+                receipt.gas_usdc, share
+            )
+        return results
+
+    def gas_per_position(self) -> Decimal:
+        """Expected redemption gas attributed to one position, at recent batch sizes"""
+        size = sum(self.recent_sizes) / len(self.recent_sizes) if self.recent_sizes else 1
+        return Decimal(str(round(self.chain.estimate_gas(size) / size, 6)))
@@ -0,0 +1,132 @@
+"""
+Risk Gate
+Per-trade approval against precomputed risk headroom
+
+can_trade() re-evaluates every limit and logs why trading is halted,
+which belongs once per scan cycle rather than once per opportunity.
+The gate keeps what an approval needs: loss left before the tightest
+window limit, capital left to deploy and free position slots. It
+refreshes them when their inputs change (trades recorded, fills and
+redemptions, config reloads, the per-cycle can_trade), so approving a
+trade is a handful of comparisons.
+
+Reservations make concurrent executions safe: reserve() claims a
+trade's capital and position slot before the first await, so two
+executions in flight can never spend the same headroom. It never
+awaits, so it is atomic on the event loop. Release the reservation
+after the fill has been booked through RiskManager.update_exposure.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class Reservation:
+    market_id: str
+    size: float  # USDC
+    created_at: float = field(default_factory=time.time)
+
+
+class RiskGate:
+    """Fast trade approval with reservations for in-flight executions"""
+
+    def __init__(self, risk_manager):
+        """
+        Initialize risk gate
+
+        Args:
+            risk_manager: RiskManager whose limits and state the headroom is derived from
+        """
+        self.risk_manager = risk_manager
+
+        self.reservations: Dict[str, Reservation] = {}  # market_id -> in-flight execution
+        self.reserved = 0.0
+
+        # Headroom before reservations
+        self.loss_headroom = math.inf
+        self.capital_headroom = 0.0
+        self.free_slots = 0
+        self.max_position = 0.0
+
+        self.refresh()
+
+    def refresh(self, now: Optional[float] = None):
+        """Recompute headroom from the risk manager's current state"""
+        rm = self.risk_manager
+
+        loss_headroom = math.inf
+        for window, limit in rm.loss_limits():
+            if limit is not None:
+                loss_headroom = min(loss_headroom, limit + rm.pnl_windows[window].sum(now))
+        self.loss_headroom = loss_headroom
+
+        capital_headroom = rm.capital * rm.max_deployment_ratio - rm.open_exposure
+        if rm.max_open_exposure is not None:
+            capital_headroom = min(capital_headroom, rm.max_open_exposure - rm.open_exposure)
+        self.capital_headroom = capital_headroom
+
+        self.free_slots = rm.max_open_positions - rm.open_positions
+        self.max_position = rm.capital * rm.max_position_percentage
+
+    def check(self, size: float, expected_profit: float = 0.0,
+              market_id: Optional[str] = None) -> Optional[str]:
+        """
+        Check a trade against the current headroom
+
+        Args:
+            size: Position size in USDC (as sized by the scanner)
+            expected_profit: Must be positive
+            market_id: Rejected while another execution on it is in flight
+
+        Returns:
+            Rejection reason, or None if the trade is approved
+        """
+        if self.risk_manager.circuit_breaker_active:
+            return "circuit breaker active"
+        if self.loss_headroom <= 0:
+            return "loss limit reached"
+        if expected_profit <= 0:
+            return "non-positive expected profit"
+        if size > self.max_position:
+            return f"position ${size:.2f} over ${self.max_position:.2f} limit"
+        if size > self.capital_headroom - self.reserved:
+            return f"position ${size:.2f} over ${self.capital_headroom - self.reserved:.2f} free capital"
+        if market_id in self.reservations:
+            return "execution already in flight"
+        if len(self.reservations) >= self.free_slots:
+            return "no free position slots"
+        return None
+
+    def reserve(self, opportunity: Dict, size: float) -> Tuple[Optional[Reservation], Optional[str]]:
+        """
+        Approve a trade and claim its headroom until release()
+
+        Returns:
+            (reservation, None) if approved, (None, reason) if rejected
+        """
+        market_id = opportunity['market_id']
+        reason = self.check(size, opportunity.get('expected_profit', 0), market_id)
+        if reason:
+            return None, reason
+
+        reservation = Reservation(market_id=market_id, size=size)
+        self.reservations[market_id] = reservation
+        self.reserved += size
+        return reservation, None
+
+    def release(self, reservation: Reservation):
+        """Return a reservation's headroom (after its fill is booked, or on failure)"""
+        if self.reservations.pop(reservation.market_id, None) is reservation:
+            self.reserved = max(0.0, self.reserved - reservation.size)
+
+    def get_status(self) -> Dict:
+        return {
+            'loss_headroom': None if math.isinf(self.loss_headroom) else self.loss_headroom,
+            'capital_headroom': self.capital_headroom - self.reserved,
+            'free_slots': self.free_slots - len(self.reservations),
+            'max_position': self.max_position,
+            'in_flight': len(self.reservations),
+        }
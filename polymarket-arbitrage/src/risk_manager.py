@@ -1,12 +1,85 @@
 """
 Risk Manager
 Manages trading risks and position limits
+
+Loss limits apply to rolling 1h/24h/7d windows of realised PnL, so they
+expire on their own instead of waiting for a reset, and only losses
+count against them. For held positions PnL is realised at settlement
+(payout less cost, including any unhedged leg of a failed execution),
+not at fill time, where locked profit is only an estimate. Windows are
+rehydrated from settled positions on startup so a restart does not
+forget today's losses.
 """
 
 import logging
+import time
 from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .risk_gate import RiskGate
+except ImportError:
+    # Run from src/ rather than as the src package
+    from risk_gate import RiskGate
+
+
+# Window name -> (span seconds, buckets)
+WINDOWS = {
+    '1h': (3600, 60),
+    '24h': (86400, 288),
+    '7d': (604800, 168),
+}
+
+
+class RollingWindow:
+    """
+    Sum of values over the last `span` seconds
+
+    Values land in fixed-width buckets of a ring buffer; buckets that
+    fall out of the window are subtracted as time advances, so adding
+    and reading the sum are O(1) amortised. The window covers between
+    span - width and span seconds, depending on where in the newest
+    bucket `now` falls.
+    """
+
+    def __init__(self, span: float, buckets: int):
+        self.span = span
+        self.width = span / buckets
+        self.sums = [0.0] * buckets
+        self.head: Optional[int] = None  # Absolute index of the newest bucket
+        self.total = 0.0
+
+    def _advance(self, bucket: int):
+        if self.head is None or bucket - self.head >= len(self.sums):
+            self.sums = [0.0] * len(self.sums)
+            self.total = 0.0
+            self.head = bucket
+            return
+        while self.head < bucket:
+            self.head += 1
+            slot = self.head % len(self.sums)
+            self.total -= self.sums[slot]
+            self.sums[slot] = 0.0
+
+    def add(self, value: float, timestamp: float):
+        bucket = int(timestamp // self.width)
+        if self.head is None or bucket > self.head:
+            self._advance(bucket)
+        elif bucket <= self.head - len(self.sums):
+            return  # Already outside the window
+        self.sums[bucket % len(self.sums)] += value
+        self.total += value
+
+    def sum(self, now: Optional[float] = None) -> float:
+        bucket = int((now or time.time()) // self.width)
+        if self.head is not None and bucket > self.head:
+            self._advance(bucket)
+        return self.total
+
+    def clear(self):
+        self.sums = [0.0] * len(self.sums)
+        self.total = 0.0
 
 
 class RiskManager:
@@ -19,20 +92,14 @@ class RiskManager:
         Args:
             config: Configuration dict
         """
-        self.config = config['risk_management']
         self.logger = logging.getLogger(__name__)
-        
-        # Risk limits
-        self.max_daily_loss = self.config.get('max_daily_loss', 10)
-        self.max_weekly_loss = self.config.get('max_weekly_loss', 20)
-        self.max_open_positions = self.config.get('max_open_positions', 4)
-        self.consecutive_failure_limit = self.config.get('consecutive_failure_limit', 3)
-        self.capital_drawdown_halt = self.config.get('capital_drawdown_halt', 0.10)
+        self.gate: Optional[RiskGate] = None
+        self.apply_config(config)
         
         # Tracking
-        self.daily_pnl = 0.0
-        self.weekly_pnl = 0.0
+        self.pnl_windows = {name: RollingWindow(*spec) for name, spec in WINDOWS.items()}
         self.open_positions = 0
+        self.open_exposure = 0.0  # USDC cost basis of unredeemed positions
         self.consecutive_failures = 0  # Execution failures, not losses
         self.circuit_breaker_active = False
         self.circuit_breaker_until = None
@@ -40,8 +107,36 @@ class RiskManager:
         # Trade history for rolling calculations
         self.trade_history = deque(maxlen=1000)
         
+        # Per-trade approvals against precomputed headroom
+        self.gate = RiskGate(self)
+        
         self.logger.info("Risk manager initialized")
     
+    def apply_config(self, config: Dict):
+        """Load risk limits from config (called at init and on hot reload)"""
+        self.config = config['risk_management']
+        self.max_hourly_loss = self.config.get('max_hourly_loss')
+        self.max_daily_loss = self.config.get('max_daily_loss', 10)
+        self.max_weekly_loss = self.config.get('max_weekly_loss', 20)
+        self.max_open_exposure = self.config.get('max_open_exposure')
+        self.max_open_positions = self.config.get('max_open_positions', 4)
+        self.consecutive_failure_limit = self.config.get('consecutive_failure_limit', 3)
+        self.capital_drawdown_halt = self.config.get('capital_drawdown_halt', 0.10)
+        self.max_position_percentage = self.config.get('max_position_percentage', 0.2)
+        
+        # Trading capital; update_exposure replaces it with the position book's figure
+        capital_config = config.get('capital', {})
+        self.capital = float(capital_config.get('total_capital', 100))
+        self.max_deployment_ratio = capital_config.get('max_deployment_ratio', 0.80)
+        
+        if self.gate:
+            self.gate.refresh()
+    
+    def loss_limits(self) -> Tuple[Tuple[str, Optional[float]], ...]:
+        """(window, limit) pairs; a None limit is not enforced"""
+        return (('1h', self.max_hourly_loss), ('24h', self.max_daily_loss),
+                ('7d', self.max_weekly_loss))
+    
     def can_trade(self) -> bool:
         """
         Check if trading is allowed based on risk limits
@@ -56,18 +151,22 @@ class RiskManager:
             else:
                 self._reset_circuit_breaker()
         
-        # Check loss limits
-        if abs(self.daily_pnl) >= self.max_daily_loss:
-            self.logger.warning(f"Daily loss limit reached: ${abs(self.daily_pnl):.2f}")
-            return False
-        
-        if abs(self.weekly_pnl) >= self.max_weekly_loss:
-            self.logger.warning(f"Weekly loss limit reached: ${abs(self.weekly_pnl):.2f}")
-            return False
+        # Check loss limits (net losses over each rolling window; profits never halt trading)
+        now = time.time()
+        self.gate.refresh(now)  # Losses roll out of the windows between events
+        for window, limit in self.loss_limits():
+            loss = -self.pnl_windows[window].sum(now)
+            if limit is not None and loss >= limit:
+                self.logger.warning(f"{window} loss limit reached: ${loss:.2f}")
+                return False
         
         # Check position limits
         if self.open_positions >= self.max_open_positions:
-            self.logger.debug(f"Max open positions reached: {self.open_positions}")
+            self.logger.debug("Max open positions reached: %d", self.open_positions)
+            return False
+        
+        if self.max_open_exposure is not None and self.open_exposure >= self.max_open_exposure:
+            self.logger.debug("Max open exposure reached: $%.2f", self.open_exposure)
             return False
         
         # Check consecutive execution failures
@@ -77,76 +176,132 @@ class RiskManager:
         
         return True
     
-    def approve_trade(self, opportunity: Dict) -> bool:
+    def approve_trade(self, opportunity: Dict, position_size: Optional[float] = None) -> bool:
         """
         Approve or reject a trade based on risk parameters
         
+        A few comparisons against the gate's precomputed headroom; the
+        full can_trade() evaluation runs once per scan cycle. Use
+        gate.reserve() instead when executions may run concurrently.
+        
         Args:
             opportunity: Trade opportunity dict
+            position_size: USDC to deploy (defaults to opportunity['position_size'])
             
         Returns:
             True if approved, False if rejected
         """
-        if not self.can_trade():
+        if position_size is None:
+            position_size = opportunity.get('position_size', 0)
+        reason = self.gate.check(float(position_size), opportunity.get('expected_profit', 0),
+                                 opportunity.get('market_id'))
+        if reason:
+            self.logger.info(f"Trade rejected: {reason}")
             return False
-        
-        # Check position size
-        position_size = opportunity.get('amount', 0) * opportunity.get('price_a', 0)
-        max_position_size = self.config.get('max_position_percentage', 0.2) * 1000  # Assuming $1000 capital
-        
-        if position_size > max_position_size:
-            self.logger.info(f"Trade rejected: Position too large (${position_size:.2f})")
-            return False
-        
-        # Check expected profit
-        expected_profit = opportunity.get('expected_profit', 0)
-        if expected_profit <= 0:
-            self.logger.info("Trade rejected: Non-positive expected profit")
-            return False
-        
-        # Additional checks could include:
-        # - Maximum drawdown
-        # - Sharpe ratio
-        # - Market conditions
-        # - Correlation limits
-        
         return True
     
-    def record_trade(self, trade_result: Dict):
+    def record_trade(self, trade_result: Dict, realized: bool = True):
         """
-        Record a trade and update risk metrics
+        Record an execution (successful or failed) and update risk metrics
         
         Args:
             trade_result: Trade execution result
+            realized: Whether its profit is realised now; False for positions
+                held to resolution, whose PnL arrives via record_pnl at settlement
         """
-        profit = trade_result.get('profit', 0)
-        timestamp = datetime.fromtimestamp(trade_result.get('timestamp', datetime.now().timestamp()))
-        
-        # Add to history
-        self.trade_history.append({
-            'timestamp': timestamp,
-            'profit': profit,
-            'success': trade_result.get('success', False)
-        })
+        profit = trade_result.get('profit') or 0
+        timestamp = trade_result.get('timestamp') or time.time()
+        success = trade_result.get('success', False)
+        self._add_to_history(profit, timestamp, success)
+        if realized:
+            self._add_pnl(profit, timestamp)
         
-        # Update P&L
-        self.daily_pnl += profit
-        self.weekly_pnl += profit
-        
-        # Track execution failures (not losses - YES/NO arbitrage should never lose)
-        if not trade_result.get('success', False):
-            self.consecutive_failures += 1
-        else:
+        # Track execution failures (not losses). A failure before any order
+        # was sent (the book moved during preflight) says nothing about the
+        # exchange, so it neither counts nor resets the streak
+        if success:
             self.consecutive_failures = 0
-        
-        # Update open positions (simplified - assumes immediate close)
-        # In reality, would track until position is closed
+        elif trade_result.get('orders_sent', True):
+            self.consecutive_failures += 1
         
         self.logger.info(f"Trade recorded: Profit=${profit:.2f}, Daily P&L=${self.daily_pnl:.2f}")
         
         # Check if need to activate circuit breaker
         if self.consecutive_failures >= self.consecutive_failure_limit:
             self._activate_circuit_breaker()
+        
+        self.gate.refresh()
+    
+    def record_pnl(self, profit: float, timestamp: Optional[float] = None):
+        """
+        Record realised PnL, e.g. a position's payout less its cost at settlement
+        
+        Args:
+            profit: USDC, negative for a loss
+            timestamp: When it was realised (epoch, defaults to now)
+        """
+        self._add_pnl(profit, timestamp or time.time())
+        self.gate.refresh()
+    
+    def _add_to_history(self, profit: float, timestamp: float, success: bool):
+        self.trade_history.append({
+            'timestamp': datetime.fromtimestamp(timestamp),
+            'profit': profit,
+            'success': success
+        })
+    
+    def _add_pnl(self, profit: float, timestamp: float):
+        for window in self.pnl_windows.values():
+            window.add(profit, timestamp)
+    
+    def load_history(self, settlements: Iterable[Dict]) -> int:
+        """
+        Rehydrate the PnL windows from realised PnL (oldest first)
+        
+        Args:
+            settlements: Dicts with timestamp (datetime, ISO string or epoch)
+                and profit, as returned by Database.get_settlements_since
+            
+        Returns:
+            Number of entries loaded
+        """
+        loaded = 0
+        for settlement in settlements:
+            timestamp = settlement['timestamp']
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp)
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.timestamp()
+            self._add_pnl(settlement.get('profit') or 0, timestamp)
+            loaded += 1
+        
+        if loaded:
+            self.logger.info(f"Loaded {loaded} recent settlements: 24h P&L ${self.daily_pnl:.2f}, "
+                             f"7d P&L ${self.weekly_pnl:.2f}")
+        self.gate.refresh()
+        return loaded
+    
+    def update_exposure(self, open_positions: int, exposure: float, capital: Optional[float] = None):
+        """Track unredeemed positions, the capital they hold and the trading capital"""
+        self.open_positions = open_positions
+        self.open_exposure = exposure
+        if capital is not None:
+            self.capital = capital
+        self.gate.refresh()
+    
+    @property
+    def hourly_pnl(self) -> float:
+        return self.pnl_windows['1h'].sum()
+    
+    @property
+    def daily_pnl(self) -> float:
+        """Realised PnL over the last 24 hours"""
+        return self.pnl_windows['24h'].sum()
+    
+    @property
+    def weekly_pnl(self) -> float:
+        """Realised PnL over the last 7 days"""
+        return self.pnl_windows['7d'].sum()
     
     def _activate_circuit_breaker(self):
         """Activate circuit breaker to pause trading"""
@@ -168,26 +323,34 @@ class RiskManager:
         self.logger.info("✅ Circuit breaker reset. Trading resumed.")
     
     def reset_daily_limits(self):
-        """Reset daily limits (call at start of each day)"""
-        self.daily_pnl = 0.0
+        """Forget losses in the 1h and 24h windows (manual override; windows roll on their own)"""
+        self.pnl_windows['1h'].clear()
+        self.pnl_windows['24h'].clear()
         self.consecutive_failures = 0
+        self.gate.refresh()
         self.logger.info("Daily limits reset")
     
     def reset_weekly_limits(self):
-        """Reset weekly limits (call at start of each week)"""
-        self.weekly_pnl = 0.0
+        """Forget losses in all windows (manual override; windows roll on their own)"""
+        for window in self.pnl_windows.values():
+            window.clear()
+        self.gate.refresh()
         self.logger.info("Weekly limits reset")
     
     def get_status(self) -> Dict:
         """Get current risk status"""
         return {
             'can_trade': self.can_trade(),
+            'hourly_pnl': self.hourly_pnl,
             'daily_pnl': self.daily_pnl,
             'weekly_pnl': self.weekly_pnl,
             'open_positions': self.open_positions,
-            'consecutive_losses': self.consecutive_losses,
+            'open_exposure': self.open_exposure,
+            'consecutive_failures': self.consecutive_failures,
             'circuit_breaker_active': self.circuit_breaker_active,
             'daily_loss_limit': self.max_daily_loss,
             'weekly_loss_limit': self.max_weekly_loss,
-            'max_open_positions': self.max_open_positions
+            'max_open_positions': self.max_open_positions,
+            'max_open_exposure': self.max_open_exposure,
+            'headroom': self.gate.get_status()
         }
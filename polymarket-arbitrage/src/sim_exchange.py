@@ -0,0 +1,626 @@
+"""
+Simulated Exchange
+Local CLOB stand-in used by PolymarketClient when running without credentials
+
+Markets follow the real 15-minute crypto lifecycle: a new "Up or Down"
+market per asset opens every quarter hour and resolves when it ends.
+Each token has a price-time priority book quoted by a synthetic market
+maker around a drifting fair probability. Outside taker flow trades
+against the book, so resting orders fill according to their queue
+position. Occasionally both asks are pulled below fair, leaving a
+YES + NO < $1 dislocation for the scanner to find.
+"""
+
+import asyncio
+import itertools
+import logging
+import math
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+
+WINDOW_SECONDS = 900
+
+ASSET_NAMES = {'BTC': 'Bitcoin', 'ETH': 'Ethereum', 'SOL': 'Solana'}
+
+
+class LatencyModel:
+    """Samples delays (seconds) from a fixed, normal or lognormal distribution"""
+
+    def __init__(self, distribution: str = 'lognormal', median_ms: float = 120,
+                 sigma: float = 0.4, min_ms: float = 0, rng: Optional[random.Random] = None):
+        """
+        Initialize latency model
+
+        Args:
+            distribution: 'fixed', 'normal' (sigma in ms) or 'lognormal' (sigma in log space)
+            median_ms: Median delay
+            sigma: Spread of the distribution
+            min_ms: Lower bound
+            rng: Random source
+        """
+        self.distribution = distribution
+        self.median = median_ms / 1000
+        self.sigma = sigma
+        self.minimum = min_ms / 1000
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict], rng: random.Random) -> 'LatencyModel':
+        config = config or {}
+        return cls(
+            distribution=config.get('distribution', 'lognormal'),
+            median_ms=config.get('median_ms', 120),
+            sigma=config.get('sigma', 0.4),
+            min_ms=config.get('min_ms', 0),
+            rng=rng
+        )
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.distribution == 'fixed':
+            delay = self.median
+        elif self.distribution == 'normal':
+            delay = self.rng.gauss(self.median, self.sigma / 1000)
+        else:
+            delay = self.median * math.exp(self.rng.gauss(0, self.sigma))
+        return max(self.minimum, delay)
+
+
+@dataclass
+class RestingOrder:
+    """An order on a simulated book (market maker or ours)"""
+    order_id: str
+    token_id: str
+    side: str          # 'buy' or 'sell'
+    price: float
+    size: float        # Original size in shares
+    owner: str = 'mm'  # 'mm' or 'user'
+    filled: float = 0.0
+    cost: float = 0.0
+    status: str = 'open'
+    created_at: float = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return self.size - self.filled
+
+
+class TokenBook:
+    """Price-time priority book for one outcome token"""
+
+    def __init__(self, token_id: str):
+        self.token_id = token_id
+        self.bids: Dict[float, Deque[RestingOrder]] = {}
+        self.asks: Dict[float, Deque[RestingOrder]] = {}
+
+    def _side(self, side: str) -> Dict[float, Deque[RestingOrder]]:
+        return self.bids if side == 'buy' else self.asks
+
+    def add(self, order: RestingOrder):
+        self._side(order.side).setdefault(order.price, deque()).append(order)
+
+    def remove(self, order: RestingOrder):
+        levels = self._side(order.side)
+        queue = levels.get(order.price)
+        if queue and order in queue:
+            queue.remove(order)
+            if not queue:
+                del levels[order.price]
+
+    def best(self, side: str) -> Optional[float]:
+        levels = self._side(side)
+        if not levels:
+            return None
+        return max(levels) if side == 'buy' else min(levels)
+
+    def snapshot(self, depth: int = 10) -> Dict:
+        """Aggregated levels in API shape (bids high->low, asks low->high)"""
+        def levels(book, reverse):
+            out = []
+            for price in sorted(book, reverse=reverse)[:depth]:
+                size = sum(o.remaining for o in book[price])
+                if size > 0:
+                    out.append({'price': price, 'size': round(size, 2)})
+            return out
+        return {'bids': levels(self.bids, True), 'asks': levels(self.asks, False)}
+
+    def available(self, side: str, limit: float) -> float:
+        """Shares an incoming order on `side` could take at or better than limit"""
+        opposite = self.asks if side == 'buy' else self.bids
+        return sum(
+            o.remaining for price, queue in opposite.items()
+            if (price <= limit if side == 'buy' else price >= limit)
+            for o in queue
+        )
+
+    def match(self, side: str, limit: float, size: float) -> List[Tuple[RestingOrder, float, float]]:
+        """
+        Take liquidity for an incoming order
+
+        Returns:
+            List of (resting order, shares, price) fills in priority order
+        """
+        opposite = self.asks if side == 'buy' else self.bids
+        prices = sorted(opposite, reverse=(side == 'sell'))
+        fills = []
+        remaining = size
+
+        for price in prices:
+            if remaining <= 1e-9:
+                break
+            if (side == 'buy' and price > limit + 1e-9) or (side == 'sell' and price < limit - 1e-9):
+                break
+            queue = opposite[price]
+            while queue and remaining > 1e-9:
+                resting = queue[0]
+                take = min(resting.remaining, remaining)
+                fills.append((resting, take, price))
+                resting.filled += take
+                resting.cost += take * price
+                remaining -= take
+                if resting.remaining <= 1e-9:
+                    resting.status = 'filled'
+                    queue.popleft()
+            if not queue:
+                del opposite[price]
+
+        return fills
+
+    def requote(self, side: str, quotes: List[Tuple[float, float]], make_id: Callable[[], str],
+                now: float):
+        """
+        Replace market-maker liquidity on one side
+
+        An MM order whose price is still quoted keeps its queue position,
+        so our resting orders only move up as liquidity ahead of them
+        trades or is pulled.
+        """
+        levels = self._side(side)
+        wanted = dict(quotes)
+
+        for price in list(levels):
+            queue = levels[price]
+            for order in [o for o in queue if o.owner == 'mm']:
+                size = wanted.pop(price, None)
+                if size is not None:
+                    order.size = order.filled + size
+                else:
+                    queue.remove(order)
+            if not queue:
+                del levels[price]
+
+        for price, size in wanted.items():
+            self.add(RestingOrder(make_id(), self.token_id, side, price, size, created_at=now))
+
+
+@dataclass
+class SimMarket:
+    """One 15-minute Up/Down market"""
+    market_id: str
+    asset: str
+    series: int
+    start: float
+    end: float
+    yes_token: str
+    no_token: str
+    fair: float = 0.5
+    last_update: float = 0.0
+    dislocation_until: float = 0.0
+    dislocation_ticks: int = 0
+    active: bool = True
+    winner: Optional[str] = None
+    books: Dict[str, TokenBook] = field(default_factory=dict)
+
+    def question(self) -> str:
+        end = datetime.fromtimestamp(self.end, timezone.utc)
+        name = ASSET_NAMES.get(self.asset, self.asset)
+        suffix = f" #{self.series + 1}" if self.series else ""
+        return f"{name} ({self.asset}) Up or Down - 15 min ending {end:%H:%M} UTC{suffix}"
+
+    def to_api(self) -> Dict:
+        end_iso = datetime.fromtimestamp(self.end, timezone.utc).isoformat()
+        return {
+            'id': self.market_id,
+            'condition_id': self.market_id,
+            'question': self.question(),
+            'category': 'Crypto',
+            'active': self.active,
+            'closed': not self.active,
+            'end_date_iso': end_iso,
+            'yes_token_id': self.yes_token,
+            'no_token_id': self.no_token,
+            'tokens': [
+                {'token_id': self.yes_token, 'outcome': 'Up', 'winner': self.winner == 'YES'},
+                {'token_id': self.no_token, 'outcome': 'Down', 'winner': self.winner == 'NO'},
+            ],
+            'winner': self.winner
+        }
+
+
+class SimulatedExchange:
+    """
+    In-process matching engine with generated 15-minute markets
+
+    State evolves lazily: whenever a market is touched it is stepped
+    forward in quote_interval increments up to the current clock, so
+    there is no background thread and idle markets cost nothing.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, clock: Callable[[], float] = time.time):
+        """
+        Initialize simulated exchange
+
+        Args:
+            config: 'simulation' config section
+            clock: Time source (epoch seconds)
+        """
+        self.logger = logging.getLogger(__name__)
+        config = config or {}
+        self.clock = clock
+        self.rng = random.Random(config.get('seed'))
+
+        self.assets = config.get('assets', ['BTC', 'ETH', 'SOL'])
+        self.series_per_asset = config.get('series_per_asset', 1)
+        self.tick = config.get('tick_size', 0.01)
+        self.depth = config.get('depth', 5)
+        self.level_size = tuple(config.get('level_size', [200, 1500]))
+        self.quote_interval = config.get('quote_interval', 1.0)
+        self.volatility = config.get('volatility', 0.02)  # Fair-price stdev per sqrt(second)
+        self.arb_rate = config.get('arb_rate', 0.02)
+        self.arb_edge_ticks = tuple(config.get('arb_edge_ticks', [2, 10]))
+        self.arb_duration = tuple(config.get('arb_duration', [2, 10]))
+        self.taker_rate = config.get('taker_rate', 50)
+        self.retain_resolved = config.get('retain_resolved_seconds', 3600)
+
+        self.order_latency = LatencyModel.from_config(config.get('order_latency'), self.rng)
+        self.read_latency = LatencyModel.from_config(
+            config.get('read_latency', {'distribution': 'fixed', 'median_ms': 0}), self.rng
+        )
+
+        self.balance = float(config.get('starting_balance', 100.0))
+        self.positions: Dict[str, float] = {}  # token -> shares
+        self.orders: Dict[str, RestingOrder] = {}
+
+        self.markets: Dict[str, SimMarket] = {}
+        self.token_market: Dict[str, SimMarket] = {}
+        self.ids = itertools.count(1)
+
+        self._roll(self.clock())
+
+    # Market lifecycle
+
+    def _roll(self, now: float):
+        """Resolve ended windows and open the current one for every series"""
+        window = math.floor(now / WINDOW_SECONDS) * WINDOW_SECONDS
+
+        for market in list(self.markets.values()):
+            if market.active and market.end <= now:
+                self._step(market, market.end)
+                self._resolve(market)
+            elif not market.active and market.end + self.retain_resolved < now:
+                del self.markets[market.market_id]
+                for token in (market.yes_token, market.no_token):
+                    self.token_market.pop(token, None)
+                    self.positions.pop(token, None)  # Never redeemed
+
+        for order_id in [oid for oid, o in self.orders.items()
+                         if o.status != 'open' and o.created_at + self.retain_resolved < now]:
+            del self.orders[order_id]
+
+        for asset in self.assets:
+            for series in range(self.series_per_asset):
+                market_id = f"sim-{asset.lower()}-{series}-{int(window)}"
+                if market_id not in self.markets:
+                    self._open_market(market_id, asset, series, window, now)
+
+    def _open_market(self, market_id: str, asset: str, series: int, start: float, now: float):
+        market = SimMarket(
+            market_id=market_id, asset=asset, series=series,
+            start=start, end=start + WINDOW_SECONDS,
+            yes_token=f"{market_id}-yes", no_token=f"{market_id}-no",
+            fair=self.rng.uniform(0.4, 0.6), last_update=now
+        )
+        market.books = {market.yes_token: TokenBook(market.yes_token),
+                        market.no_token: TokenBook(market.no_token)}
+        self.markets[market_id] = market
+        self.token_market[market.yes_token] = market
+        self.token_market[market.no_token] = market
+        self._quote(market, now)
+
+    def _resolve(self, market: SimMarket):
+        market.active = False
+        market.winner = 'YES' if self.rng.random() < market.fair else 'NO'
+
+        # Resting orders die with the market
+        for order in self.orders.values():
+            if order.status == 'open' and order.token_id in market.books:
+                self._cancel(order)
+
+    def redeem(self, market_id: str) -> float:
+        """
+        Redeem winning shares of a resolved market
+
+        Returns:
+            USDC credited
+        """
+        market = self.markets.get(market_id)
+        if not market or market.active:
+            return 0.0
+        winning = market.yes_token if market.winner == 'YES' else market.no_token
+        payout = self.positions.pop(winning, 0.0)
+        losing = market.no_token if market.winner == 'YES' else market.yes_token
+        self.positions.pop(losing, None)
+        self.balance += payout
+        return payout
+
+    def charge_gas(self, usdc: float):
+        """Debit on-chain transaction costs (redemptions) from the balance"""
+        self.balance -= usdc
+
+    # Price process and market-maker quoting
+
+    def _refresh(self, market: SimMarket, now: float):
+        if market.active and now > market.end:
+            self._roll(now)
+        if market.active:
+            self._step(market, now)
+
+    def _step(self, market: SimMarket, now: float):
+        """Advance a market to `now` in quote_interval steps"""
+        elapsed = now - market.last_update
+        if elapsed < self.quote_interval:
+            return
+
+        steps = int(elapsed / self.quote_interval)
+        # Long gaps (idle bot) are collapsed into a few larger steps
+        dt = elapsed / min(steps, 10)
+        for _ in range(min(steps, 10)):
+            market.last_update += dt
+            shock = self.rng.gauss(0, self.volatility * math.sqrt(dt))
+            market.fair = min(0.97, max(0.03, market.fair + shock))
+            self._taker_flow(market, dt)
+            self._quote(market, market.last_update)
+        market.last_update = now
+
+    def _quote(self, market: SimMarket, now: float):
+        if market.dislocation_until <= now and self.rng.random() < self.arb_rate:
+            market.dislocation_ticks = self.rng.randint(*self.arb_edge_ticks)
+            market.dislocation_until = now + self.rng.uniform(*self.arb_duration)
+        dislocated = market.dislocation_until > now
+
+        # Prices in whole ticks, so bounds checks are exact: quotes stay within
+        # [1 tick, $1 - 1 tick] however far a dislocation pushes them
+        top = round(1 / self.tick) - 1
+        for token, fair in ((market.yes_token, market.fair), (market.no_token, 1 - market.fair)):
+            bid = math.floor(fair / self.tick + 1e-9)
+            if dislocated:
+                # Asks pulled below fair on both sides -> YES + NO < $1
+                bid -= (market.dislocation_ticks + (token == market.yes_token)) // 2
+            bid = min(max(bid, 1), top - 1)
+            ask = bid + 1
+
+            bids, asks = [], []
+            for level in range(self.depth):
+                size = self.rng.uniform(*self.level_size)
+                if dislocated and level == 0:
+                    size *= self.rng.uniform(0.1, 0.5)  # Dislocations are thin
+                if bid - level >= 1:
+                    bids.append((round((bid - level) * self.tick, 4), round(size, 2)))
+                if ask + level <= top:
+                    asks.append((round((ask + level) * self.tick, 4), round(size, 2)))
+
+            book = market.books[token]
+            book.requote('buy', bids, self._next_id, now)
+            book.requote('sell', asks, self._next_id, now)
+            self._uncross(book)
+
+    def dislocate(self, count: int, duration: Optional[float] = None,
+                  edge_ticks: Optional[int] = None) -> List[str]:
+        """
+        Force YES+NO dislocations on exactly `count` active markets
+
+        Any current dislocations end first. Used by load tests to put
+        an exact number of opportunities on the book at once.
+
+        Returns:
+            Ids of the dislocated markets
+        """
+        now = self.clock()
+        self._roll(now)
+        active = [m for m in self.markets.values() if m.active]
+        for market in active:
+            if market.dislocation_until > now:
+                market.dislocation_until = now
+                self._quote(market, now)
+        chosen = self.rng.sample(active, min(count, len(active)))
+        for market in chosen:
+            self._step(market, now)
+            market.dislocation_ticks = edge_ticks or self.rng.randint(*self.arb_edge_ticks)
+            market.dislocation_until = now + (duration or max(self.arb_duration))
+            self._quote(market, now)
+        return [m.market_id for m in chosen]
+
+    def _taker_flow(self, market: SimMarket, dt: float):
+        """Outside traders lifting asks and hitting bids"""
+        if self.taker_rate <= 0:
+            return
+        for book in market.books.values():
+            for side in ('buy', 'sell'):
+                volume = self.rng.expovariate(1 / (self.taker_rate * dt))
+                limit = 1.0 if side == 'buy' else 0.0
+                for resting, shares, price in book.match(side, limit, volume):
+                    if resting.owner == 'user':
+                        self._settle_fill(resting, shares, price, passive=True)
+
+    def _uncross(self, book: TokenBook):
+        """Our resting bids that the new quotes crossed trade immediately"""
+        best_ask = book.best('sell')
+        for price in sorted(book.bids, reverse=True):
+            if best_ask is None or price < best_ask:
+                break
+            for order in [o for o in book.bids[price] if o.owner == 'user']:
+                for _, shares, fill_price in book.match('buy', order.price, order.remaining):
+                    self._settle_fill(order, shares, fill_price)
+                if order.remaining <= 1e-9:
+                    order.status = 'filled'
+                    book.remove(order)
+            best_ask = book.best('sell')
+
+    def _next_id(self) -> str:
+        return f"mm_{next(self.ids)}"
+
+    # Our orders
+
+    def _settle_fill(self, order: RestingOrder, shares: float, price: float, passive: bool = False):
+        """
+        Book a fill of one of our orders against cash and positions
+
+        passive: the order was resting and TokenBook.match() already
+        advanced its filled/cost
+        """
+        if not passive:
+            order.filled += shares
+            order.cost += shares * price
+
+        if order.side == 'buy':
+            self.balance -= shares * price
+            self.positions[order.token_id] = self.positions.get(order.token_id, 0.0) + shares
+        else:
+            self.balance += shares * price
+            self.positions[order.token_id] = self.positions.get(order.token_id, 0.0) - shares
+
+        if order.remaining <= 1e-9:
+            order.status = 'filled'
+
+    def locked(self) -> float:
+        """USDC reserved by our resting buy orders"""
+        return sum(o.remaining * o.price for o in self.orders.values()
+                   if o.status == 'open' and o.side == 'buy')
+
+    def get_balance(self) -> Dict[str, float]:
+        locked = self.locked()
+        return {
+            'balance': round(self.balance, 2),
+            'available': round(self.balance - locked, 2),
+            'currency': 'USDC',
+            'locked': round(locked, 2)
+        }
+
+    def get_markets(self) -> List[Dict]:
+        now = self.clock()
+        self._roll(now)
+        return [m.to_api() for m in self.markets.values()]
+
+    def get_market(self, market_id: str) -> Optional[Dict]:
+        market = self.markets.get(market_id)
+        if not market:
+            return None
+        self._refresh(market, self.clock())
+        return market.to_api()
+
+    def get_orderbook(self, token_id: str) -> Optional[Dict]:
+        market = self.token_market.get(token_id)
+        if not market:
+            return None
+        self._refresh(market, self.clock())
+        return market.books[token_id].snapshot(self.depth)
+
+    async def read_delay(self):
+        """Simulated network delay for read endpoints"""
+        delay = self.read_latency.sample()
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def create_order(self, order: Dict) -> Dict:
+        """
+        Place an order after simulated network latency
+
+        Args:
+            order: token_id, side ('buy'/'sell'), price, size (shares),
+                   optional order_type ('GTC' default, 'IOC', 'FOK')
+
+        Returns:
+            success, order_id, status, filled_size (USDC), filled_shares,
+            fill_price (average), error
+        """
+        await asyncio.sleep(self.order_latency.sample())
+        now = self.clock()
+
+        token_id = order['token_id']
+        side = order.get('side', 'buy').lower()
+        price = round(round(float(order['price']) / self.tick) * self.tick, 4)
+        size = float(order['size'])
+        order_type = order.get('order_type', 'GTC').upper()
+
+        market = self.token_market.get(token_id)
+        if not market:
+            return {'success': False, 'error': 'Unknown token'}
+        self._refresh(market, now)
+        if not market.active:
+            return {'success': False, 'error': 'Market closed'}
+
+        if size <= 0 or not 0 < price < 1:
+            return {'success': False, 'error': 'Invalid price or size'}
+        if side == 'buy' and size * price > self.balance - self.locked() + 1e-9:
+            return {'success': False, 'error': 'Insufficient balance'}
+        if side == 'sell' and size > self.positions.get(token_id, 0.0) + 1e-9:
+            return {'success': False, 'error': 'Insufficient position'}
+
+        book = market.books[token_id]
+        if order_type == 'FOK' and book.available(side, price) < size - 1e-9:
+            return {'success': False, 'error': 'FOK order not fully fillable'}
+
+        placed = RestingOrder(f"sim_{next(self.ids)}", token_id, side, price, size,
+                              owner='user', created_at=now)
+        self.orders[placed.order_id] = placed
+
+        for _, shares, fill_price in book.match(side, price, size):
+            self._settle_fill(placed, shares, fill_price)
+
+        if placed.remaining > 1e-9:
+            if order_type == 'GTC':
+                book.add(placed)
+            else:
+                placed.status = 'cancelled'
+
+        return self._order_result(placed)
+
+    async def cancel_order(self, order_id: str) -> Dict:
+        """Cancel the unfilled remainder of one of our orders"""
+        await asyncio.sleep(self.order_latency.sample())
+        order = self.orders.get(order_id)
+        if not order:
+            return {'success': False, 'error': 'Unknown order'}
+        market = self.token_market.get(order.token_id)
+        if market:
+            self._refresh(market, self.clock())
+        if order.status == 'open':
+            self._cancel(order)
+        return self._order_result(order)
+
+    def get_order(self, order_id: str) -> Optional[Dict]:
+        order = self.orders.get(order_id)
+        return self._order_result(order) if order else None
+
+    def _cancel(self, order: RestingOrder):
+        market = self.token_market.get(order.token_id)
+        if market:
+            market.books[order.token_id].remove(order)
+        order.status = 'cancelled'
+
+    def _order_result(self, order: RestingOrder) -> Dict:
+        return {
+            'success': True,
+            'order_id': order.order_id,
+            'status': order.status,
+            'filled_size': round(order.cost, 6),
+            'filled_shares': round(order.filled, 6),
+            'fill_price': order.cost / order.filled if order.filled else order.price,
+            'error': None
+        }
@@ -0,0 +1,233 @@
+"""
+Trade Export
+Constant-memory CSV / Parquet / Arrow export of the trades table
+"""
+
+import csv
+import io
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from archive import PARTITION_PATTERN, PartitionArchive
+
+
+# (column, CSV header) in export order
+EXPORT_COLUMNS = [
+    ('id', 'ID'),
+    ('timestamp', 'Timestamp'),
+    ('market_name', 'Market'),
+    ('trade_type', 'Type'),
+    ('expected_profit', 'Expected Profit'),
+    ('actual_profit', 'Actual Profit'),
+    ('status', 'Status'),
+    ('simulated', 'Simulated'),
+]
+
+DEFAULT_CHUNK_SIZE = 1000
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def parse_date_bound(value: Optional[str], end: bool = False) -> Optional[str]:
+    """
+    Convert an ISO date/datetime query value into a timestamp bound
+
+    A bare end date (YYYY-MM-DD) includes the whole day.
+
+    Raises:
+        ValueError: If the value is not ISO formatted
+    """
+    if not value:
+        return None
+
+    parsed = datetime.fromisoformat(value)
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed.isoformat(sep=' ')
+
+
+def archived_months(archive_dir: Optional[str]) -> List[str]:
+    """YYYY-MM of every partition in archive_dir, oldest first"""
+    if not archive_dir or not Path(archive_dir).is_dir():
+        return []
+    return sorted(f"{match.group(1)}-{match.group(2)}" for match in
+                  map(PARTITION_PATTERN.match, (path.name for path in Path(archive_dir).iterdir()))
+                  if match)
+
+
+def _reaches_archive(db_path: str, start: Optional[str], archive_dir: Optional[str]) -> bool:
+    """Whether [start, ...) begins before the live DB's oldest trade and there is an archive"""
+    if not archived_months(archive_dir):
+        return False
+    conn = sqlite3.connect(db_path)
+    try:
+        oldest = conn.execute("SELECT MIN(timestamp) FROM trades").fetchone()[0]
+    finally:
+        conn.close()
+    return oldest is None or not start or start < oldest
+
+
+def iter_trade_chunks(db_path: str, start: Optional[str] = None, end: Optional[str] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      archive_dir: Optional[str] = None) -> Iterator[List[Tuple]]:
+    """
+    Yield trade rows in chunks straight off the SQLite cursor
+
+    A range starting before the live DB's oldest trade continues into
+    the monthly partitions in archive_dir (see archive.py).
+
+    Args:
+        db_path: Path to SQLite database file
+        start: Inclusive lower timestamp bound
+        end: Exclusive upper timestamp bound
+        chunk_size: Rows per chunk
+        archive_dir: Partition directory (omit to export the live DB only)
+
+    Yields:
+        Lists of row tuples in EXPORT_COLUMNS order, newest first
+    """
+    if _reaches_archive(db_path, start, archive_dir):
+        yield from _iter_archived_chunks(db_path, start, end, chunk_size, archive_dir)
+        return
+
+    clauses = []
+    params = []
+    if start:
+        clauses.append("timestamp >= ?")
+        params.append(start)
+    if end:
+        clauses.append("timestamp < ?")
+        params.append(end)
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    columns = ', '.join(column for column, _ in EXPORT_COLUMNS)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {columns}
+            FROM trades
+            {where}
+            ORDER BY timestamp DESC
+        """, params)
+
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def _iter_archived_chunks(db_path: str, start: Optional[str], end: Optional[str],
+                          chunk_size: int, archive_dir: str) -> Iterator[List[Tuple]]:
+    archive = PartitionArchive(db_path, archive_dir)
+    chunk = []
+    for row in archive.iter_rows('trades', start, end, newest_first=True):
+        chunk.append(tuple(row.get(column) for column, _ in EXPORT_COLUMNS))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(db_path: str, start: Optional[str] = None, end: Optional[str] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE,
+               archive_dir: Optional[str] = None) -> Iterator[str]:
+    """Yield the CSV export one chunk of rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([header for _, header in EXPORT_COLUMNS])
+    yield buffer.getvalue()
+
+    for rows in iter_trade_chunks(db_path, start, end, chunk_size, archive_dir):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each batch"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_columnar(db_path: str, fmt: str = 'parquet', start: Optional[str] = None,
+                    end: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE * 10,
+                    archive_dir: Optional[str] = None) -> Iterator[bytes]:
+    """
+    Yield a Parquet file or Arrow IPC stream, one row group per chunk
+
+    Requires pyarrow (optional dependency).
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('timestamp', pa.string()),
+        ('market_name', pa.string()),
+        ('trade_type', pa.string()),
+        ('expected_profit', pa.float64()),
+        ('actual_profit', pa.float64()),
+        ('status', pa.string()),
+        ('simulated', pa.bool_()),
+    ])
+
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        for rows in iter_trade_chunks(db_path, start, end, chunk_size, archive_dir):
+            columns = list(zip(*rows))
+            batch = pa.record_batch([
+                pa.array(values, type=field.type) if field.name != 'simulated'
+                else pa.array([bool(v) for v in values], type=pa.bool_())
+                for field, values in zip(schema, columns)
+            ], schema=schema)
+            writer.write_batch(batch)
+
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+
+    yield sink.drain()
@@ -67,9 +67,24 @@ class YesNoArbitrageScanner:
     
     def __init__(self, client, config: Dict):
         self.client = client
-        self.config = config
         self.logger = logging.getLogger(__name__)
         
+        # Set by the bot when redemptions are batched (amortises on-chain gas)
+        self.redemption_batcher = None
+        
+        self.apply_config(config)
+        
+        # Tracking
+        self.last_scan_time = None
+        self.scan_count = 0
+        
+        self.logger.info(f"YesNoArbitrageScanner initialized for {self.target_markets}")
+        self.logger.info(f"Capital: ${self.total_capital}, Max position: ${self.max_single_position}")
+    
+    def apply_config(self, config: Dict):
+        """Load thresholds from config (called at init and on hot reload)"""
+        self.config = config
+        
         # Capital config
         capital_config = config.get('capital', {})
         self.total_capital = Decimal(str(capital_config.get('total_capital', 100)))
@@ -101,13 +116,6 @@ class YesNoArbitrageScanner:
         self.profit_weight = arb_config.get('profit_weight', 100)
         self.time_weight = arb_config.get('time_weight', 2)
         self.liquidity_weight = arb_config.get('liquidity_weight', 0.01)
-        
-        # Tracking
-        self.last_scan_time = None
-        self.scan_count = 0
-        
-        self.logger.info(f"YesNoArbitrageScanner initialized for {self.target_markets}")
-        self.logger.info(f"Capital: ${self.total_capital}, Max position: ${self.max_single_position}")
     
     async def scan_markets(self) -> List[Dict]:
         """
@@ -127,7 +135,7 @@ class YesNoArbitrageScanner:
             # Filter to target 15-minute crypto markets
             target_markets = self._filter_target_markets(all_markets)
             
-            self.logger.debug(f"Found {len(target_markets)} target 15-min markets")
+            self.logger.debug("Found %d target 15-min markets", len(target_markets))
             
             # Evaluate each market for arbitrage
             for market in target_markets:
@@ -139,16 +147,15 @@ class YesNoArbitrageScanner:
             opportunities.sort(key=lambda x: x['score'], reverse=True)
             
             if opportunities:
-                self.logger.info(f"🎯 Found {len(opportunities)} arbitrage opportunities!")
+                self.logger.info("🎯 Found %d arbitrage opportunities!", len(opportunities))
                 for opp in opportunities[:3]:  # Log top 3
                     self.logger.info(
-                        f"  {opp['market_name'][:50]}... | "
-                        f"Margin: {opp['net_margin']*100:.2f}% | "
-                        f"Score: {opp['score']:.1f}"
+                        "  %.50s... | Margin: %.2f%% | Score: %.1f",
+                        opp['market_name'], opp['net_margin'] * 100, opp['score']
                     )
             
         except Exception as e:
-            self.logger.error(f"Error scanning markets: {e}", exc_info=True)
+            self.logger.error("Error scanning markets: %s", e, exc_info=True)
         
         return opportunities
     
@@ -313,7 +320,7 @@ class YesNoArbitrageScanner:
             )
             
         except Exception as e:
-            self.logger.debug(f"Error evaluating market {market_id}: {e}")
+            self.logger.debug("Error evaluating market %s: %s", market_id, e)
             return None
     
     def _calculate_net_margin(self, gross_margin: Decimal, 
@@ -323,7 +330,8 @@ class YesNoArbitrageScanner:
         
         Fees:
         - Platform fee: 2% on winning side only
-        - Gas: ~$0.05 per transaction (2 transactions)
+        - Gas: ~$0.05 per transaction (2 transactions), or the trade's
+          share of a batched redemption
         - Slippage buffer: 0.5%
         """
         # Platform fee is 2% on the winning side
@@ -331,9 +339,9 @@ class YesNoArbitrageScanner:
         # Expected fee = 2% * $1.00 (the winning payout) = $0.02 per share
         platform_fee_per_share = self.platform_fee
         
-        # Gas fees (2 transactions) as percentage of position
+        # Gas fees as percentage of position
         # For $20 position: $0.10 gas / $20 = 0.5%
-        gas_fee_ratio = (self.gas_estimate * 2) / self.max_single_position
+        gas_fee_ratio = self.gas_per_trade() / self.max_single_position
         
         # Slippage buffer
         slippage = self.slippage_tolerance
@@ -343,6 +351,12 @@ class YesNoArbitrageScanner:
         
         return max(net_margin, Decimal('0'))
     
+    def gas_per_trade(self) -> Decimal:
+        """On-chain cost attributed to one trade"""
+        if self.redemption_batcher:
+            return self.redemption_batcher.gas_per_position()
+        return self.gas_estimate * 2
+    
     def _calculate_spread(self, orderbook: Dict) -> Decimal:
         """Calculate bid-ask spread percentage"""
         bids = orderbook.get('bids', [])
@@ -394,7 +408,8 @@ class YesNoArbitrageScanner:
         )
         return score
     
-    def calculate_position_size(self, opportunity: Dict) -> Decimal:
+    def calculate_position_size(self, opportunity: Dict, deployed: Decimal = Decimal('0'),
+                                capital: Optional[Decimal] = None) -> Decimal:
         """
         Calculate optimal position size for an opportunity
         
@@ -402,8 +417,15 @@ class YesNoArbitrageScanner:
         - Max 20% of capital per position
         - Don't exceed 90% of available liquidity
         - Scale with profit margin
+        - Only capital not tied up in unredeemed positions is available
+        
+        Args:
+            opportunity: Opportunity dict
+            deployed: USDC held in positions awaiting resolution
+            capital: Trading capital (defaults to capital.total_capital)
         """
-        available_capital = self.total_capital * self.max_deployment
+        total_capital = capital if capital is not None else self.total_capital
+        available_capital = total_capital * self.max_deployment - deployed
         
         # Start with max single position
         size = self.max_single_position
@@ -419,7 +441,7 @@ class YesNoArbitrageScanner:
         net_margin = Decimal(str(opportunity.get('net_margin', 0)))
         if net_margin > self.min_net_margin * 2:
             # Allow up to 25% for very profitable opportunities
-            size = min(size, self.total_capital * Decimal('0.25'))
+            size = min(size, total_capital * Decimal('0.25'))
         
         # Never exceed available capital
         size = min(size, available_capital)
@@ -0,0 +1,11 @@
+"""
+Test configuration
+
+Modules in src/ import each other by bare name (the bot and dashboard run
+from src/), so put src/ on the path the same way.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,65 @@
+"""Tests for incremental analytics catch-up"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from database import Database
+
+
+def insert_raw(db_path, profit):
+    """Insert a trade without going through the analytics engine"""
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO trades (timestamp, market_id, actual_profit, status) VALUES (?, 'm', ?, 'success')",
+            (datetime.now(), profit)
+        )
+
+
+def test_catch_up_folds_raw_trades_once(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    for profit in (1.0, -0.5, 2.0):
+        insert_raw(db.db_path, profit)
+
+    first = db.analytics.get_summary()
+    second = db.analytics.get_summary()
+
+    assert first['total_trades'] == 3
+    assert second['total_trades'] == 3
+    assert first['total_profit'] == 2.5
+
+
+def test_insert_after_raw_rows_replays_gap(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    insert_raw(db.db_path, 1.0)
+    db.insert_trade({'timestamp': datetime.now(), 'market_id': 'm', 'actual_profit': 3.0,
+                     'status': 'success'})
+
+    summary = db.analytics.get_summary()
+    assert summary['total_trades'] == 2
+    assert summary['total_profit'] == 4.0
+
+
+def test_catch_up_waits_for_concurrent_writer(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    insert_raw(db.db_path, 1.0)
+
+    # A writer holds the lock while inserting a trade and folding it in itself
+    writer = sqlite3.connect(db.db_path, timeout=5)
+    writer.execute("BEGIN IMMEDIATE")
+    cursor = writer.cursor()
+    cursor.execute("INSERT INTO trades (timestamp, market_id, actual_profit, status) "
+                   "VALUES (?, 'm', 2.0, 'success')", (datetime.now(),))
+    db.analytics.record_trade(cursor, cursor.lastrowid, 2.0, datetime.now())
+
+    results = {}
+    reader = threading.Thread(target=lambda: results.update(db.analytics.get_summary()))
+    reader.start()
+    time.sleep(0.2)
+    writer.commit()
+    writer.close()
+    reader.join(timeout=10)
+
+    assert results['total_trades'] == 2
+    assert db.analytics.get_summary()['total_profit'] == 3.0
@@ -0,0 +1,58 @@
+"""Tests for monthly partition rotation"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from archive import PartitionArchive
+from database import Database
+
+
+def fill(db_path, month_start, count):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO trades (timestamp, market_id, actual_profit, status) VALUES (?, 'm', 1.0, 'success')",
+            [(month_start + timedelta(minutes=i),) for i in range(count)]
+        )
+
+
+def test_rotate_moves_closed_months_in_chunks(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    now = datetime(2026, 6, 15)
+    fill(db.db_path, datetime(2026, 1, 1), 1050)
+    fill(db.db_path, datetime(2026, 6, 1), 10)
+
+    archive = PartitionArchive(db.db_path, str(tmp_path / "archive"), compress_after_months=12,
+                               chunk_rows=100, chunk_pause=0)
+    assert archive.rotate(keep_days=90, now=now) == 1050
+
+    with sqlite3.connect(db.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 10
+    with sqlite3.connect(archive.partition_path(datetime(2026, 1, 1).date())) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 1050
+
+    rows = list(archive.iter_rows('trades'))
+    assert len(rows) == 1060
+    assert archive.rotate(keep_days=90, now=now) == 0
+
+
+def test_writers_are_not_blocked_for_the_whole_month(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    fill(db.db_path, datetime(2026, 1, 1), 5000)
+    archive = PartitionArchive(db.db_path, str(tmp_path / "archive"), chunk_rows=200, chunk_pause=0.005)
+
+    rotation = threading.Thread(target=archive.rotate, kwargs={'keep_days': 90, 'now': datetime(2026, 6, 15)})
+    rotation.start()
+
+    worst = 0.0
+    while rotation.is_alive():
+        started = time.perf_counter()
+        db.insert_trade({'timestamp': datetime(2026, 6, 10), 'market_id': 'live', 'actual_profit': 0.5,
+                         'status': 'success'})
+        worst = max(worst, time.perf_counter() - started)
+    rotation.join()
+
+    assert worst < 1.0
+    with sqlite3.connect(db.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM trades WHERE market_id = 'm'").fetchone()[0] == 0
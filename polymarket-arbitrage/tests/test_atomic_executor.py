@@ -0,0 +1,102 @@
+"""Tests for leg sizing and locked-profit accounting in the executor"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from atomic_executor import AtomicExecutor
+
+CONFIG = {
+    'execution': {'order_timeout_seconds': 5, 'min_fill_ratio': 0.8},
+    'polymarket': {'platform_fee': 0.02, 'gas_estimate': 0.05},
+}
+
+OPPORTUNITY = {
+    'market_id': 'm1',
+    'yes_token_id': 'yes',
+    'no_token_id': 'no',
+    'yes_price': 0.40,
+    'no_price': 0.55,
+}
+
+
+class FakeClient:
+    """Fills orders at their limit price, in full or by fill_ratio[token]"""
+
+    def __init__(self, fill_ratio=None):
+        self.fill_ratio = fill_ratio or {}
+        self.orders = []
+        self.cancelled = []
+
+    async def get_orderbook(self, token_id):
+        price = OPPORTUNITY['yes_price'] if token_id == 'yes' else OPPORTUNITY['no_price']
+        return {'asks': [{'price': str(price), 'size': '1000'}], 'bids': []}
+
+    async def create_order(self, order):
+        self.orders.append(order)
+        price = order['price']
+        shares = order['size'] * self.fill_ratio.get(order['token_id'], 1.0)
+        return {'success': True, 'order_id': f"o{len(self.orders)}",
+                'filled_size': shares * price, 'fill_price': price}
+
+    async def cancel_order(self, order_id):
+        self.cancelled.append(order_id)
+
+
+def run(client, size=Decimal('95')):
+    executor = AtomicExecutor(client, CONFIG)
+    return asyncio.run(executor.execute_arbitrage(OPPORTUNITY, size))
+
+
+def test_legs_buy_equal_shares():
+    client = FakeClient()
+    result = run(client)
+
+    assert result.success
+    shares = {order['token_id']: order['size'] for order in client.orders}
+    # $95 at 0.40 + 0.55 buys 100 pairs
+    assert shares['yes'] == pytest.approx(100)
+    assert shares['no'] == pytest.approx(100)
+    assert result.actual_cost == pytest.approx(Decimal('95'))
+
+
+def test_locked_profit_is_usdc_payout_less_cost_fees_and_gas():
+    result = run(FakeClient())
+
+    # 100 pairs pay $100; cost $95, 2% fee on payout, gas 2 x $0.05
+    assert float(result.locked_profit) == pytest.approx(100 - 95 - 2 - 0.10)
+
+
+def test_partial_leg_leaves_unhedged_shares_as_cost():
+    # NO fills 90% (above min_fill_ratio): 90 pairs, 10 YES shares unhedged
+    result = run(FakeClient(fill_ratio={'no': 0.9}))
+
+    assert result.success
+    assert float(result.actual_cost) == pytest.approx(40 + 0.9 * 55)
+    assert float(result.locked_profit) == pytest.approx(90 - 89.5 - 0.02 * 90 - 0.10)
+
+
+def test_short_fill_fails_and_cancels_the_other_leg():
+    client = FakeClient(fill_ratio={'no': 0.5})
+    result = run(client)
+
+    assert not result.success
+    assert result.locked_profit == 0
+    assert client.cancelled == ['o1', 'o2']
+
+
+def test_legs_use_configured_order_type():
+    client = FakeClient()
+    assert run(client).success
+    assert {order['order_type'] for order in client.orders} == {'IOC'}
+
+    client = FakeClient()
+    config = dict(CONFIG, execution=dict(CONFIG['execution'], leg_order_type='fok'))
+    asyncio.run(AtomicExecutor(client, config).execute_arbitrage(OPPORTUNITY, Decimal('95')))
+    assert {order['order_type'] for order in client.orders} == {'FOK'}
+
+
+def test_unknown_order_type_falls_back_to_ioc():
+    config = dict(CONFIG, execution=dict(CONFIG['execution'], leg_order_type='market'))
+    assert AtomicExecutor(FakeClient(), config).leg_order_type == 'IOC'
@@ -0,0 +1,38 @@
+"""Tests for the replay client's capital accounting"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from backtest import ReplayClient
+from orderbook_recorder import BOOK, MARKET
+
+START = 1_700_000_000.0
+END = datetime.fromtimestamp(START + 900, timezone.utc).isoformat()
+
+
+def records():
+    yield START, MARKET, {'id': 'm1', 'active': True, 'end_date_iso': END,
+                          'yes_token_id': 'yes', 'no_token_id': 'no'}
+    for token, price in (('yes', 0.45), ('no', 0.50)):
+        yield START, BOOK, {'token_id': token, 'bids': [{'price': price - 0.01, 'size': 500.0}],
+                            'asks': [{'price': price, 'size': 500.0}]}
+
+
+def buy(client, token, price, shares):
+    return asyncio.run(client.create_order({'token_id': token, 'price': price, 'size': shares}))
+
+
+def test_capital_stays_deployed_until_the_market_ends():
+    client = ReplayClient(records(), START, latency_ms=0, latency_jitter_ms=0)
+    client.advance_to(START)
+
+    buy(client, 'yes', 0.45, 100)
+    buy(client, 'no', 0.50, 100)
+    assert client.deployed_capital == 95
+    assert client.get_balance()['locked'] == 95
+
+    client.advance_to(START + 899)
+    assert client.deployed_capital == 95
+
+    client.advance_to(START + 900)
+    assert client.deployed_capital == 0
@@ -0,0 +1,35 @@
+"""Tests for online database backups"""
+
+import gzip
+import sqlite3
+from datetime import datetime
+
+from backup_manager import BackupManager
+from database import Database
+
+
+def test_backup_is_a_restorable_gzip_and_old_ones_are_pruned(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    for i in range(50):
+        db.insert_trade({'timestamp': datetime(2026, 3, 1, 0, i), 'market_id': f'm{i}',
+                         'actual_profit': 0.5, 'status': 'success'})
+
+    backups = tmp_path / "backups"
+    manager = BackupManager(db, str(backups), keep=2, pages_per_step=1, step_sleep=0)
+    for day in ('20260101', '20260102'):
+        (backups / f"trades-{day}-000000.db.gz").write_bytes(b'')
+
+    report = manager.run_backup()
+    assert report['steps'] > 1
+    assert report['path'].endswith('.db.gz')
+
+    # Only the newest `keep` backups remain, the fresh one included
+    assert [p.name for p in manager.list_backups()] == [
+        'trades-20260102-000000.db.gz', report['path'].rsplit('/', 1)[1]]
+
+    restored = tmp_path / "restored.db"
+    with gzip.open(report['path'], 'rb') as src:
+        restored.write_bytes(src.read())
+    with sqlite3.connect(restored) as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+        assert conn.execute("SELECT COUNT(*), SUM(actual_profit) FROM trades").fetchone() == (50, 25.0)
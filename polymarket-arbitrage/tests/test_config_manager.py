@@ -0,0 +1,19 @@
+"""Tests for config path resolution"""
+
+from pathlib import Path
+
+from config_manager import PROJECT_ROOT, resolve_path
+
+
+def test_relative_paths_resolve_against_project_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert resolve_path("data/events.sock") == PROJECT_ROOT / "data" / "events.sock"
+
+
+def test_absolute_paths_are_kept(tmp_path):
+    assert resolve_path(tmp_path / "x.sock") == tmp_path / "x.sock"
+
+
+def test_project_root_holds_src():
+    assert (PROJECT_ROOT / "src" / "config_manager.py").exists()
+    assert PROJECT_ROOT == Path(__file__).resolve().parent.parent
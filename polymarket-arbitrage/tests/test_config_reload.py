@@ -0,0 +1,75 @@
+"""Tests for applying a reloaded config to the running bot"""
+
+import copy
+
+import pytest
+import yaml
+
+from arbitrage_bot import ArbitrageBot
+from config_manager import PROJECT_ROOT, restart_only_changes
+
+
+class StaticWatcher:
+    def __init__(self, config):
+        self.config = config
+
+    def poll(self, now):
+        config, self.config = self.config, None
+        return config
+
+
+@pytest.fixture
+def bot(tmp_path):
+    with open(PROJECT_ROOT / 'config' / 'config.example.yaml') as f:
+        config = yaml.safe_load(f)
+    config['execution']['mode'] = 'dry_run'
+    config['database'].update(path=str(tmp_path / 'trades.db'), archive_path=str(tmp_path / 'archive'),
+                              backup_enabled=False)
+    config['events']['socket_path'] = str(tmp_path / 'events.sock')
+    config['heartbeat']['path'] = str(tmp_path / 'heartbeat.bin')
+    config['profiling'].update(output_dir=str(tmp_path), request_path=str(tmp_path / 'profile.json'))
+    config['notifications']['telegram']['enabled'] = False
+    config['logging'].update(console=False, file=False)
+    config['metrics']['enabled'] = False
+    config['config_reload']['enabled'] = False
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(config))
+    return ArbitrageBot(str(path))
+
+
+def reload(bot, edit):
+    new_config = copy.deepcopy(bot.config)
+    edit(new_config)
+    bot.config_watcher = StaticWatcher(new_config)
+    bot._check_config_reload()
+
+
+def test_mode_change_is_restart_only(bot):
+    def go_live(config):
+        config['execution']['mode'] = 'live'
+        config['scanner']['scan_interval'] = 7
+
+    reload(bot, go_live)
+
+    assert bot.config['execution']['mode'] == 'dry_run'
+    assert bot.heartbeat.mode == 'dry_run'
+    assert bot.config['scanner']['scan_interval'] == 7  # The rest of the edit applies
+
+
+def test_client_settings_are_applied(bot):
+    def faster(config):
+        config['polymarket']['max_requests_per_second'] = 50
+        config['polymarket']['api_endpoint'] = 'https://example.invalid'
+
+    reload(bot, faster)
+
+    assert bot.client.min_request_interval == pytest.approx(1 / 50)
+    assert bot.client.config['api_endpoint'] == 'https://clob.polymarket.com'
+
+
+def test_restart_only_changes_lists_changed_keys():
+    old = {'execution': {'mode': 'dry_run'}, 'polymarket': {'chain_id': 137}}
+    assert restart_only_changes(old, {'execution': {'mode': 'dry_run'}}) == []
+    assert restart_only_changes(old, {'execution': {'mode': 'live'},
+                                      'polymarket': {'chain_id': 80002, 'taker_fee': 0.01}}) == [
+        'polymarket.chain_id', 'execution.mode']
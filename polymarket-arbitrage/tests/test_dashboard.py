@@ -0,0 +1,31 @@
+"""Tests for the dashboard's heartbeat liveness watch"""
+
+import dashboard
+
+
+class FakeReader:
+    def __init__(self):
+        self.heartbeat = None
+
+    def read(self):
+        return self.heartbeat
+
+
+def test_liveness_change_produces_a_status_delta(monkeypatch):
+    reader = FakeReader()
+    monkeypatch.setattr(dashboard, 'heartbeat_reader', reader)
+    reader.heartbeat = {'alive': True, 'paused': False, 'mode': 'live', 'pid': 1}
+
+    state, delta = dashboard.check_liveness()
+    assert delta == {'running': True, 'paused': False, 'mode': 'live'}
+
+    # Unchanged heartbeat: nothing to push
+    assert dashboard.check_liveness(state) == (state, None)
+
+    # Killed bot: heartbeat goes stale without a STATUS event
+    reader.heartbeat = dict(reader.heartbeat, alive=False)
+    state, delta = dashboard.check_liveness(state)
+    assert delta == {'running': False, 'paused': False, 'mode': 'live'}
+
+    reader.heartbeat = None
+    assert dashboard.check_liveness(state) == (state, None)
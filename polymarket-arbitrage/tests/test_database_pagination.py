@@ -0,0 +1,83 @@
+"""Tests for keyset pagination of trades and opportunities"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(25):
+        db.insert_trade({
+            # Pairs of trades share a timestamp so the id tie-breaker matters
+            'timestamp': start + timedelta(minutes=i // 2),
+            'market_id': 'a' if i % 3 else 'b',
+            'market_name': f'Market {i}',
+            'actual_profit': float(i),
+            'status': 'success' if i % 4 else 'failed',
+        })
+    return db
+
+
+def test_cursor_round_trip():
+    cursor = Database.encode_cursor('2026-01-01 12:00:00', 42)
+    assert Database.decode_cursor(cursor) == ('2026-01-01 12:00:00', 42)
+
+
+def test_malformed_cursor_raises():
+    with pytest.raises(ValueError):
+        Database.decode_cursor('not-a-cursor')
+
+
+def test_pages_cover_every_trade_once_newest_first(db):
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = db.get_trades(limit=7, cursor=cursor)
+        seen.extend(rows)
+        if cursor is None:
+            break
+
+    ids = [row['id'] for row in seen]
+    assert len(ids) == 25
+    assert len(set(ids)) == 25
+    keys = [(row['timestamp'], row['id']) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filtered_pages(db):
+    rows, cursor = db.get_trades(limit=3, market_id='b', columns=('market_id',))
+    more, _ = db.get_trades(limit=100, market_id='b', cursor=cursor)
+    assert all(row['market_id'] == 'b' for row in rows + more)
+    assert len(rows + more) == 9
+    assert set(rows[0]) == {'id', 'timestamp', 'market_id'}
+
+
+def test_opportunity_pages(db):
+    for i in range(5):
+        db.insert_opportunity({'market_id': f'm{i}', 'market_name': 'x', 'type': 'yes_no',
+                               'expected_profit': 0.1})
+    first, cursor = db.get_opportunities(limit=2)
+    rest, end = db.get_opportunities(limit=10, cursor=cursor)
+    assert end is None
+    assert len({row['id'] for row in first + rest}) == 5
+
+
+@pytest.mark.parametrize('where, index', [
+    ("", 'idx_trades_ts_id'),
+    ("WHERE (timestamp, id) < ('2026-06-01', 10)", 'idx_trades_ts_id'),
+    ("WHERE market_id = 'a' AND (timestamp, id) < ('2026-06-01', 10)", 'idx_trades_market_ts'),
+    ("WHERE status = 'success'", 'idx_trades_status_ts'),
+])
+def test_pages_are_index_range_scans(db, where, index):
+    with sqlite3.connect(db.db_path) as conn:
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM trades {where} "
+                            "ORDER BY timestamp DESC, id DESC LIMIT 8").fetchall()
+    detail = ' '.join(row[-1] for row in plan)
+    assert f'USING INDEX {index}' in detail
+    assert 'TEMP B-TREE' not in detail
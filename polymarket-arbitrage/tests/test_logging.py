@@ -0,0 +1,60 @@
+"""Tests for DEBUG sampling and log line parsing"""
+
+import json
+import logging
+
+from log_pipeline import SamplingFilter
+from log_tail import LogTail, parse_line
+
+
+def make_record(msg, *args, level=logging.DEBUG, name='scanner'):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_is_per_template():
+    sampler = SamplingFilter(every=3)
+    passed = [sampler.filter(make_record("Skipping %s", market)) for market in range(7)]
+    assert passed == [True, False, False, True, False, False, True]
+    assert sampler.filter(make_record("Other template"))
+    assert sampler.filter(make_record("Warning %s", 1, level=logging.WARNING))
+
+
+def test_sampling_counts_are_bounded():
+    sampler = SamplingFilter(every=10, max_templates=4)
+    for i in range(100):
+        sampler.filter(make_record(f"pre-formatted {i}"))
+    assert len(sampler.counts) == 4
+
+
+def test_parse_json_line():
+    line = json.dumps({'ts': '2026-01-31T10:36:47.947', 'level': 'INFO', 'logger': 'arbitrage_bot',
+                       'msg': 'Trade executed', 'market_id': 'm1'})
+    assert parse_line(line) == {
+        'timestamp': '2026-01-31T10:36:47.947', 'module': 'arbitrage_bot', 'level': 'INFO',
+        'message': 'Trade executed', 'market_id': 'm1'
+    }
+
+
+def test_parse_text_and_continuation_lines():
+    entry = parse_line("2026-01-31 10:36:47,947 - risk_manager - WARNING - 24h loss - limit reached")
+    assert entry == {'timestamp': '2026-01-31 10:36:47,947', 'module': 'risk_manager',
+                     'level': 'WARNING', 'message': '24h loss - limit reached'}
+    assert parse_line('Traceback (most recent call last):') is None
+    assert parse_line('{"truncated": ') is None
+
+
+def test_tail_skips_partial_lines_and_filters(tmp_path):
+    path = tmp_path / 'bot.log'
+    records = [{'ts': str(i), 'level': level, 'logger': 'bot', 'msg': f'm{i}'}
+               for i, level in enumerate(['INFO', 'DEBUG', 'ERROR'])]
+    path.write_text(''.join(json.dumps(r) + '\n' for r in records) + '{"ts": "3", "lev')
+
+    tail = LogTail(str(path), max_lines=10)
+    assert [e['message'] for e in tail.tail(10)] == ['m0', 'm1', 'm2']
+    assert [e['message'] for e in tail.tail(10, level='INFO')] == ['m0', 'm2']
+
+    seq, _ = tail.since(0)
+    with open(path, 'a') as f:
+        f.write('el": "INFO", "logger": "bot", "msg": "m3"}\n')
+    seq, new = tail.since(seq)
+    assert [e['message'] for e in new] == ['m3']
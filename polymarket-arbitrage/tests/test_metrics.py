@@ -0,0 +1,35 @@
+"""Tests for the Prometheus text exposition"""
+
+from metrics import MetricsRegistry
+
+
+def test_render_counter_gauge_and_histogram():
+    registry = MetricsRegistry()
+    orders = registry.counter('orders_total', 'Orders placed', ['side'])
+    depth = registry.gauge('queue_depth', 'Queued items', ['queue'])
+    latency = registry.histogram('latency_seconds', 'Request latency', buckets=(0.1, 1.0))
+
+    orders.inc(side='YES')
+    orders.inc(2, side='NO')
+    depth.set(3, queue='events')
+    depth.set_function(lambda: 7, queue='recorder')
+    for value in (0.05, 0.1, 0.5, 5.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        '# HELP latency_seconds Request latency',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{le="0.1"} 2',  # Bounds are inclusive
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        'latency_seconds_sum 5.65',
+        'latency_seconds_count 4',
+        '# HELP orders_total Orders placed',
+        '# TYPE orders_total counter',
+        'orders_total{side="NO"} 2.0',
+        'orders_total{side="YES"} 1.0',
+        '# HELP queue_depth Queued items',
+        '# TYPE queue_depth gauge',
+        'queue_depth{queue="events"} 3.0',
+        'queue_depth{queue="recorder"} 7.0',
+    ]
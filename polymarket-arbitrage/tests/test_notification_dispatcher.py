@@ -0,0 +1,50 @@
+"""Tests for notification delivery on shutdown"""
+
+import asyncio
+
+from notification_dispatcher import NotificationDispatcher
+
+CONFIG = {'notifications': {'dispatcher': {'send_timeout_seconds': 30, 'digest': False}}}
+
+
+class SlowService:
+    """The first send hangs (a stalled Telegram call); later sends succeed"""
+
+    def __init__(self):
+        self.sent = []
+        self.stalled = asyncio.Event()
+
+    async def send_message(self, title, message, force=False):
+        if not self.stalled.is_set():
+            self.stalled.set()
+            await asyncio.sleep(60)
+        self.sent.append(title)
+
+
+def test_stuck_send_does_not_starve_the_final_notice():
+    async def scenario():
+        service = SlowService()
+        dispatcher = NotificationDispatcher(service, CONFIG)
+        dispatcher.start()
+        dispatcher.submit("Trade executed", "details")
+        await service.stalled.wait()
+
+        dispatcher.submit("🛑 Bot Stopped", "Total Profit: $1.00")
+        await dispatcher.close(timeout=1.0, worker_timeout=0.2)
+        return service.sent
+
+    assert asyncio.run(asyncio.wait_for(scenario(), timeout=5)) == ["🛑 Bot Stopped"]
+
+
+def test_close_delivers_queued_digest():
+    async def scenario():
+        service = SlowService()
+        service.stalled.set()
+        dispatcher = NotificationDispatcher(
+            service, {'notifications': {'dispatcher': {'digest': True}}})
+        dispatcher.submit("Trade 1", "a", kind='trade')
+        dispatcher.submit("Trade 2", "b", kind='trade')
+        await dispatcher.close(timeout=1.0)
+        return service.sent
+
+    assert asyncio.run(scenario()) == ["📬 2 trades"]
@@ -0,0 +1,76 @@
+"""Tests for the orderbook recorder's block flushing"""
+
+import time
+
+from orderbook_recorder import BOOK, OrderbookReader, OrderbookRecorder
+
+BOOK_DATA = {'bids': [{'price': '0.48', 'size': '100'}], 'asks': [{'price': '0.50', 'size': '80'}]}
+
+
+def test_idle_partial_block_is_flushed_by_the_writer(tmp_path):
+    recorder = OrderbookRecorder(str(tmp_path), flush_interval=0.1)
+    try:
+        recorder.record_book('token-1', BOOK_DATA, timestamp=1000.0)
+        reader = OrderbookReader(str(tmp_path))
+        assert reader.time_range() is None  # Still buffered
+
+        # No further records: the writer's own timer must write the block
+        deadline = time.time() + 2
+        while reader.time_range() is None and time.time() < deadline:
+            time.sleep(0.05)
+
+        records = list(reader.iter_records(kinds=(BOOK,)))
+        assert [(ts, payload['token_id']) for ts, _, payload in records] == [(1000.0, 'token-1')]
+    finally:
+        recorder.close()
+
+
+def test_close_writes_partial_block(tmp_path):
+    recorder = OrderbookRecorder(str(tmp_path), flush_interval=60)
+    recorder.record_book('token-1', BOOK_DATA, timestamp=1000.0)
+    recorder.record_book('token-2', BOOK_DATA, timestamp=1001.0)
+    recorder.close()
+
+    assert OrderbookReader(str(tmp_path)).time_range() == (1000.0, 1001.0)
+
+
+def test_out_of_range_and_malformed_levels_are_skipped(tmp_path):
+    book = {'bids': [{'price': '0.48', 'size': '100'}, {'price': '-0.01', 'size': '5'},
+                     {'price': 'nan', 'size': '5'}, {'size': '5'}],
+            'asks': [{'price': '0.50', 'size': '80'}, {'price': '7.00', 'size': '5'}]}
+    recorder = OrderbookRecorder(str(tmp_path), flush_interval=60)
+    recorder.record_book('token-1', book, timestamp=1000.0)
+    recorder.close()
+
+    [(_, _, payload)] = OrderbookReader(str(tmp_path)).iter_records(kinds=(BOOK,))
+    assert payload['bids'] == [{'price': 0.48, 'size': 100.0}]
+    assert payload['asks'] == [{'price': 0.5, 'size': 80.0}]
+    assert recorder.errors == 0
+
+
+def test_recording_never_raises_into_the_caller(tmp_path):
+    recorder = OrderbookRecorder(str(tmp_path), flush_interval=60)
+    try:
+        recorder.record_book('token-1', {'bids': None, 'asks': []})
+        recorder.record_markets([None, {'id': 'm1', 'question': 'q'}])
+        assert recorder.errors == 2
+        assert list(recorder.last_markets) == ['m1']
+    finally:
+        recorder.close()
+
+
+def test_last_records_are_bounded(tmp_path):
+    recorder = OrderbookRecorder(str(tmp_path), flush_interval=60, max_tracked=3)
+    try:
+        for i in range(10):
+            recorder.record_book(f'token-{i}', BOOK_DATA)
+            recorder.record_markets([{'id': f'm{i}', 'question': 'q'}])
+        assert list(recorder.last_books) == ['token-7', 'token-8', 'token-9']
+        assert list(recorder.last_markets) == ['m7', 'm8', 'm9']
+
+        # A repeated book still de-duplicates and stays most recent
+        recorder.record_book('token-7', BOOK_DATA)
+        assert recorder.skipped == 1
+        assert list(recorder.last_books)[-1] == 'token-7'
+    finally:
+        recorder.close()
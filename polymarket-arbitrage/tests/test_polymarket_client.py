@@ -0,0 +1,83 @@
+"""Tests for re-deriving API credentials after the CLOB rejects them"""
+
+import asyncio
+from types import SimpleNamespace
+
+import polymarket_client
+from credential_cache import CredentialCache, fingerprint
+from polymarket_client import PolymarketClient
+
+HOST = 'https://clob.polymarket.com'
+
+
+class ApiError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClob:
+    """Stands in for ClobClient: derives fresh creds and rejects the stale ones"""
+
+    derived = 0
+
+    def __init__(self, host=None, key=None, chain_id=None, **kwargs):
+        self.creds = None
+
+    def derive_api_key(self):
+        FakeClob.derived += 1
+        return SimpleNamespace(api_key='fresh-key', api_secret='s', api_passphrase='p')
+
+    def set_api_creds(self, creds):
+        self.creds = creds
+
+    def create_order(self, order_args):
+        if self.creds.api_key != 'fresh-key':
+            raise ApiError(401)
+        return order_args
+
+    def post_order(self, signed, order_type):
+        return {'success': True, 'orderID': 'o1', 'makingAmount': '4', 'takingAmount': '10'}
+
+
+def live_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(polymarket_client, 'ClobClient', FakeClob)
+    monkeypatch.setattr(polymarket_client, 'OrderArgs', lambda **kwargs: kwargs)
+    monkeypatch.setattr(polymarket_client, 'OrderType', SimpleNamespace(FAK='FAK', GTC='GTC'))
+    FakeClob.derived = 0
+
+    config = {'api_endpoint': HOST, 'credential_cache': {'path': str(tmp_path / 'creds.json')}}
+    cache = CredentialCache(str(tmp_path / 'creds.json'))
+    cache.store(fingerprint('pk', HOST, 137),
+                {'api_key': 'revoked-key', 'api_secret': 's', 'api_passphrase': 'p'})
+
+    client = PolymarketClient(None, None, None, config)  # Simulation mode, then made live
+    client.simulation_mode = False
+    client.sim = None
+    client.private_key = 'pk'
+    client.min_request_interval = 0
+    client.client = FakeClob()
+    client.client.set_api_creds(SimpleNamespace(api_key='revoked-key'))
+    return client, cache
+
+
+def test_auth_rejection_replaces_cached_creds(tmp_path, monkeypatch):
+    client, cache = live_client(tmp_path, monkeypatch)
+    order = {'token_id': 't', 'side': 'buy', 'price': 0.4, 'size': 10, 'order_type': 'IOC'}
+
+    first = asyncio.run(client.create_order(order))
+    assert not first['success']  # The rejected order is not retried
+    assert FakeClob.derived == 1
+    assert cache.load(fingerprint('pk', HOST, 137))['api_key'] == 'fresh-key'
+
+    assert asyncio.run(client.create_order(order))['success']
+
+
+def test_other_errors_and_repeats_do_not_re_derive(tmp_path, monkeypatch):
+    client, _ = live_client(tmp_path, monkeypatch)
+
+    assert not client._handle_auth_error(ApiError(500))
+    assert not client._handle_auth_error(ValueError('timeout'))
+    assert client._handle_auth_error(ApiError(403))
+    assert not client._handle_auth_error(ApiError(403))  # Within AUTH_REFRESH_INTERVAL
+    assert FakeClob.derived == 1
@@ -0,0 +1,113 @@
+"""Tests for booking fills and releasing capital at resolution"""
+
+import asyncio
+from decimal import Decimal
+
+from atomic_executor import ExecutionResult, ExecutionStatus, OrderResult
+from database import Database
+from position_book import OPEN, REDEEMED, RESOLVED, UNCLAIMED, PositionBook
+
+OPPORTUNITY = {'market_id': 'm1', 'market_name': 'BTC up?', 'yes_token_id': 'yes',
+               'no_token_id': 'no', 'time_remaining': 0}
+
+
+class FakeClient:
+    """Resolves every market YES; redeem() returns payout (None = cannot redeem, as live)"""
+
+    def __init__(self, payout=None, simulation_mode=False):
+        self.payout = payout
+        self.simulation_mode = simulation_mode
+
+    async def get_market(self, market_id):
+        return {'closed': True, 'winner': 'YES'}
+
+    async def redeem(self, market_id):
+        return self.payout
+
+
+def leg(side, usdc, price):
+    return OrderResult(True, f"{side}-1", side, Decimal(usdc), Decimal(usdc), Decimal(price),
+                       ExecutionStatus.SUCCESS)
+
+
+def fill(book):
+    # 100 pairs at 0.40 + 0.55
+    result = ExecutionResult(True, leg('YES', '40', '0.40'), leg('NO', '55', '0.55'), Decimal('3'),
+                             Decimal('95'), ExecutionStatus.SUCCESS, '', 0.0, 0.0)
+    return book.add_fill(OPPORTUNITY, result)
+
+
+def settle(book):
+    return asyncio.run(book.settle(force=True))
+
+
+def test_fill_is_booked_in_shares_and_usdc():
+    book = PositionBook(FakeClient(), {})
+    position = fill(book)
+
+    assert position.yes_shares == position.no_shares == 100
+    assert position.cost == 95
+    assert book.open_count == 1
+    assert book.deployed_capital == 95
+
+
+def test_redeemed_position_releases_capital_and_slot():
+    book = PositionBook(FakeClient(payout=100.0, simulation_mode=True), {})
+    fill(book)
+
+    [position] = settle(book)
+    assert position.status == REDEEMED
+    assert position.profit == 5
+    assert book.open_count == 0
+    assert book.deployed_capital == 0
+    assert book.realized_profit == 5
+    assert book.capital(Decimal('1000')) == Decimal('1005')
+
+
+def test_unredeemable_position_is_released_as_unclaimed(tmp_path):
+    database = Database(str(tmp_path / 'trades.db'))
+    book = PositionBook(FakeClient(payout=None), {}, database)
+    fill(book)
+
+    [position] = settle(book)
+    assert position.status == UNCLAIMED
+    assert position.payout == 100  # The winning YES shares
+    assert book.open_count == 0
+    assert book.deployed_capital == 0
+
+    # Not in the wallet until redeemed on-chain: neither profit nor capital
+    assert book.realized_profit == 0
+    assert book.unclaimed_value == 100
+    assert book.capital(Decimal('1000')) == Decimal('905')
+
+    # Not reloaded after a restart
+    assert PositionBook(FakeClient(), {}, database).open_count == 0
+
+
+def test_restart_recovers_positions_stuck_awaiting_redemption(tmp_path):
+    database = Database(str(tmp_path / 'trades.db'))
+    book = PositionBook(FakeClient(), {}, database)
+    position = fill(book)
+    position.status, position.winner = RESOLVED, 'NO'
+    database.save_position(position.to_dict())
+
+    restarted = PositionBook(FakeClient(payout=None), {}, database)
+    assert restarted.open_count == 1
+
+    [released] = settle(restarted)
+    assert released.status == UNCLAIMED
+    assert released.payout == 100
+    assert restarted.open_count == 0
+
+
+def test_unresolved_market_stays_open():
+    class Trading(FakeClient):
+        async def get_market(self, market_id):
+            return {'closed': False}
+
+    book = PositionBook(Trading(), {})
+    fill(book)
+
+    assert settle(book) == []
+    assert book.positions['m1'].status == OPEN
+    assert book.open_count == 1
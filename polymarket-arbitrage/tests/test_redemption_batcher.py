@@ -0,0 +1,94 @@
+"""Tests for batched redemption timing and gas attribution"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from position_book import REDEEMED, Position, PositionBook
+from redemption_batcher import ChainStub, RedemptionBatcher
+
+CONFIG = {'resolution': {'batch': {'max_batch_size': 3, 'max_wait_seconds': 120,
+                                   'utilisation_threshold': 0.7}}}
+
+
+def make_batcher(payouts=None, charged=None):
+    chain = ChainStub(lambda market_id: (payouts or {}).get(market_id, 10.0),
+                      base_gas=0.04, per_position_gas=0.01,
+                      charge=charged.append if charged is not None else None)
+    return RedemptionBatcher(chain, CONFIG), chain
+
+
+def test_due_waits_for_a_full_batch_or_the_oldest_deadline():
+    batcher, _ = make_batcher()
+
+    assert not batcher.due([], now=0)
+    assert not batcher.due(['a'], now=1000)
+    assert not batcher.due(['a', 'b'], now=1100)  # a has waited 100s
+    assert batcher.due(['a', 'b'], now=1120)      # a has waited max_wait_seconds
+    assert batcher.due(['c', 'd', 'e'], now=1120)  # Full batch
+
+
+def test_due_sends_early_when_capital_is_tied_up():
+    batcher, _ = make_batcher()
+    assert not batcher.due(['a'], now=0, utilisation=0.5)
+    assert batcher.due(['a'], now=0, utilisation=0.7)
+
+
+def test_redeem_splits_each_transactions_gas_across_its_markets():
+    charged = []
+    batcher, chain = make_batcher(payouts={'a': 12.0}, charged=charged)
+
+    results = asyncio.run(batcher.redeem(['a', 'b', 'c', 'd']))
+
+    # max_batch_size 3: one transaction of 3 and one of 1
+    assert [receipt.market_ids for receipt in chain.transactions] == [['a', 'b', 'c'], ['d']]
+    assert charged == pytest.approx([0.07, 0.05])
+    assert results['a'] == pytest.approx((12.0, 0.07 / 3))
+    assert results['c'] == pytest.approx((10.0, 0.07 / 3))
+    assert results['d'] == pytest.approx((10.0, 0.05))
+    assert sum(gas for _, gas in results.values()) == pytest.approx(0.12)
+
+
+def test_failed_transaction_leaves_its_markets_queued():
+    batcher, chain = make_batcher()
+
+    async def fail(market_ids):
+        raise RuntimeError("reverted")
+
+    batcher.due(['a'], now=0)
+    chain.redeem_batch = fail
+    assert asyncio.run(batcher.redeem(['a'])) == {}
+    assert 'a' in batcher.queued_at
+
+
+def test_gas_per_position_follows_recent_batch_sizes():
+    batcher, _ = make_batcher()
+    assert batcher.gas_per_position() == Decimal('0.05')  # A batch of one
+
+    asyncio.run(batcher.redeem(['a', 'b', 'c']))
+    assert batcher.gas_per_position() == Decimal(str(round(0.07 / 3, 6)))
+
+
+def test_position_book_nets_gas_from_batched_payouts():
+    class Client:
+        simulation_mode = True
+
+        async def get_market(self, market_id):
+            return {'closed': True, 'winner': 'YES'}
+
+    async def scenario():
+        batcher, _ = make_batcher()
+        book = PositionBook(Client(), CONFIG, batcher=batcher)
+        for market_id in ('a', 'b'):
+            book.positions[market_id] = Position(market_id, market_id, 'y', 'n', yes_shares=10,
+                                                 no_shares=10, cost=9.5)
+        assert await book.settle(now=1000.0, force=True) == []  # Redeemed in the background
+        await book.wait_for_redemptions()
+        return book, await book.settle(now=1001.0)
+
+    book, redeemed = asyncio.run(scenario())
+    assert {p.market_id for p in redeemed} == {'a', 'b'}
+    assert all(p.status == REDEEMED for p in redeemed)
+    assert redeemed[0].payout == pytest.approx(10.0 - 0.06 / 2)
+    assert book.deployed_capital == 0
@@ -0,0 +1,79 @@
+"""Tests for trade approval against precomputed headroom and reservations"""
+
+import asyncio
+
+from risk_manager import RiskManager
+
+CONFIG = {
+    'risk_management': {'max_daily_loss': 10, 'max_weekly_loss': 20, 'max_open_positions': 2,
+                        'max_position_percentage': 0.3},
+    'capital': {'total_capital': 100, 'max_deployment_ratio': 0.8},
+}
+
+
+def opportunity(market_id, profit=0.5):
+    return {'market_id': market_id, 'expected_profit': profit}
+
+
+def test_reservations_claim_capital_and_slots():
+    gate = RiskManager(CONFIG).gate
+
+    first, reason = gate.reserve(opportunity('a'), 30)
+    assert reason is None
+    assert gate.reserve(opportunity('a'), 10) == (None, "execution already in flight")
+
+    second, _ = gate.reserve(opportunity('b'), 30)
+    assert gate.reserve(opportunity('c'), 5) == (None, "no free position slots")
+
+    gate.release(first)
+    gate.release(first)  # Releasing twice returns the headroom once
+    assert gate.get_status()['capital_headroom'] == 80 - 30
+    assert gate.get_status()['in_flight'] == 1
+
+
+def test_capital_headroom_counts_reservations_and_open_exposure():
+    rm = RiskManager(dict(CONFIG, risk_management=dict(CONFIG['risk_management'], max_open_positions=5)))
+    rm.update_exposure(open_positions=1, exposure=40)
+    gate = rm.gate
+
+    assert gate.reserve(opportunity('a'), 25)[1] is None
+    _, reason = gate.reserve(opportunity('b'), 20)
+    assert reason == "position $20.00 over $15.00 free capital"
+    assert gate.check(31, 1.0) == "position $31.00 over $30.00 limit"
+    assert gate.check(10, 0.0) == "non-positive expected profit"
+
+
+def test_headroom_follows_risk_manager_state():
+    rm = RiskManager(CONFIG)
+    rm.update_exposure(open_positions=2, exposure=10)
+    assert rm.gate.check(5, 1.0) == "no free position slots"
+
+    rm.update_exposure(open_positions=1, exposure=10)
+    assert rm.gate.check(5, 1.0) is None
+
+    rm.record_pnl(-10)
+    assert rm.gate.check(5, 1.0) == "loss limit reached"
+
+
+def test_concurrent_executions_never_share_headroom():
+    rm = RiskManager(dict(CONFIG, risk_management=dict(CONFIG['risk_management'], max_open_positions=10)))
+    gate = rm.gate
+    approved = []
+
+    async def execute(market_id):
+        reservation, reason = gate.reserve(opportunity(market_id), 25)
+        if reason:
+            return
+        try:
+            approved.append(market_id)
+            await asyncio.sleep(0.01)  # Orders in flight
+        finally:
+            gate.release(reservation)
+
+    async def scenario():
+        await asyncio.gather(*(execute(f"m{i}") for i in range(6)))
+
+    asyncio.run(scenario())
+    assert len(approved) == 3  # $80 deployable / $25 each
+    assert gate.reserved == 0
+    assert gate.reservations == {}
@@ -0,0 +1,79 @@
+"""Tests for rolling PnL windows and execution accounting"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import Database
+from position_book import REDEEMED, Position
+from risk_manager import RiskManager, RollingWindow
+
+CONFIG = {
+    'risk_management': {'max_daily_loss': 10, 'max_weekly_loss': 20, 'max_open_positions': 5,
+                        'consecutive_failure_limit': 3},
+    'capital': {'total_capital': 100, 'max_deployment_ratio': 0.8},
+}
+
+
+def test_rolling_window_expires_old_buckets():
+    window = RollingWindow(span=60, buckets=6)  # 10s buckets
+    window.add(5, timestamp=1000)
+    window.add(-2, timestamp=1035)
+    assert window.sum(now=1040) == 3
+    assert window.sum(now=1065) == -2   # The 1000s bucket has rolled out
+    assert window.sum(now=1200) == 0
+
+
+def test_rolling_window_ignores_values_older_than_the_window():
+    window = RollingWindow(span=60, buckets=6)
+    window.add(1, timestamp=1000)
+    window.add(7, timestamp=900)
+    assert window.sum(now=1000) == 1
+
+
+def test_held_position_pnl_is_counted_at_settlement_not_fill():
+    rm = RiskManager(CONFIG)
+    rm.record_trade({'success': True, 'profit': 3.0}, realized=False)
+    assert rm.daily_pnl == 0
+
+    rm.record_pnl(-4.0)
+    assert rm.daily_pnl == -4.0
+    assert rm.weekly_pnl == -4.0
+
+
+def test_settlement_losses_hit_the_loss_limit():
+    rm = RiskManager(CONFIG)
+    rm.record_pnl(-6.0)
+    assert rm.can_trade()
+    rm.record_pnl(-4.0)
+    assert not rm.can_trade()
+    assert rm.gate.check(5, 0.1, 'm1') == "loss limit reached"
+
+
+def test_failed_executions_trip_the_circuit_breaker_but_preflight_rejections_do_not():
+    rm = RiskManager(CONFIG)
+    for _ in range(5):
+        rm.record_trade({'success': False, 'profit': 0, 'orders_sent': False}, realized=False)
+    assert rm.consecutive_failures == 0
+    assert not rm.circuit_breaker_active
+
+    for _ in range(3):
+        rm.record_trade({'success': False, 'profit': 0, 'orders_sent': True}, realized=False)
+    assert rm.circuit_breaker_active
+
+
+def test_windows_are_rehydrated_from_settled_positions(tmp_path):
+    database = Database(str(tmp_path / 'trades.db'))
+    now = time.time()
+    for market_id, payout, cost, redeemed_at in (('old', 0.0, 50.0, now - 8 * 86400),
+                                                 ('day', 90.0, 95.0, now - 3600 * 5),
+                                                 ('hour', 100.0, 97.0, now - 60)):
+        database.save_position(Position(market_id, market_id, 'y', 'n', cost=cost, status=REDEEMED,
+                                        payout=payout, redeemed_at=redeemed_at).to_dict())
+
+    rm = RiskManager(CONFIG)
+    settlements = database.get_settlements_since(datetime.now() - timedelta(days=7), simulated=False)
+    assert rm.load_history(settlements) == 2
+    assert rm.hourly_pnl == pytest.approx(3.0)
+    assert rm.daily_pnl == pytest.approx(-2.0)
@@ -0,0 +1,160 @@
+"""Tests for the simulated exchange's quoting and matching"""
+
+import asyncio
+
+import pytest
+
+from sim_exchange import WINDOW_SECONDS, RestingOrder, SimulatedExchange, TokenBook
+
+START = 1_800_000_000 - 1_800_000_000 % WINDOW_SECONDS + 60  # A minute into a window
+
+
+class Clock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_exchange(clock=None, **overrides):
+    config = {
+        'seed': 1, 'assets': ['BTC'], 'depth': 3, 'level_size': [100, 100],
+        'arb_rate': 0.0, 'taker_rate': 0, 'volatility': 0.0, 'starting_balance': 1000.0,
+        'order_latency': {'distribution': 'fixed', 'median_ms': 0},
+    }
+    config.update(overrides)
+    return SimulatedExchange(config, clock=clock or Clock())
+
+
+def only_market(exchange):
+    [market] = exchange.markets.values()
+    return market
+
+
+def order(exchange, token_id, side, price, size, order_type):
+    return asyncio.run(exchange.create_order({'token_id': token_id, 'side': side, 'price': price,
+                                              'size': size, 'order_type': order_type}))
+
+
+def assert_valid_book(exchange, book):
+    for level in book['bids'] + book['asks']:
+        assert 0 < level['price'] < 1
+        assert level['price'] == pytest.approx(round(level['price'] / exchange.tick) * exchange.tick)
+    if book['bids'] and book['asks']:
+        assert book['bids'][0]['price'] < book['asks'][0]['price']
+
+
+@pytest.mark.parametrize('fair', [0.03, 0.5, 0.97])
+def test_dislocated_quotes_stay_inside_price_bounds(fair):
+    exchange = make_exchange(arb_edge_ticks=[10, 10])
+    market = only_market(exchange)
+    market.fair = fair
+    exchange.dislocate(1, duration=60, edge_ticks=10)
+
+    for token in (market.yes_token, market.no_token):
+        assert_valid_book(exchange, exchange.get_orderbook(token))
+
+
+def test_long_run_with_frequent_dislocations_quotes_valid_prices():
+    clock = Clock()
+    exchange = make_exchange(clock, arb_rate=0.2, volatility=0.05, taker_rate=50)
+    for _ in range(600):
+        clock.now += 5
+        for market in exchange.get_markets():
+            if market['active']:
+                for token in (market['yes_token_id'], market['no_token_id']):
+                    assert_valid_book(exchange, exchange.get_orderbook(token))
+
+
+def test_ioc_takes_what_the_book_has_and_cancels_the_rest():
+    exchange = make_exchange()
+    token = only_market(exchange).yes_token
+    ask = exchange.get_orderbook(token)['asks'][0]['price']
+
+    result = order(exchange, token, 'buy', ask, 150, 'IOC')
+
+    assert result['status'] == 'cancelled'
+    assert result['filled_shares'] == pytest.approx(100)
+    assert result['filled_size'] == pytest.approx(100 * ask)
+    assert exchange.balance == pytest.approx(1000 - 100 * ask)
+    assert exchange.positions[token] == pytest.approx(100)
+    assert exchange.locked() == 0
+
+
+def test_fok_fills_completely_or_not_at_all():
+    exchange = make_exchange()
+    token = only_market(exchange).yes_token
+    ask = exchange.get_orderbook(token)['asks'][0]['price']
+
+    rejected = order(exchange, token, 'buy', ask, 150, 'FOK')
+    assert not rejected['success']
+    assert exchange.balance == 1000.0
+
+    filled = order(exchange, token, 'buy', ask + exchange.tick, 150, 'FOK')
+    assert filled['status'] == 'filled'
+    assert filled['filled_shares'] == pytest.approx(150)
+
+
+def test_gtc_rests_locks_balance_and_cancels():
+    exchange = make_exchange()
+    token = only_market(exchange).yes_token
+    bid = exchange.get_orderbook(token)['bids'][0]['price']
+
+    result = order(exchange, token, 'buy', bid, 50, 'GTC')
+    assert result['status'] == 'open'
+    assert result['filled_shares'] == 0
+    assert exchange.locked() == pytest.approx(50 * bid)
+    assert exchange.get_orderbook(token)['bids'][0]['size'] == pytest.approx(150)
+
+    cancelled = asyncio.run(exchange.cancel_order(result['order_id']))
+    assert cancelled['status'] == 'cancelled'
+    assert exchange.locked() == 0
+
+
+def test_orders_outside_price_bounds_are_rejected():
+    exchange = make_exchange()
+    token = only_market(exchange).yes_token
+    for price in (0.0, -0.01, 1.0):
+        assert order(exchange, token, 'buy', price, 10, 'IOC')['error'] == 'Invalid price or size'
+
+
+def test_resting_order_keeps_its_queue_position():
+    book = TokenBook('t')
+    ids = iter(range(100))
+    make_id = lambda: f"mm_{next(ids)}"
+    book.requote('buy', [(0.48, 100)], make_id, 0)
+    ours = RestingOrder('ours', 't', 'buy', 0.48, 30, owner='user')
+    book.add(ours)
+
+    # The maker resizes its quote at the same price: still ahead of us
+    book.requote('buy', [(0.48, 80)], make_id, 1)
+    fills = book.match('sell', 0.48, 90)
+
+    assert [(o.owner, shares) for o, shares, _ in fills] == [('mm', 80), ('user', 10)]
+    assert ours.remaining == pytest.approx(20)
+
+
+def test_resolution_cancels_resting_orders_and_redeem_pays_winners():
+    clock = Clock()
+    exchange = make_exchange(clock)
+    market = only_market(exchange)
+    yes_ask = exchange.get_orderbook(market.yes_token)['asks'][0]['price']
+    no_ask = exchange.get_orderbook(market.no_token)['asks'][0]['price']
+    no_bid = exchange.get_orderbook(market.no_token)['bids'][0]['price']
+
+    order(exchange, market.yes_token, 'buy', yes_ask, 40, 'IOC')
+    order(exchange, market.no_token, 'buy', no_ask, 40, 'IOC')
+    resting = order(exchange, market.no_token, 'buy', no_bid, 10, 'GTC')
+    assert exchange.redeem(market.market_id) == 0.0  # Still trading
+
+    clock.now = market.end + 1
+    exchange.get_markets()
+    api = exchange.get_market(market.market_id)
+    assert api['closed'] and api['winner'] in ('YES', 'NO')
+    assert exchange.get_order(resting['order_id'])['status'] == 'cancelled'
+
+    balance = exchange.balance
+    assert exchange.redeem(market.market_id) == pytest.approx(40)
+    assert exchange.balance == pytest.approx(balance + 40)
+    assert exchange.redeem(market.market_id) == 0.0  # Only once
@@ -0,0 +1,82 @@
+"""Tests for streaming trade exports"""
+
+import csv
+import io
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from archive import PartitionArchive
+from database import Database
+from trade_export import EXPORT_COLUMNS, iter_trade_chunks, parse_date_bound, stream_columnar, stream_csv
+
+
+def fill(db_path, month_start, count):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO trades (timestamp, market_id, actual_profit, status) VALUES (?, 'm', 1.0, 'success')",
+            [(month_start + timedelta(hours=i),) for i in range(count)]
+        )
+
+
+def read_csv(chunks):
+    return list(csv.DictReader(io.StringIO(''.join(chunks))))
+
+
+def test_export_reaching_before_the_live_db_includes_archived_months(tmp_path):
+    db = Database(str(tmp_path / "trades.db"), archive_dir=str(tmp_path / "archive"))
+    fill(db.db_path, datetime(2026, 1, 1), 30)
+    fill(db.db_path, datetime(2026, 6, 1), 10)
+    PartitionArchive(db.db_path, str(tmp_path / "archive"), chunk_pause=0).rotate(
+        keep_days=90, now=datetime(2026, 6, 15))
+    archive_dir = str(tmp_path / "archive")
+
+    rows = read_csv(stream_csv(db.db_path, parse_date_bound('2026-01-01'), chunk_size=7,
+                               archive_dir=archive_dir))
+    assert len(rows) == 40
+    timestamps = [row['Timestamp'] for row in rows]
+    assert timestamps == sorted(timestamps, reverse=True)
+
+    # Live-only range: partitions are not opened
+    live = [row for chunk in iter_trade_chunks(db.db_path, parse_date_bound('2026-06-01'),
+                                               archive_dir=archive_dir) for row in chunk]
+    assert len(live) == 10
+
+    # Without an archive directory only the live DB is exported
+    assert len(read_csv(stream_csv(db.db_path))) == 10
+
+
+def test_csv_export_streams_the_date_range(tmp_path):
+    db = Database(str(tmp_path / "trades.db"))
+    fill(db.db_path, datetime(2026, 3, 1), 72)  # Three days, hourly
+
+    chunks = list(stream_csv(db.db_path, parse_date_bound('2026-03-02'),
+                             parse_date_bound('2026-03-02', end=True), chunk_size=5))
+    assert len(chunks) == 1 + 5  # Header, then 24 rows in chunks of 5
+
+    rows = read_csv(chunks)
+    assert len(rows) == 24
+    assert {row['Timestamp'][:10] for row in rows} == {'2026-03-02'}
+    assert rows[0]['Timestamp'] > rows[-1]['Timestamp']
+    assert rows[0]['Actual Profit'] == '1.0'
+
+
+def test_parquet_export_round_trips(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    db = Database(str(tmp_path / "trades.db"))
+    fill(db.db_path, datetime(2026, 3, 1), 72)
+
+    path = tmp_path / "trades.parquet"
+    path.write_bytes(b''.join(stream_columnar(db.db_path, 'parquet', parse_date_bound('2026-03-02'),
+                                              parse_date_bound('2026-03-03', end=True), chunk_size=10)))
+
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 5
+    table = parquet.read()
+    assert table.num_rows == 48
+    assert table.column_names == [column for column, _ in EXPORT_COLUMNS]
+    timestamps = table.column('timestamp').to_pylist()
+    assert min(timestamps) >= '2026-03-02' and max(timestamps) < '2026-03-04'
+    assert set(table.column('actual_profit').to_pylist()) == {1.0}
+    assert set(table.column('simulated').to_pylist()) == {False}